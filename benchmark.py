@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import pathlib
+import statistics
+import subprocess  # nosec B404
+import sys
+import tempfile
+import threading
+import time
+from typing import IO, Any
+
+import bot
+import util
+
+logger = logging.getLogger(__name__)
+
+SERVER_EXIT_TIMEOUT = 30.0
+"""Seconds to wait for the server to exit once the bots have finished."""
+PERCENTILES = (50, 90, 99)
+"""Percentiles of the decision round-trip time to report."""
+
+
+class BenchmarkNamespace(argparse.Namespace):
+    n_bots: int  # Number of headless clients, each taking a seat
+    n_ais: int  # Number of AI players hosted by the server
+    policy: str  # One of `bot.POLICIES`
+    think_time: float  # Mean seconds each bot waits before each choice
+    connect_interval: float  # Seconds between opening each connection
+    no_compression: bool  # Don't negotiate compressed frames
+    deck: pathlib.Path  # Path to the deck file
+    host: str
+    port: int
+    unix: pathlib.Path | None  # Unix domain socket to use instead of TCP
+    output: pathlib.Path  # Where to write the report
+    baseline: pathlib.Path | None  # Earlier report to compare against
+    server_log: pathlib.Path | None  # Where to write the server's output
+
+
+def get_parser_args() -> BenchmarkNamespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark a Nullopoly server against headless bots.",
+        epilog="Example usage: python benchmark.py --n-bots 50 --output report.json --baseline main.json",  # noqa: E501, pylint: disable=line-too-long
+    )
+    parser.add_argument(
+        "--n-bots",
+        type=int,
+        default=4,
+        help="Number of headless clients, each taking a seat (default: 4)",
+    )
+    parser.add_argument(
+        "--n-ais",
+        type=int,
+        default=0,
+        help="Number of AI players hosted by the server (default: 0)",
+    )
+    parser.add_argument(
+        "--policy",
+        choices=bot.POLICIES,
+        default="ai",
+        help="How bots make their choices (default: ai)",
+    )
+    parser.add_argument(
+        "--think-time",
+        type=float,
+        default=0.0,
+        help="Mean seconds each bot waits before each choice (default: 0)",
+    )
+    parser.add_argument(
+        "--connect-interval",
+        type=float,
+        default=0.0,
+        help="Seconds between opening each connection (default: 0)",
+    )
+    parser.add_argument(
+        "--no-compression",
+        action="store_true",
+        help="Don't negotiate compressed frames",
+    )
+    parser.add_argument(
+        "--deck",
+        type=pathlib.Path,
+        default=pathlib.Path("resources/deck.json"),
+        help="Path to the deck file (default: resources/deck.json)",
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Host address (default: 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=54322,
+        help="Port number (default: 54322)",
+    )
+    parser.add_argument(
+        "--unix",
+        type=pathlib.Path,
+        default=None,
+        help="Run the game over this Unix domain socket instead of TCP",
+    )
+    parser.add_argument(
+        "--output",
+        type=pathlib.Path,
+        default=pathlib.Path("benchmark.json"),
+        help="Where to write the report (default: benchmark.json)",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=pathlib.Path,
+        default=None,
+        help="Earlier report to compare the results against",
+    )
+    parser.add_argument(
+        "--server-log",
+        type=pathlib.Path,
+        default=None,
+        help="Where to write the server's output (default: discarded)",
+    )
+    return parser.parse_args(namespace=BenchmarkNamespace())
+
+
+def start_server(
+    args: BenchmarkNamespace,
+    stats_file: pathlib.Path,
+) -> subprocess.Popen[str]:
+    """Starts the server, returning once it is listening for players."""
+    server = subprocess.Popen(  # noqa: S603 # nosec B603 # pylint: disable=consider-using-with
+        [
+            sys.executable,
+            pathlib.Path(__file__).with_name("server.py"),
+            f"--n-players={args.n_bots}",
+            f"--n-ais={args.n_ais}",
+            f"--deck={args.deck}",
+            f"--host={args.host}",
+            f"--port={args.port}",
+            f"--stats-file={stats_file}",
+            *([f"--unix={args.unix}"] if args.unix is not None else []),
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    assert server.stdout is not None, "Server output is not piped"
+    for line in server.stdout:
+        if "Listening on" in line:
+            break
+    else:
+        msg = f"Server exited with code {server.wait()} before listening"
+        raise RuntimeError(msg)
+    threading.Thread(
+        target=drain_output,
+        args=(server.stdout, args.server_log),
+        daemon=True,
+    ).start()
+    return server
+
+
+def drain_output(stream: IO[str], path: pathlib.Path | None) -> None:
+    """Keeps the server's output moving, so that it never blocks on it."""
+    if path is None:
+        for _ in stream:
+            pass
+        return
+    with path.open("w", encoding="utf-8") as f:
+        for line in stream:
+            f.write(line)
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return {f"p{p}": value for p in PERCENTILES}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {f"p{p}": cuts[p - 1] for p in PERCENTILES}
+
+
+def make_report(
+    args: BenchmarkNamespace,
+    bot_stats: list[bot.BotStats],
+    connect_start: float,
+    server_stats: dict[str, Any],
+) -> dict[str, Any]:
+    """Summarises a run. Decision round-trip times are measured by the
+    server, from sending a prompt to reading the reply, so they include
+    each bot's think time and planning.
+    """
+    turns = max(server_stats["turns"], 1)
+    connect_end = max((s.connected_at for s in bot_stats), default=0.0)
+    connect_duration = connect_end - connect_start
+    waits_ms = [
+        1000 * wait for p in server_stats["players"] for wait in p["waits"]
+    ]
+    return {
+        "config": {
+            "n_bots": args.n_bots,
+            "n_ais": args.n_ais,
+            "policy": args.policy,
+            "think_time": args.think_time,
+            "compression": not args.no_compression,
+        },
+        "bots_finished": sum(s.game_over for s in bot_stats),
+        "turns": server_stats["turns"],
+        "connections_per_second": (
+            len(bot_stats) / connect_duration if connect_duration > 0 else 0.0
+        ),
+        "decisions": len(waits_ms),
+        "decision_rtt_ms": {
+            **percentiles(waits_ms),
+            "max": max(waits_ms, default=0.0),
+        },
+        "bytes_per_turn": (
+            sum(p["bytes_sent"] for p in server_stats["players"]) / turns
+        ),
+        "server_cpu_ms_per_turn": 1000 * server_stats["cpu_time"] / turns,
+        "server_wall_time": server_stats["wall_time"],
+    }
+
+
+def compare(
+    report: dict[str, Any],
+    baseline: dict[str, Any],
+    prefix: str = "",
+) -> None:
+    """Logs how each number in the report has changed from the baseline."""
+    for key, value in report.items():
+        if key == "config" or key not in baseline:
+            continue
+        if isinstance(value, dict):
+            compare(value, baseline[key], f"{prefix}{key}.")
+        elif baseline[key]:
+            change = 100 * (value - baseline[key]) / baseline[key]
+            logger.info(
+                "%s%s: %.2f -> %.2f (%+.1f%%)",
+                prefix,
+                key,
+                baseline[key],
+                value,
+                change,
+            )
+
+
+def run_benchmark(args: BenchmarkNamespace) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        stats_file = pathlib.Path(tmp) / "server_stats.json"
+        server = start_server(args, stats_file)
+        bot_args = bot.BotNamespace()
+        bot_args.n_bots = args.n_bots
+        bot_args.name = "Bot"
+        bot_args.host = args.host
+        bot_args.port = args.port
+        bot_args.unix = args.unix
+        bot_args.policy = args.policy
+        bot_args.think_time = args.think_time
+        bot_args.connect_interval = args.connect_interval
+        bot_args.no_compression = args.no_compression
+        bot_args.seed = None
+        try:
+            connect_start = time.perf_counter()
+            bot_stats = asyncio.run(bot.run_bots(bot_args))
+            code = server.wait(timeout=SERVER_EXIT_TIMEOUT)
+        finally:
+            server.kill()
+        if code != 0 or not stats_file.exists():
+            msg = f"Server failed with code {code}, see --server-log"
+            raise RuntimeError(msg)
+        with stats_file.open(encoding="utf-8") as f:
+            server_stats = json.load(f)
+    return make_report(args, bot_stats, connect_start, server_stats)
+
+
+def main() -> None:
+    args = get_parser_args()
+    util.setup_logging()
+    report = run_benchmark(args)
+    with args.output.open("w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    logger.info("Wrote report to %s", args.output)
+    if args.baseline is not None:
+        with args.baseline.open(encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    util.check_python_version()
+    main()
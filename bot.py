@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import pathlib
+import random
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import cards
+import client
+import game
+import player
+import protocol
+import transport
+import util
+from interaction import ai, interaction, randomised
+
+if TYPE_CHECKING:
+    import socket
+    import uuid
+
+logger = logging.getLogger(__name__)
+
+POLICIES = ("random", "ai")
+"""Policies a bot can use to make its choices."""
+STREAM_LIMIT = 2**24
+"""Largest block, in bytes, a bot will buffer while looking for a slash."""
+HIDDEN_DECK_SIZE = 10
+"""Placeholder cards to draw in AI plans, as the deck is never sent."""
+
+
+class BotNamespace(argparse.Namespace):
+    n_bots: int  # Number of connections to open
+    name: str  # Prefix of each bot's name
+    host: str
+    port: int
+    unix: pathlib.Path | None  # Unix domain socket to connect to instead
+    policy: str  # One of `POLICIES`
+    think_time: float  # Mean seconds to wait before each choice
+    connect_interval: float  # Seconds between opening each connection
+    no_compression: bool  # Don't offer to receive compressed frames
+    seed: int | None  # Seed for random choices, for repeatable runs
+
+
+def get_parser_args() -> BotNamespace:
+    parser = argparse.ArgumentParser(
+        description="Run headless Nullopoly clients, to load-test a server.",
+        epilog="Example usage: python bot.py --n-bots 100 --policy random --host 127.0.0.1 --port 54321",  # noqa: E501, pylint: disable=line-too-long
+    )
+    parser.add_argument(
+        "--n-bots",
+        type=int,
+        default=1,
+        help="Number of connections to open (default: 1)",
+    )
+    parser.add_argument(
+        "--name",
+        type=str,
+        default="Bot",
+        help="Prefix of each bot's name (default: Bot)",
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Host address (default: 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=54321,
+        help="Port number (default: 54321)",
+    )
+    parser.add_argument(
+        "--unix",
+        type=pathlib.Path,
+        default=None,
+        help="Connect to a server on this Unix domain socket instead of TCP",
+    )
+    parser.add_argument(
+        "--policy",
+        choices=POLICIES,
+        default="random",
+        help="How bots make their choices (default: random)",
+    )
+    parser.add_argument(
+        "--think-time",
+        type=float,
+        default=0.0,
+        help="Mean seconds to wait before each choice, to mimic people (default: 0)",  # noqa: E501, pylint: disable=line-too-long
+    )
+    parser.add_argument(
+        "--connect-interval",
+        type=float,
+        default=0.0,
+        help="Seconds between opening each connection (default: 0)",
+    )
+    parser.add_argument(
+        "--no-compression",
+        action="store_true",
+        help="Receive game state uncompressed, for servers without support",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed for random choices, for repeatable runs",
+    )
+    return parser.parse_args(namespace=BotNamespace())
+
+
+@dataclass
+class BotStats:
+    """What a single bot saw of the server."""
+
+    connect_time: float = 0.0
+    connected_at: float = 0.0  # From `time.perf_counter`
+    messages: int = 0
+    bytes_received: int = 0
+    decisions: int = 0
+    decision_time: float = 0.0  # Spent choosing, not including think time
+    game_over: bool = False
+
+
+def create_policy(
+    policy: str,
+    index: uuid.UUID,
+    seed: int | None = None,
+) -> interaction.Interaction:
+    if policy == "ai":
+        return ai.AIInteraction(index)
+    if policy == "random":
+        return randomised.RandomInteraction(seed)
+    msg = f"Unknown policy: {policy}"
+    raise ValueError(msg)
+
+
+class Bot:
+    """A headless client, answering each choice with a policy instead of
+    a person. Bots share the choice logic of `client`, so they send exactly
+    the bytes that a curses client making the same choices would.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        args: BotNamespace,
+        seed: int | None = None,
+    ) -> None:
+        self.args = args
+        self.rng = random.Random(seed)  # noqa: S311 # nosec B311
+        me = player.Player(name, client.DUMMY)
+        self.inter = create_policy(args.policy, me.index, seed)
+        self.c = client.ClientState(game.Game([], deck=[]), me, None, [])
+        self.compressed = False
+        self.stats = BotStats()
+
+    async def run(self, sock: socket.socket | None = None) -> BotStats:
+        """Plays a game to its end, on `sock` if it is given, such as one
+        end of `transport.pair`, or else on a new connection to the server.
+        """
+        start = time.perf_counter()
+        if sock is not None:
+            reader, writer = await asyncio.open_connection(
+                sock=sock,
+                limit=STREAM_LIMIT,
+            )
+        else:
+            args = self.args
+            address = transport.Address(args.host, args.port, args.unix)
+            reader, writer = await transport.open_connection(
+                address,
+                STREAM_LIMIT,
+            )
+        self.stats.connected_at = time.perf_counter()
+        self.stats.connect_time = self.stats.connected_at - start
+        capabilities = [protocol.REQUEST_ID_CAPABILITY]
+        if not self.args.no_compression:
+            capabilities.append(protocol.ZLIB_CAPABILITY)
+        me = self.c.me
+        writer.write(protocol.client_hello(me.name, me.index, capabilities))
+        try:
+            while (command := await self.read_block(reader)) is not None:
+                self.c.envelope = protocol.parse_envelope(command)
+                if self.c.envelope is not None:
+                    command = await self.receive(reader)
+                payload = [
+                    await self.receive(reader)
+                    for _ in range(protocol.COMMAND_PAYLOADS.get(command, 0))
+                ]
+                self.stats.messages += 1
+                reply = await self.handle(command, payload)
+                if reply is not None:
+                    writer.write(reply)
+                    await writer.drain()
+        finally:
+            writer.close()
+            with contextlib.suppress(OSError):
+                await writer.wait_closed()
+        return self.stats
+
+    async def read_block(self, reader: asyncio.StreamReader) -> str | None:
+        try:
+            data = await reader.readuntil(b"/")
+        except asyncio.IncompleteReadError:
+            return None
+        self.stats.bytes_received += len(data)
+        return data[:-1].decode("utf-8")
+
+    async def receive(self, reader: asyncio.StreamReader) -> str:
+        data = await self.read_block(reader)
+        if data is None:
+            msg = "Connection closed by the server"
+            raise ConnectionError(msg)
+        return data
+
+    async def handle(self, command: str, payload: list[str]) -> bytes | None:
+        """Updates the table state from a command, returning the reply to
+        send if it asks for a choice.
+        """
+        if command == "notify_draw_my_turn":
+            self.apply_frame(payload[0])
+            self.c.me = client.find_me(self.c)
+        elif command == "notify_draw_other_turn":
+            self.apply_frame(payload[0])
+        elif command in ("hello", "capabilities"):
+            # A hello gives the protocol version before the capabilities
+            capabilities = payload[-1].split(",")
+            self.compressed = protocol.ZLIB_CAPABILITY in capabilities
+        elif command == "notify_game_over":
+            self.stats.game_over = True
+        elif command.startswith("choose_"):
+            return await self.choose(command, payload)
+        return None
+
+    def apply_frame(self, frame: str) -> None:
+        if self.compressed:
+            frame = protocol.decompress_frame(frame.encode("utf-8")).decode(
+                "utf-8",
+            )
+        self.c.g = client.game_from_json(json.loads(frame))
+        self.c.g.deck = [cards.MoneyCard(0) for _ in range(HIDDEN_DECK_SIZE)]
+
+    async def choose(self, command: str, payload: list[str]) -> bytes:
+        if self.args.think_time > 0:
+            await asyncio.sleep(
+                self.rng.expovariate(1 / self.args.think_time),
+            )
+        if command == "choose_card_in_hand" and isinstance(
+            self.inter,
+            ai.AIInteraction,
+        ):
+            # Plan against the table as it is at the start of this play
+            self.inter.set_game_instance(self.c.g)
+        start = time.perf_counter()
+        # Planning can take a while, so keep the other bots running meanwhile
+        reply = await asyncio.to_thread(
+            client.reply_to_choice,
+            command,
+            self.c,
+            self.inter,
+            payload,
+        )
+        if self.c.envelope is not None:
+            reply = protocol.tag_reply(*self.c.envelope, reply)
+        self.stats.decision_time += time.perf_counter() - start
+        self.stats.decisions += 1
+        return reply
+
+
+async def run_bots(args: BotNamespace) -> list[BotStats]:
+    """Runs every bot to the end of its game, opening the connections
+    `connect_interval` apart. Bots which fail are logged and left out.
+    """
+    tasks = []
+    for i in range(args.n_bots):
+        seed = None if args.seed is None else args.seed + i
+        bot = Bot(f"{args.name} {i + 1}", args, seed)
+        tasks.append(asyncio.create_task(bot.run()))
+        if args.connect_interval > 0:
+            await asyncio.sleep(args.connect_interval)
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    stats = []
+    for i, result in enumerate(results):
+        if isinstance(result, BaseException):
+            logger.error("%s %d failed", args.name, i + 1, exc_info=result)
+        else:
+            stats.append(result)
+    return stats
+
+
+def log_summary(stats: list[BotStats]) -> None:
+    decisions = sum(s.decisions for s in stats)
+    decision_time = sum(s.decision_time for s in stats)
+    logger.info(
+        "%d bots finished, %d saw the game end",
+        len(stats),
+        sum(s.game_over for s in stats),
+    )
+    logger.info(
+        "%d messages, %d bytes received, %d decisions (mean %.2fms to choose)",
+        sum(s.messages for s in stats),
+        sum(s.bytes_received for s in stats),
+        decisions,
+        1000 * decision_time / decisions if decisions else 0.0,
+    )
+
+
+def main() -> None:
+    args = get_parser_args()
+    util.setup_logging()
+    stats = asyncio.run(run_bots(args))
+    log_summary(stats)
+
+
+if __name__ == "__main__":
+    util.check_python_version()
+    main()
@@ -1,3 +1,4 @@
+import functools
 from enum import Enum
 from typing import Any
 
@@ -14,6 +15,7 @@ class PropertyColour(Enum):
     RAILROAD = "railroad"
     UTILITY = "utility"
 
+    @functools.cache
     def pretty(self) -> str:
         return self.name.replace("_", " ").title()
 
@@ -46,6 +48,7 @@ class ActionType(Enum):
     RENT_RAILROAD_UTILITY = "rent_railroad_utility"
     PASS_GO = "pass_go"  # nosec
 
+    @functools.cache
     def pretty(self) -> str:
         return self.name.replace("_", " ").title()
 
@@ -76,6 +79,18 @@ def is_rent_action(action: ActionType) -> bool:
 type Card = "ActionCard | PropertyCard | MoneyCard"
 
 
+@functools.cache
+def box(lines: tuple[str, ...]) -> str:
+    """Draws the lines of a card in a box. Cards that look the same share
+    the same lines, so each box is only drawn once.
+    """
+    width = max(len(line) for line in lines) + 4
+    top = f"┌{'─' * (width - 2)}┐"
+    bottom = f"└{'─' * (width - 2)}┘"
+    content = "\n".join(f"│ {line:<{width - 4}} │" for line in lines)
+    return f"{top}\n{content}\n{bottom}"
+
+
 class PropertyCard:
     def __init__(self, name: str, value: int, colour: PropertyColour) -> None:
         self.name = name
@@ -83,13 +98,9 @@ class PropertyCard:
         self.colour = colour
 
     def pretty(self) -> str:
-        colour_str = self.colour.name.replace("_", " ").title()
+        colour_str = self.colour.pretty()
         lines = [self.name, colour_str, f"£{self.value}"]
-        width = max(len(line) for line in lines) + 4
-        top = f"┌{'─' * (width - 2)}┐"
-        bottom = f"└{'─' * (width - 2)}┘"
-        content = "\n".join(f"│ {line:<{width - 4}} │" for line in lines)
-        return f"{top}\n{content}\n{bottom}"
+        return box(tuple(lines))
 
     def __str__(self) -> str:
         return f"Property({self.name}, £{self.value}, {self.colour})"
@@ -127,11 +138,7 @@ class ActionCard:
             lines = [rent, colours, f"£{self.value}"]
         else:
             lines = [action_str, "", f"£{self.value}"]
-        width = max(len(line) for line in lines) + 4
-        top = f"┌{'─' * (width - 2)}┐"
-        bottom = f"└{'─' * (width - 2)}┘"
-        content = "\n".join(f"│ {line:<{width - 4}} │" for line in lines)
-        return f"{top}\n{content}\n{bottom}"
+        return box(tuple(lines))
 
     def __str__(self) -> str:
         return f"Action({self.name}, £{self.value})"
@@ -154,11 +161,7 @@ class MoneyCard:
 
     def pretty(self) -> str:
         lines = ["Money", "", f"£{self.value}"]
-        width = max(len(line) for line in lines) + 4
-        top = f"┌{'─' * (width - 2)}┐"
-        bottom = f"└{'─' * (width - 2)}┘"
-        content = "\n".join(f"│ {line:<{width - 4}} │" for line in lines)
-        return f"{top}\n{content}\n{bottom}"
+        return box(tuple(lines))
 
     def __str__(self) -> str:
         return f"Money(£{self.value})"
@@ -3,23 +3,36 @@ from __future__ import annotations
 import argparse
 import curses
 import json
+import pathlib
 import signal
-import socket
 import sys
+import time
+import uuid
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import cards
 import game
 import player
+import protocol
+import transport
 import util
-from interaction import dummy, local
+from interaction import dummy, interaction, local
+
+if TYPE_CHECKING:
+    import socket
 
 
 class ClientNamespace(argparse.Namespace):
     name: str  # Name of the player
     host: str
     port: int
+    unix: pathlib.Path | None  # Unix domain socket to connect to instead
+    no_compression: bool  # Don't offer to receive compressed frames
+    uuid: uuid.UUID | None  # Seat to resume, from an earlier connection
+    resume_token: str | None  # Given to that seat, to prove it is ours
+    spectate: bool  # Watch the game without taking a seat
+    log_file: pathlib.Path | None  # Append every game log message here
 
 
 def get_parser_args() -> ClientNamespace:
@@ -44,105 +57,200 @@ def get_parser_args() -> ClientNamespace:
         default=54321,
         help="Port number (default: 54321)",
     )
+    parser.add_argument(
+        "--unix",
+        type=pathlib.Path,
+        default=None,
+        help="Connect to a server on this Unix domain socket instead of TCP",
+    )
+    parser.add_argument(
+        "--no-compression",
+        action="store_true",
+        help="Receive game state uncompressed, for servers without support",
+    )
+    parser.add_argument(
+        "--uuid",
+        type=uuid.UUID,
+        default=None,
+        help="Resume the seat of an earlier connection with this player UUID",
+    )
+    parser.add_argument(
+        "--resume-token",
+        type=str,
+        default=None,
+        help="Token the server gave that seat, which it needs to resume it",
+    )
+    parser.add_argument(
+        "--spectate",
+        action="store_true",
+        help="Watch the game without taking a seat",
+    )
+    parser.add_argument(
+        "--log-file",
+        type=pathlib.Path,
+        default=None,
+        help="Append every game log message to this file, as only the latest are kept to scroll back through (default: none)",  # noqa: E501, pylint: disable=line-too-long
+    )
     return parser.parse_args(namespace=ClientNamespace())
 
 
 class BlockReceiver:
-    """A class to receive blocks of data separated by slashes."""
+    """A class to receive blocks of data separated by slashes.
+    Data is received straight into a reusable buffer, and only the newly
+    arrived bytes are scanned for the separator, so large frames cost
+    linear time to receive.
+    """
 
-    def __init__(self, conn: socket.socket) -> None:
+    def __init__(self, conn: socket.socket, buffer_size: int = 4096) -> None:
         self.conn = conn
-        self.buffer = b""
+        self.buffer = bytearray(buffer_size)
+        self.start = 0  # Start of the data not yet returned
+        self.end = 0  # End of the data received so far
+        self.scanned = 0  # Data before this has no separator in it
+        self.compressed = False
+
+    def fill(self) -> bool:
+        """Receive more data into the buffer, making room if it is full.
+        Returns False if the connection has been closed.
+        """
+        if self.end == len(self.buffer):
+            if self.start > 0:
+                # Move the partial block to the front of the buffer
+                n = self.end - self.start
+                self.buffer[:n] = self.buffer[self.start : self.end]
+                self.scanned -= self.start
+                self.start, self.end = 0, n
+            else:
+                self.buffer.extend(bytes(len(self.buffer)))
+        with memoryview(self.buffer) as view:
+            n_received = self.conn.recv_into(view[self.end :])
+        self.end += n_received
+        return n_received > 0
+
+    def next_block(self) -> memoryview | None:
+        """Returns a view of the next block in the buffer, which must be
+        released before receiving any more data.
+        """
+        while (sep := self.buffer.find(b"/", self.scanned, self.end)) == -1:
+            self.scanned = self.end
+            if not self.fill():
+                return None
+        block = memoryview(self.buffer)[self.start : sep]
+        self.start = self.scanned = sep + 1
+        if self.start == self.end:
+            self.start = self.end = self.scanned = 0
+        return block
+
+    def has_data(self) -> bool:
+        """Returns True if received data is waiting to be read."""
+        return self.start < self.end
 
     def receive_opt(self) -> str | None:
-        while b"/" not in self.buffer:
-            chunk = self.conn.recv(4096)
-            if not chunk:
-                return None
-            self.buffer += chunk
-        block, self.buffer = self.buffer.split(b"/", 1)
-        return block.decode("utf-8")
+        block = self.next_block()
+        if block is None:
+            return None
+        with block:
+            return str(block, "utf-8")
 
     def receive(self) -> str:
         data = self.receive_opt()
         assert data is not None, "No data received"
         return data
 
+    def receive_frame(self) -> str:
+        """Receive a payload frame, decompressing it if negotiated."""
+        if not self.compressed:
+            return self.receive()
+        block = self.next_block()
+        assert block is not None, "No data received"
+        with block:
+            return protocol.decompress_frame(block).decode("utf-8")
+
 
 DUMMY = dummy.DummyInteraction()
 
 
 def game_from_json(data: dict[str, Any]) -> game.Game:
     players = [player.Player.from_json(p, DUMMY) for p in data["players"]]
-    return game.Game(players, deck=[])
+    g = game.Game(players, deck=[])
+    if "current_player" in data:
+        current_index = uuid.UUID(data["current_player"]["index"])
+        g.current_player_index = next(
+            i for i, p in enumerate(players) if p.index == current_index
+        )
+    return g
 
 
 def choose_card_in_hand(
     c: ClientState,
-    inter: local.LocalInteraction,
-    s: socket.socket,
-) -> ClientState:
+    inter: interaction.Interaction,
+) -> bytes:
     card = inter.choose_card_in_hand(c.me)
     if isinstance(card, cards.ActionCard) and cards.is_rent_action(
         card.action,
     ):
         c.colour_options = cards.RENT_CARD_COLOURS[card.action]
-    s.sendall(int.to_bytes(c.me.hand.index(card) + 1, 1, "big"))
-    return c
+    return int.to_bytes(c.me.hand.index(card) + 1, 1, "big")
 
 
 def choose_full_set_target(
     c: ClientState,
-    inter: local.LocalInteraction,
-    s: socket.socket,
-) -> None:
+    inter: interaction.Interaction,
+) -> bytes:
     assert c.target is not None, "Target player is not set"
     full_sets = [
         prop for prop in c.target.properties.values() if prop.is_complete()
     ]
     full_set = inter.choose_full_set_target(c.target)
-    s.sendall(int.to_bytes(full_sets.index(full_set) + 1, 1, "big"))
+    return int.to_bytes(full_sets.index(full_set) + 1, 1, "big")
 
 
 def choose_property_target(
     c: ClientState,
-    inter: local.LocalInteraction,
-    s: socket.socket,
-) -> None:
+    inter: interaction.Interaction,
+) -> bytes:
     assert c.target is not None, "Target player is not set"
-    prop = inter.choose_property_target(c.target)
-    properties = c.target.properties_to_list()
-    s.sendall(int.to_bytes(properties.index(prop) + 1, 1, "big"))
+    # The server only ever asks for a property outside the target's full sets
+    prop = inter.choose_property_target(c.target, without_full_sets=True)
+    properties = c.target.properties_to_list(without_full_sets=True)
+    return int.to_bytes(properties.index(prop) + 1, 1, "big")
 
 
 def choose_property_source(
     c: ClientState,
-    inter: local.LocalInteraction,
-    s: socket.socket,
-) -> None:
+    inter: interaction.Interaction,
+) -> bytes:
     prop = inter.choose_property_source(c.me)
     properties = c.me.properties_to_list()
-    s.sendall(int.to_bytes(properties.index(prop) + 1, 1, "big"))
+    return int.to_bytes(properties.index(prop) + 1, 1, "big")
+
+
+def choose_property_payment(
+    c: ClientState,
+    inter: interaction.Interaction,
+    amount: int,
+) -> bytes:
+    # Use the latest table state, as we may be paying on another player's turn
+    me = find_me(c)
+    chosen = inter.choose_property_payment(me, amount)
+    properties = me.properties_to_list()
+    indices = [properties.index(prop) + 1 for prop in chosen]
+    return bytes([len(indices), *indices])
 
 
 def choose_player_target(
     c: ClientState,
-    inter: local.LocalInteraction,
-    s: socket.socket,
-) -> ClientState:
+    inter: interaction.Interaction,
+) -> bytes:
     excluded_players = [p for p in c.g.players if p != c.me]
     c.target = inter.choose_player_target(excluded_players)
-    s.sendall(
-        int.to_bytes(excluded_players.index(c.target) + 1, 1, "big"),
-    )
-    return c
+    return int.to_bytes(excluded_players.index(c.target) + 1, 1, "big")
 
 
 def choose_rent_colour_and_amount(
     c: ClientState,
-    inter: local.LocalInteraction,
-    s: socket.socket,
-) -> None:
+    inter: interaction.Interaction,
+) -> bytes:
     assert c.colour_options, "No colour options available"
     owned_colours_with_rents = c.me.owned_colours_with_rents(
         c.colour_options,
@@ -150,20 +258,49 @@ def choose_rent_colour_and_amount(
     colour_choice = inter.choose_rent_colour_and_amount(
         owned_colours_with_rents,
     )
-    s.sendall(
-        int.to_bytes(
-            owned_colours_with_rents.index(colour_choice) + 1,
-            1,
-            "big",
-        ),
+    return int.to_bytes(
+        owned_colours_with_rents.index(colour_choice) + 1,
+        1,
+        "big",
     )
 
 
+def reply_to_choice(
+    command: str,
+    c: ClientState,
+    inter: interaction.Interaction,
+    payload: list[str],
+) -> bytes:
+    """Makes the choice asked for by a `choose_*` command, returning the
+    reply to send to the server. Shared by every client frontend.
+    """
+    if command == "choose_card_in_hand":
+        reply = choose_card_in_hand(c, inter)
+    elif command == "choose_full_set_target":
+        reply = choose_full_set_target(c, inter)
+    elif command == "choose_property_target":
+        reply = choose_property_target(c, inter)
+    elif command == "choose_property_source":
+        reply = choose_property_source(c, inter)
+    elif command == "choose_property_payment":
+        reply = choose_property_payment(c, inter, int(payload[0]))
+    elif command == "choose_player_target":
+        reply = choose_player_target(c, inter)
+    elif command == "choose_action_usage":
+        reply = int.to_bytes(inter.choose_action_usage(), 1, "big")
+    elif command == "choose_rent_colour_and_amount":
+        reply = choose_rent_colour_and_amount(c, inter)
+    else:
+        msg = f"Unknown choice: {command}"
+        raise ValueError(msg)
+    return reply
+
+
 def notify_draw_my_turn(
     inter: local.LocalInteraction,
     block_receiver: BlockReceiver,
 ) -> game.Game:
-    data_dict = json.loads(block_receiver.receive())
+    data_dict = json.loads(block_receiver.receive_frame())
     n_players = len(data_dict["players"])
     if n_players != inter.win.n_players:
         inter.win.update_n_players(n_players)
@@ -185,9 +322,7 @@ def notify_draw_other_turn(
     inter: local.LocalInteraction,
     block_receiver: BlockReceiver,
 ) -> game.Game:
-    data = block_receiver.receive()
-    assert data is not None, "No data received"
-    data_dict = json.loads(data)
+    data_dict = json.loads(block_receiver.receive_frame())
     n_players = len(data_dict["players"])
     if n_players != inter.win.n_players:
         inter.win.update_n_players(n_players)
@@ -205,9 +340,59 @@ class ClientState:
     me: player.Player
     target: player.Player | None
     colour_options: list[cards.PropertyColour]
+    game_over: bool = False
+    # Sent by the server, to get our seat back when we reconnect
+    resume_token: str | None = None
+    # Session and request IDs of the message being handled, if it had any
+    envelope: tuple[int, int] | None = None
+
+
+def find_me(c: ClientState) -> player.Player:
+    """Returns our player in the latest table state."""
+    return next((p for p in c.g.players if p == c.me), c.me)
+
+
+def handle_choice(
+    data: str,
+    c: ClientState,
+    inter: local.LocalInteraction,
+    block_receiver: BlockReceiver,
+    s: socket.socket,
+) -> ClientState:
+    payload = [
+        block_receiver.receive()
+        for _ in range(protocol.COMMAND_PAYLOADS.get(data, 0))
+    ]
+    reply = reply_to_choice(data, c, inter, payload)
+    if c.envelope is not None:
+        reply = protocol.tag_reply(*c.envelope, reply)
+    s.sendall(reply)
+    return c
+
+
+def handle_handshake(
+    data: str,
+    c: ClientState,
+    inter: local.LocalInteraction,
+    block_receiver: BlockReceiver,
+) -> None:
+    """Takes what the server agreed to, and the token to resume our seat."""
+    if data == "resume":
+        token = block_receiver.receive()
+        if token != c.resume_token:
+            inter.log(
+                f"To take this seat back after a restart, run with --uuid "
+                f"{c.me.index} --resume-token {token}",
+            )
+        c.resume_token = token
+        return
+    if data == "hello":
+        block_receiver.receive()  # The protocol version we will speak
+    capabilities = block_receiver.receive().split(",")
+    block_receiver.compressed = protocol.ZLIB_CAPABILITY in capabilities
 
 
-def game_loop(  # noqa: C901
+def game_loop(
     c: ClientState,
     inter: local.LocalInteraction,
     block_receiver: BlockReceiver,
@@ -215,33 +400,69 @@ def game_loop(  # noqa: C901
 ) -> ClientState:
     data = block_receiver.receive_opt()
     if data is None:
-        return c
+        msg = "Connection closed by the server"
+        raise ConnectionError(msg)
+    c.envelope = protocol.parse_envelope(data)
+    if c.envelope is not None:
+        data = block_receiver.receive()
     if data == "notify_draw_my_turn":
         c.g = notify_draw_my_turn(inter, block_receiver)
-        c.me = c.g.current_player()
+        c.me = find_me(c)
     elif data == "notify_draw_other_turn":
         c.g = notify_draw_other_turn(inter, block_receiver)
-    elif data == "choose_card_in_hand":
-        c = choose_card_in_hand(c, inter, s)
-    elif data == "choose_full_set_target":
-        choose_full_set_target(c, inter, s)
-    elif data == "choose_property_target":
-        choose_property_target(c, inter, s)
-    elif data == "choose_property_source":
-        choose_property_source(c, inter, s)
-    elif data == "choose_player_target":
-        c = choose_player_target(c, inter, s)
-    elif data == "choose_action_usage":
-        choice = inter.choose_action_usage()
-        s.sendall(int.to_bytes(choice, 1, "big"))
-    elif data == "choose_rent_colour_and_amount":
-        choose_rent_colour_and_amount(c, inter, s)
+    elif data.startswith("choose_"):
+        c = handle_choice(data, c, inter, block_receiver, s)
+    elif data in ("hello", "capabilities", "resume"):
+        handle_handshake(data, c, inter, block_receiver)
+    elif data == "notify_game_over":
+        c.game_over = True
     elif data == "log":
         message = block_receiver.receive()
         inter.log(message)
     return c
 
 
+RECONNECT_ATTEMPTS = 10
+MAX_RECONNECT_DELAY = 10
+
+
+def connect(
+    args: ClientNamespace,
+    index: uuid.UUID,
+    resume_token: str | None = None,
+) -> socket.socket:
+    s = transport.connect(transport.Address(args.host, args.port, args.unix))
+    capabilities = [protocol.REQUEST_ID_CAPABILITY]
+    if not args.no_compression:
+        capabilities.append(protocol.ZLIB_CAPABILITY)
+    if args.spectate:
+        capabilities.append(protocol.SPECTATE_CAPABILITY)
+    else:
+        capabilities.append(protocol.RESUME_CAPABILITY)
+    if resume_token is not None:
+        capabilities.append(f"{protocol.RESUME_TOKEN_PREFIX}{resume_token}")
+    s.sendall(protocol.client_hello(args.name, index, capabilities))
+    return s
+
+
+def reconnect(
+    args: ClientNamespace,
+    index: uuid.UUID,
+    inter: local.LocalInteraction,
+    resume_token: str | None,
+) -> socket.socket:
+    """Reconnects to our seat, backing off between attempts."""
+    for attempt in range(RECONNECT_ATTEMPTS):
+        inter.log(f"Connection lost, reconnecting (attempt {attempt + 1})")
+        time.sleep(min(2**attempt, MAX_RECONNECT_DELAY))
+        try:
+            return connect(args, index, resume_token)
+        except OSError:
+            continue
+    msg = "Could not reconnect to the server"
+    raise ConnectionError(msg)
+
+
 def run_game(stdscr: curses.window, args: ClientNamespace) -> None:
     g: game.Game = game.Game(
         [],
@@ -251,27 +472,40 @@ def run_game(stdscr: curses.window, args: ClientNamespace) -> None:
         args.name,
         DUMMY,
     )
-    inter = local.LocalInteraction(stdscr, n_players=1)
+    if args.uuid is not None:
+        me.index = args.uuid
+    index = me.index
+    inter = local.LocalInteraction(stdscr, n_players=1, log_file=args.log_file)
     target: player.Player | None = None
     colour_options: list[cards.PropertyColour] = []
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.connect((args.host, args.port))
+    c = ClientState(
+        g,
+        me,
+        target,
+        colour_options,
+        resume_token=args.resume_token,
+    )
+    s = connect(args, index, c.resume_token)
+    while True:
         block_receiver = BlockReceiver(s)
-        send_string = f"{me.name}/{me.index!s}"
-        s.sendall(send_string.encode("utf-8"))
-        c = ClientState(
-            g,
-            me,
-            target,
-            colour_options,
-        )
-        while True:
-            c = game_loop(
-                c,
-                inter,
-                block_receiver,
-                s,
-            )
+        try:
+            while True:
+                if not block_receiver.has_data():
+                    # The burst of updates is over, so show its last frame
+                    inter.flush()
+                c = game_loop(
+                    c,
+                    inter,
+                    block_receiver,
+                    s,
+                )
+        except OSError:
+            s.close()
+            if c.game_over:
+                inter.notify_game_over()
+                inter.close()
+                return
+            s = reconnect(args, index, inter, c.resume_token)
 
 
 def curses_main(stdscr: curses.window) -> None:
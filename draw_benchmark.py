@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import argparse
+import logging
+import pathlib
+import timeit
+from typing import Any, cast
+
+import cards
+import parse_deck
+import player
+import util
+from interaction import dummy
+from window import hand, table
+
+logger = logging.getLogger(__name__)
+
+
+class DrawBenchmarkNamespace(argparse.Namespace):
+    n_frames: int  # Number of frames to time
+    n_players: int  # Number of players at the table
+    hand_size: int  # Number of cards in the current player's hand
+    deck: pathlib.Path  # Path to the deck file
+
+
+def get_parser_args() -> DrawBenchmarkNamespace:
+    parser = argparse.ArgumentParser(
+        description="Count and time the curses calls drawing one frame.",
+        epilog="Example usage: python draw_benchmark.py --n-players 4",
+    )
+    parser.add_argument(
+        "--n-frames",
+        type=int,
+        default=10000,
+        help="Number of frames to time (default: 10000)",
+    )
+    parser.add_argument(
+        "--n-players",
+        type=int,
+        default=2,
+        help="Number of players at the table (default: 2)",
+    )
+    parser.add_argument(
+        "--hand-size",
+        type=int,
+        default=7,
+        help="Number of cards in the current player's hand (default: 7)",
+    )
+    parser.add_argument(
+        "--deck",
+        type=pathlib.Path,
+        default=pathlib.Path("resources/deck.json"),
+        help="Path to the deck file (default: resources/deck.json)",
+    )
+    return parser.parse_args(namespace=DrawBenchmarkNamespace())
+
+
+class CountingWindow:
+    """Stands in for a curses window, counting the calls made on it instead
+    of drawing, so frames can be measured without a terminal.
+    """
+
+    def __init__(self) -> None:
+        self.n_calls = 0
+
+    def call(self, *_: Any) -> None:  # noqa: ANN401
+        self.n_calls += 1
+
+    def subwin(self, *_: int) -> CountingWindow:
+        return self
+
+    def getmaxyx(self) -> tuple[int, int]:
+        return 0, 0
+
+    def __getattr__(self, _: str) -> Any:  # noqa: ANN401
+        return self.call
+
+
+def deal(args: DrawBenchmarkNamespace) -> list[player.Player]:
+    deck = parse_deck.from_json(args.deck)
+    players = [
+        player.Player(f"Player {i + 1}", dummy.DummyInteraction())
+        for i in range(args.n_players)
+    ]
+    for card in deck[: args.hand_size]:
+        players[0].add_to_hand(card)
+    # Lay down every property in the deck, so each player has sets to draw
+    properties = [c for c in deck if isinstance(c, cards.PropertyCard)]
+    for i, card in enumerate(properties):
+        players[i % args.n_players].add_property(card)
+    return players
+
+
+def main() -> None:
+    args = get_parser_args()
+    util.setup_logging()
+    players = deal(args)
+    win = CountingWindow()
+    stdscr = cast("Any", win)
+    player_hand = hand.Hand(stdscr, 12, 200, 0, 0)
+    player_table = table.Table(stdscr, args.n_players, 30, 200)
+
+    def frame() -> None:
+        # Repaint every pane, as after a resize or a change to every player
+        player_hand.invalidate()
+        player_table.invalidate()
+        player_hand.draw(players[0], 1, 0)
+        player_table.draw(players)
+
+    frame()
+    win.n_calls = 0
+    frame()
+    n_calls = win.n_calls
+    seconds = timeit.timeit(frame, number=args.n_frames)
+    logger.info("Curses calls per frame: %d", n_calls)
+    logger.info("Time per frame: %.1fus", seconds / args.n_frames * 1e6)
+
+
+if __name__ == "__main__":
+    util.check_python_version()
+    main()
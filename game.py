@@ -13,6 +13,7 @@ if TYPE_CHECKING:
     import uuid
 
     import player
+    from interaction import interaction
 
 
 class WonError(Exception):
@@ -35,7 +36,11 @@ class Game:
         self.starting_cards = starting_cards
         self.current_player_index: int = 0
         self.current_turn: int = 0
+        self.n_cards_played: int = 0  # In the current turn, as last drawn
         self.discard_pile: list[cards.Card] = []
+        # Watch the game without a seat, seeing it as a player waiting for
+        # their turn would. Spectators are never asked to choose anything.
+        self.spectators: list[interaction.Interaction] = []
         self.logger: logging.Logger = (
             logging.getLogger(__name__)
             if create_logger
@@ -95,6 +100,7 @@ class Game:
 
     def draw(self, n_cards_played: int) -> None:
         """Draw the current game state."""
+        self.n_cards_played = n_cards_played
         for p in self.players:
             if p == self.current_player():
                 p.inter.notify_draw_my_turn(
@@ -104,6 +110,9 @@ class Game:
                 )
             else:
                 p.inter.notify_draw_other_turn(self.players)
+        for spectator in self.spectators:
+            spectator.notify_draw_other_turn(self.players)
+        self.flush_all()
 
     def draw_card(self) -> cards.Card:
         """Draw a card from the deck."""
@@ -305,12 +314,14 @@ class Game:
         p: player.Player,
         amount: int,
     ) -> list[cards.PropertyCard]:
-        charged_properties = []
-        while amount > 0 and p.properties_to_list():
-            property_card = p.inter.choose_property_source(p)
+        if amount <= 0 or not p.properties_to_list():
+            return []
+        charged_properties = p.inter.choose_property_payment(p, amount)
+        if not p.is_valid_property_payment(charged_properties, amount):
+            msg = f"Invalid property payment of £{amount} from {p.name}"
+            raise ValueError(msg)
+        for property_card in charged_properties:
             p.remove_property(property_card)
-            amount -= property_card.value
-            charged_properties.append(property_card)
         return charged_properties
 
     def check_win(self) -> bool:
@@ -331,12 +342,24 @@ class Game:
         self.logger.info(message)
         for p in self.players:
             p.inter.log(message)
+        for spectator in self.spectators:
+            spectator.log(message)
 
     def notify_game_over(self, message: str) -> None:
         """Notify all players that the game is over."""
         for p in self.players:
             p.inter.notify_game_over()
+        for spectator in self.spectators:
+            spectator.notify_game_over()
         self.log_all(message)
+        self.flush_all()
+
+    def flush_all(self) -> None:
+        """Deliver everything queued for the players during this step."""
+        for p in self.players:
+            p.inter.flush()
+        for spectator in self.spectators:
+            spectator.flush()
 
     def choose_card_in_hand(self, p: player.Player) -> cards.Card:
         """Choose a card from the player's hand."""
@@ -16,14 +16,23 @@ if TYPE_CHECKING:
     import player
 
 
-def copy_game(g: game.Game, me: player.Player) -> game.Game:
-    """Deep copy the game."""
+def copy_game(
+    g: game.Game,
+    me: player.Player,
+    me_inter: interaction.Interaction | None = None,
+) -> game.Game:
+    """Deep copy the game.
+    If `me_inter` is given, it is used as the interaction of `me` in the copy.
+    """
     original_inters = [p.inter for p in g.players]
+    spectators, g.spectators = g.spectators, []
     try:
         # Temporarily replace with dummy to avoid
         # deepcopying unpicklable objects
         for p in g.players:
             if p == me:
+                if me_inter is not None:
+                    p.inter = me_inter
                 continue
             p.inter = dummy.DummyInteraction()
         g_copy = deepcopy(g)
@@ -33,6 +42,7 @@ def copy_game(g: game.Game, me: player.Player) -> game.Game:
     finally:
         for p, orig in zip(g.players, original_inters):
             p.inter = orig
+        g.spectators = spectators
     return g_copy
 
 
@@ -115,9 +125,16 @@ class DealBreakerPlan(TargetedActionPlan):
 class Planner:
     """Planner class to generate plans for AI interactions."""
 
-    def __init__(self, g: game.Game, p: player.Player) -> None:
+    def __init__(
+        self,
+        g: game.Game,
+        p: player.Player,
+        inter: interaction.Interaction | None = None,
+    ) -> None:
         self.g = g  # Reference to the game instance for decision making
         self.p = p  # Reference to the player for whom plans are generated
+        # Interaction which follows the plans, if it is not the player's own
+        self.inter = inter
 
         self.plan: Plan | None = None  # Current plan
 
@@ -187,13 +204,17 @@ class Planner:
             return [
                 SlyDealPlan(card, target, target_property)
                 for target in other_players
-                for target_property in target.properties_to_list()
+                for target_property in target.properties_to_list(
+                    without_full_sets=True,
+                )
             ]
         if card.action == cards.ActionType.FORCED_DEAL:
             return [
                 ForcedDealPlan(card, target, target_property, source_property)
                 for target in other_players
-                for target_property in target.properties_to_list()
+                for target_property in target.properties_to_list(
+                    without_full_sets=True,
+                )
                 for source_property in self.p.properties_to_list()
                 if source_property.colour != target_property.colour
             ]
@@ -225,7 +246,7 @@ class Planner:
     def plan_value_if_played(self, plan: Plan) -> int:
         """Compute the value of the game state if the given plan is played."""
         self.plan = plan
-        g_copy = copy_game(self.g, self.p)
+        g_copy = copy_game(self.g, self.p, self.inter)
         p = g_copy.get_player_by_idx(self.p.index)
         if isinstance(plan, (PropertyPlan, MoneyPlan, ActionPlan)):
             g_copy.play_card(plan.card, p)
@@ -242,7 +263,7 @@ class AIInteraction(interaction.Interaction):
 
     def set_game_instance(self, g: game.Game) -> None:
         """Set the game instance for the AI interaction."""
-        self.planner = Planner(g, g.get_player_by_idx(self.me_idx))
+        self.planner = Planner(g, g.get_player_by_idx(self.me_idx), self)
 
     def choose_card_in_hand(self, p: player.Player) -> cards.Card:
         assert (
@@ -310,6 +331,13 @@ class AIInteraction(interaction.Interaction):
         )
         return self.planner.plan.target_property
 
+    def choose_property_payment(
+        self,
+        me: player.Player,
+        amount: int,
+    ) -> list[cards.PropertyCard]:
+        return interaction.cheapest_property_payment(me, amount)
+
     def choose_player_target(
         self,
         _players: list[player.Player],
@@ -0,0 +1,94 @@
+from typing import TYPE_CHECKING
+
+import cards
+from interaction import interaction
+
+if TYPE_CHECKING:
+    import player
+
+
+class DefaultInteraction(interaction.Interaction):
+    """Cheap policy that makes a valid choice without any planning.
+    Used to make decisions for remote players who cannot, such as while
+    they are disconnected. Action cards are always banked, so a card
+    chosen from the hand can never be an invalid play.
+    """
+
+    def choose_card_in_hand(self, p: "player.Player") -> cards.Card:
+        return max(p.hand, key=lambda card: card.value)
+
+    def choose_full_set_target(
+        self,
+        target: "player.Player",
+    ) -> "player.PropertySet":
+        full_sets = [
+            prop for prop in target.properties.values() if prop.is_complete()
+        ]
+        assert full_sets, "No full sets available to choose from"
+        return full_sets[0]
+
+    def choose_property_source(
+        self,
+        me: "player.Player",
+        without_full_sets: bool = False,
+    ) -> cards.PropertyCard:
+        properties = me.properties_to_list(
+            without_full_sets=without_full_sets,
+        )
+        assert properties, "No properties available to choose from"
+        return min(properties, key=lambda prop: prop.value)
+
+    def choose_property_target(
+        self,
+        target: "player.Player",
+        without_full_sets: bool = False,
+    ) -> cards.PropertyCard:
+        properties = target.properties_to_list(
+            without_full_sets=without_full_sets,
+        )
+        assert properties, "No properties available to choose from"
+        return max(properties, key=lambda prop: prop.value)
+
+    def choose_property_payment(
+        self,
+        me: "player.Player",
+        amount: int,
+    ) -> list[cards.PropertyCard]:
+        return interaction.cheapest_property_payment(me, amount)
+
+    def choose_player_target(
+        self,
+        players: list["player.Player"],
+    ) -> "player.Player":
+        assert players, "No players available to choose from"
+        return players[0]
+
+    def choose_action_usage(self) -> int:
+        return 2
+
+    def choose_rent_colour_and_amount(
+        self,
+        owned_colours_with_rents: list[tuple[cards.PropertyColour, int]],
+    ) -> tuple[cards.PropertyColour, int]:
+        assert owned_colours_with_rents, "No owned colours with rents"
+        return max(owned_colours_with_rents, key=lambda x: x[1])
+
+    def log(self, message: str) -> None:
+        pass
+
+    def notify_draw_my_turn(
+        self,
+        current_player: "player.Player",
+        players: list["player.Player"],
+        n_cards_played: int,
+    ) -> None:
+        pass
+
+    def notify_draw_other_turn(self, players: list["player.Player"]) -> None:
+        pass
+
+    def notify_turn_over(self, next_player_name: str) -> None:
+        pass
+
+    def notify_game_over(self) -> None:
+        pass
@@ -39,6 +39,13 @@ class DummyInteraction(interaction.Interaction):
         assert properties, "No properties available to choose from"
         return max(properties, key=lambda prop: prop.value)
 
+    def choose_property_payment(
+        self,
+        me: "player.Player",
+        amount: int,
+    ) -> list[cards.PropertyCard]:
+        return interaction.cheapest_property_payment(me, amount)
+
     def choose_player_target(
         self,
         players: list["player.Player"],
@@ -41,6 +41,16 @@ class Interaction(ABC):
     ) -> cards.PropertyCard:
         """Choose a property card from the target player's hand."""
 
+    @abstractmethod
+    def choose_property_payment(
+        self,
+        me: "player.Player",
+        amount: int,
+    ) -> list[cards.PropertyCard]:
+        """Choose all the properties to give up to pay off the given amount,
+        in a single decision.
+        """
+
     @abstractmethod
     def choose_player_target(
         self,
@@ -87,3 +97,22 @@ class Interaction(ABC):
     @abstractmethod
     def notify_game_over(self) -> None:
         """Notify the player that the game is over."""
+
+    def flush(self) -> None:  # noqa: B027
+        """Deliver any messages queued for the player.
+        Called once the game has finished a step.
+        """
+
+
+def cheapest_property_payment(
+    me: "player.Player",
+    amount: int,
+) -> list[cards.PropertyCard]:
+    """Pay off the amount by giving up the lowest-value properties first."""
+    chosen: list[cards.PropertyCard] = []
+    for prop in sorted(me.properties_to_list(), key=lambda prop: prop.value):
+        if amount <= 0:
+            break
+        chosen.append(prop)
+        amount -= prop.value
+    return chosen
@@ -1,16 +1,29 @@
-import curses
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 
-import cards
-import player
 from interaction import interaction
-from window import common, window
+from window import common, frame, window
+
+if TYPE_CHECKING:
+    import curses
+    import pathlib
+
+    import cards
+    import player
 
 
 class LocalInteraction(interaction.Interaction):
     """Interaction class for local player using the UI."""
 
-    def __init__(self, stdscr: curses.window, n_players: int) -> None:
-        self.win = window.Window(stdscr, n_players)
+    def __init__(
+        self,
+        stdscr: curses.window,
+        n_players: int,
+        max_fps: float = frame.MAX_FPS,
+        log_file: pathlib.Path | None = None,
+    ) -> None:
+        self.win = window.Window(stdscr, n_players, max_fps, log_file)
 
     def update_n_players(self, n_players: int) -> None:
         """Update the number of players in the interaction."""
@@ -30,7 +43,8 @@ class LocalInteraction(interaction.Interaction):
         if not full_sets:
             msg = "Target player does not have a full set of properties"
             raise common.InvalidChoiceError(msg)
-        self.win.hand.draw_target_full_set_dialog(target)
+        with self.win.lock:
+            self.win.hand.draw_target_full_set_dialog(target)
         choice = self.win.get_number_input(1, len(full_sets))
         return full_sets[choice - 1]
 
@@ -43,10 +57,11 @@ class LocalInteraction(interaction.Interaction):
         if not properties:
             msg = "Target player has no properties to choose from"
             raise common.InvalidChoiceError(msg)
-        self.win.hand.draw_target_property_dialog(
-            target,
-            without_full_sets=True,
-        )
+        with self.win.lock:
+            self.win.hand.draw_target_property_dialog(
+                target,
+                without_full_sets=without_full_sets,
+            )
         choice = self.win.get_number_input(1, len(properties))
         return properties[choice - 1]
 
@@ -60,6 +75,22 @@ class LocalInteraction(interaction.Interaction):
             without_full_sets=without_full_sets,
         )
 
+    def choose_property_payment(
+        self,
+        me: player.Player,
+        amount: int,
+    ) -> list[cards.PropertyCard]:
+        properties = me.properties_to_list()
+        chosen: list[cards.PropertyCard] = []
+        while amount > 0 and properties:
+            with self.win.lock:
+                self.win.hand.draw_property_payment_dialog(properties, amount)
+            choice = self.win.get_number_input(1, len(properties))
+            prop = properties.pop(choice - 1)
+            chosen.append(prop)
+            amount -= prop.value
+        return chosen
+
     def choose_player_target(
         self,
         players: list[player.Player],
@@ -71,7 +102,8 @@ class LocalInteraction(interaction.Interaction):
             )
         if len(players) == 1:
             return players[0]
-        self.win.hand.draw_target_player_dialog(players)
+        with self.win.lock:
+            self.win.hand.draw_target_player_dialog(players)
         choice = self.win.get_number_input(1, len(players))
         return players[choice - 1]
 
@@ -79,7 +111,8 @@ class LocalInteraction(interaction.Interaction):
         """Choose how to use an action card.
         1 for playing the action, 2 for adding to bank.
         """
-        self.win.hand.draw_action_dialog()
+        with self.win.lock:
+            self.win.hand.draw_action_dialog()
         return self.win.get_number_input(1, 2)
 
     def choose_rent_colour_and_amount(
@@ -87,7 +120,8 @@ class LocalInteraction(interaction.Interaction):
         owned_colours_with_rents: list[tuple[cards.PropertyColour, int]],
     ) -> tuple[cards.PropertyColour, int]:
         """Choose the amount of rent to charge."""
-        self.win.hand.draw_rent_colour_choice(owned_colours_with_rents)
+        with self.win.lock:
+            self.win.hand.draw_rent_colour_choice(owned_colours_with_rents)
         choice = self.win.get_number_input(1, len(owned_colours_with_rents))
         return owned_colours_with_rents[choice - 1]
 
@@ -118,3 +152,13 @@ class LocalInteraction(interaction.Interaction):
         """Notify the player that the game is over."""
         self.win.game_over()
         self.win.refresh()
+
+    def flush(self) -> None:
+        """Draws the last frame of the step, if it was dropped."""
+        self.win.flush()
+
+    def close(self) -> None:
+        """Closes the file the log is spilled to. Called once the game is
+        over and the result has been logged.
+        """
+        self.win.close()
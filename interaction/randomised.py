@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import random
+from typing import TYPE_CHECKING
+
+from interaction import interaction
+
+if TYPE_CHECKING:
+    import cards
+    import player
+
+
+class RandomInteraction(interaction.Interaction):
+    """Policy that makes a uniformly random choice at every decision.
+    Used by headless bots, to exercise as much of the server as possible.
+    Invalid plays are retried by the game, so they are only ever a detour.
+    """
+
+    def __init__(self, seed: int | None = None) -> None:
+        self.rng = random.Random(seed)  # noqa: S311 # nosec B311
+
+    def choose_card_in_hand(self, p: player.Player) -> cards.Card:
+        return self.rng.choice(p.hand)
+
+    def choose_full_set_target(
+        self,
+        target: player.Player,
+    ) -> player.PropertySet:
+        full_sets = [
+            prop for prop in target.properties.values() if prop.is_complete()
+        ]
+        assert full_sets, "No full sets available to choose from"
+        return self.rng.choice(full_sets)
+
+    def choose_property_source(
+        self,
+        me: player.Player,
+        without_full_sets: bool = False,
+    ) -> cards.PropertyCard:
+        properties = me.properties_to_list(
+            without_full_sets=without_full_sets,
+        )
+        assert properties, "No properties available to choose from"
+        return self.rng.choice(properties)
+
+    def choose_property_target(
+        self,
+        target: player.Player,
+        without_full_sets: bool = False,
+    ) -> cards.PropertyCard:
+        properties = target.properties_to_list(
+            without_full_sets=without_full_sets,
+        )
+        assert properties, "No properties available to choose from"
+        return self.rng.choice(properties)
+
+    def choose_property_payment(
+        self,
+        me: player.Player,
+        amount: int,
+    ) -> list[cards.PropertyCard]:
+        # Stopping as soon as the amount is covered never includes a card
+        # that isn't needed, as the last card added is needed by definition
+        properties = me.properties_to_list()
+        self.rng.shuffle(properties)
+        chosen: list[cards.PropertyCard] = []
+        total = 0
+        for prop in properties:
+            if total >= amount:
+                break
+            chosen.append(prop)
+            total += prop.value
+        return chosen
+
+    def choose_player_target(
+        self,
+        players: list[player.Player],
+    ) -> player.Player:
+        assert players, "No players available to choose from"
+        return self.rng.choice(players)
+
+    def choose_action_usage(self) -> int:
+        return self.rng.randint(1, 2)
+
+    def choose_rent_colour_and_amount(
+        self,
+        owned_colours_with_rents: list[tuple[cards.PropertyColour, int]],
+    ) -> tuple[cards.PropertyColour, int]:
+        assert owned_colours_with_rents, "No owned colours with rents"
+        return self.rng.choice(owned_colours_with_rents)
+
+    def log(self, message: str) -> None:
+        pass
+
+    def notify_draw_my_turn(
+        self,
+        current_player: player.Player,
+        players: list[player.Player],
+        n_cards_played: int,
+    ) -> None:
+        pass
+
+    def notify_draw_other_turn(self, players: list[player.Player]) -> None:
+        pass
+
+    def notify_turn_over(self, next_player_name: str) -> None:
+        pass
+
+    def notify_game_over(self) -> None:
+        pass
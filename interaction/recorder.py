@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+from interaction import dummy
+
+if TYPE_CHECKING:
+    import pathlib
+
+    import game
+    import player
+
+RECORDING_VERSION = 1
+"""Version of the recording format, written in its header."""
+SNAPSHOT_INTERVAL = 10
+"""Turns between the full snapshots of the table in a recording."""
+
+
+class Recorder(dummy.DummyInteraction):
+    """Records a game for the replay viewer, watching it as a spectator.
+
+    A recording is a file of JSON lines. The first is a header, and each
+    line after it is an event:
+    - "snapshot": every player's state, which starts a new turn at least
+      every snapshot interval turns
+    - "frame": the state of only the players who changed since the last
+      frame
+    - "log": a message logged to the players
+    - "end": the game is over
+    Both kinds of frame give the turn, the index of the current player, and
+    the number of cards they have played. Any frame can then be rebuilt from
+    the nearest snapshot before it, without replaying the whole game.
+    """
+
+    def __init__(
+        self,
+        path: pathlib.Path,
+        g: game.Game,
+        snapshot_interval: int = SNAPSHOT_INTERVAL,
+    ) -> None:
+        self.file = path.open(  # pylint: disable=consider-using-with
+            "w",
+            encoding="utf-8",
+        )
+        self.g = g
+        self.snapshot_interval = snapshot_interval
+        self.snapshot_turn: int | None = None  # Turn of the last snapshot
+        self.recorded: list[dict[str, Any]] = []  # Each player's last state
+        self.write(
+            {
+                "type": "header",
+                "version": RECORDING_VERSION,
+                "snapshot_interval": snapshot_interval,
+            },
+        )
+
+    def write(self, event: dict[str, Any]) -> None:
+        self.file.write(json.dumps(event) + "\n")
+
+    def log(self, message: str) -> None:
+        self.write({"type": "log", "message": message})
+
+    def notify_draw_other_turn(self, players: list[player.Player]) -> None:
+        states = [p.to_json() for p in players]
+        turn = self.g.current_turn
+        event: dict[str, Any] = {
+            "turn": turn,
+            "current": self.g.current_player_index,
+            "played": self.g.n_cards_played,
+        }
+        if (
+            self.snapshot_turn is None
+            or turn >= self.snapshot_turn + self.snapshot_interval
+        ):
+            event |= {"type": "snapshot", "players": states}
+            self.snapshot_turn = turn
+        else:
+            changed = {
+                str(i): state
+                for i, (state, recorded) in enumerate(
+                    zip(states, self.recorded),
+                )
+                if state != recorded
+            }
+            event |= {"type": "frame", "players": changed}
+        self.write(event)
+        self.recorded = states
+
+    def notify_game_over(self) -> None:
+        self.write({"type": "end"})
+
+    def flush(self) -> None:
+        # Keep the recording whole up to the last step, even if the game
+        # is killed
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
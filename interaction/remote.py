@@ -1,58 +1,438 @@
 from __future__ import annotations
 
+import collections
+import contextlib
 import json
+import logging
+import random
+import secrets
+import select
+import socket
+import threading
+import time
 import uuid
-from typing import TYPE_CHECKING
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
 
-from interaction import interaction
+import protocol
+import transport
+from interaction import ai, default, interaction
 
 if TYPE_CHECKING:
-    import socket
-
     import cards
+    import game
     import player
 
+logger = logging.getLogger(__name__)
+
+MISSED_LOG_LIMIT = 1000
+"""Most log messages kept for a player while they are disconnected."""
+WAIT_SAMPLES = 1000
+"""Most decision times kept for a player, to estimate percentiles from."""
+
+
+@dataclass(frozen=True)
+class Hello:
+    """The first message sent by a client when it connects."""
+
+    name: str
+    index: uuid.UUID
+    capabilities: list[str]  # Offered by the client
+    version: int = 1  # Newest protocol version the client speaks
+    token: str | None = None  # Offered to resume a seat
+
+
+@dataclass
+class DecisionStats:
+    """How long a remote player has taken over their decisions."""
+
+    decisions: int = 0
+    timeouts: int = 0  # Decisions not replied to in time
+    stand_ins: int = 0  # Decisions made for the player, including timeouts
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    # A uniform sample of the waits, for percentiles
+    waits: list[float] = field(default_factory=list)
+
+    def record(self, wait: float, timed_out: bool, stood_in: bool) -> None:
+        self.decisions += 1
+        self.timeouts += timed_out
+        self.stand_ins += stood_in
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        if len(self.waits) < WAIT_SAMPLES:
+            self.waits.append(wait)
+            return
+        # Reservoir sampling: every wait so far is kept with equal chance
+        i = random.randrange(self.decisions)  # noqa: S311 # nosec B311
+        if i < WAIT_SAMPLES:
+            self.waits[i] = wait
+
+    def mean_wait(self) -> float:
+        return self.total_wait / self.decisions if self.decisions else 0.0
+
+
+SEAT_CAPABILITIES = (
+    protocol.ZLIB_CAPABILITY,
+    protocol.REQUEST_ID_CAPABILITY,
+    protocol.RESUME_CAPABILITY,
+)
+"""Capabilities the server supports for players, in the order it lists them."""
+HELLO_SIZE = 1024
+"""Most bytes a hello may take."""
+
+
+def read_hello(sock: socket.socket) -> Hello:
+    """Reads the hello from a new connection, blocking until it arrives."""
+    return parse_hello(sock.recv(HELLO_SIZE))
+
+
+def is_whole_hello(data: bytes) -> bool:
+    """Returns True if the hello has arrived up to its version, which ends
+    it. Older clients send no version, so only a timeout shows where their
+    hello ends.
+    """
+    fields = data.split(b"/", 3)
+    return len(fields) == 4 and fields[3] != b""
+
+
+def parse_hello(data: bytes) -> Hello:
+    """Parses a `name/uuid[/capabilities[/version]]` hello.
+    Older clients send only `name/uuid`, with no capabilities, and those
+    which send no version speak version 1 of the protocol. A client
+    reconnecting to its seat offers its resume token among the
+    capabilities.
+    """
+    hello = data.decode("utf-8").split("/", 3)
+    if len(hello) < 2:
+        msg = f"Malformed hello: {'/'.join(hello)!r}"
+        raise ValueError(msg)
+    capabilities = (
+        [c for c in hello[2].split(",") if c] if len(hello) > 2 else []
+    )
+    version = int(hello[3]) if len(hello) > 3 else 1
+    if version < 1:
+        msg = f"Unknown protocol version: {version}"
+        raise ValueError(msg)
+    tokens = [
+        c.removeprefix(protocol.RESUME_TOKEN_PREFIX)
+        for c in capabilities
+        if c.startswith(protocol.RESUME_TOKEN_PREFIX)
+    ]
+    capabilities = [
+        c
+        for c in capabilities
+        if not c.startswith(protocol.RESUME_TOKEN_PREFIX)
+    ]
+    return Hello(
+        hello[0],
+        uuid.UUID(hex=hello[1]),
+        capabilities,
+        version,
+        tokens[0] if tokens else None,
+    )
+
+
+def negotiate(
+    hello: Hello,
+    supported: tuple[str, ...],
+) -> tuple[int, list[str]]:
+    """Agrees on the protocol version, the older of the client's and ours,
+    and the capabilities to use, out of those offered that we support.
+    """
+    version = min(hello.version, protocol.PROTOCOL_VERSION)
+    return version, [c for c in supported if c in hello.capabilities]
+
 
 class RemoteInteraction(interaction.Interaction):
-    """Interaction class for remote player using a network connection."""
+    """Interaction class for remote player using a network connection.
+    If the connection drops, the player may reconnect to their seat with
+    `reattach`. Their decisions wait up to `reconnect_timeout` seconds for
+    them to return, after which a default policy decides for them.
+    Each decision also waits at most `decision_timeout` seconds for a reply.
+    If a card to play is not chosen in time, the AI plays the card for them.
+    """
 
     def __init__(
         self,
         sock: socket.socket,
+        reconnect_timeout: float = 60.0,
+        decision_timeout: float | None = None,
+        hello: Hello | None = None,
     ) -> None:
-        self.sock: socket.socket = sock
-        name_and_index = self.sock.recv(1024).decode("utf-8").split("/", 1)
-        self.name = name_and_index[0]
-        self.index = uuid.UUID(hex=name_and_index[1])
+        self.lock = threading.RLock()
+        self.connected = threading.Event()
+        self.reconnect_timeout = reconnect_timeout
+        self.reconnect_deadline = 0.0
+        self.decision_timeout = decision_timeout
+        self.fallback: interaction.Interaction = default.DefaultInteraction()
+        # Plays cards for the player when they are too slow, once the game
+        # instance is set
+        self.takeover: ai.AIInteraction | None = None
+        self.stand_in_owns_play = False
+        self.stats = DecisionStats()
+        self.out_buffer = bytearray()
+        self.last_send = time.monotonic()
+        self.bytes_sent = 0
+        self.in_buffer = bytearray()
+        # Replies still owed to prompts which timed out, to be discarded
+        self.stale_replies: collections.deque[ReplyLength] = collections.deque()
+        # Latest state frame, sent again to the player when they reconnect
+        self.snapshot: tuple[bytes, bytes] | None = None
+        self.missed_logs: collections.deque[str] = collections.deque(
+            maxlen=MISSED_LOG_LIMIT,
+        )
+        # Identifies this seat's messages, for clients using request IDs
+        self.session_id = secrets.randbits(32)
+        # Proves a connection is this player's, when they reconnect. Only
+        # ever sent to them, unlike their index, which all players see
+        self.resume_token = secrets.token_hex(16)
+        self.next_request_id = 1
+        if hello is None:
+            hello = read_hello(sock)
+        self.name = hello.name
+        self.index = hello.index
+        self.attach(sock, hello)
+
+    def attach(self, sock: socket.socket, hello: Hello) -> None:
+        with self.lock:
+            self.sock: socket.socket = sock
+            transport.set_no_delay(sock)
+            self.out_buffer.clear()
+            self.in_buffer = bytearray()
+            self.stale_replies = collections.deque()
+            self.connected.set()
+            # Negotiated afresh on each connection, as a player may come
+            # back with a different client
+            self.version, self.capabilities = negotiate(
+                hello,
+                SEAT_CAPABILITIES,
+            )
+            self.compress = protocol.ZLIB_CAPABILITY in self.capabilities
+            self.request_ids = (
+                protocol.REQUEST_ID_CAPABILITY in self.capabilities
+            )
+            self.send(protocol.server_hello(self.version, self.capabilities))
+            if protocol.RESUME_CAPABILITY in self.capabilities:
+                self.send(f"resume/{self.resume_token}/".encode())
+        logger.info(
+            "%s speaks protocol version %d, with capabilities: %s",
+            self.name,
+            self.version,
+            ", ".join(self.capabilities) or "none",
+        )
+
+    def can_resume(self, hello: Hello) -> bool:
+        """Returns True if the hello offers this player's resume token."""
+        return hello.token is not None and secrets.compare_digest(
+            hello.token,
+            self.resume_token,
+        )
+
+    def reattach(self, sock: socket.socket, hello: Hello) -> None:
+        """Resumes the player's seat on a new connection, sending them
+        the latest game state and the log messages they missed.
+        """
+        with self.lock:
+            old_sock = self.sock
+            self.attach(sock, hello)
+            if self.snapshot is not None:
+                self.send_frame(*self.snapshot)
+            while self.missed_logs:
+                self.send_log(self.missed_logs.popleft())
+            self.flush()
+        if old_sock is not sock:
+            # Wake up any decision still waiting on the old connection
+            close_socket(old_sock)
+        logger.info("%s reconnected", self.name)
+
+    def disconnect(self, sock: socket.socket) -> None:
+        """Marks the player as disconnected, unless they have already
+        reconnected on a different socket.
+        """
+        with self.lock:
+            if sock is not self.sock or not self.connected.is_set():
+                return
+            self.connected.clear()
+            self.out_buffer.clear()
+            self.reconnect_deadline = time.monotonic() + self.reconnect_timeout
+        close_socket(sock)
+        logger.warning("%s disconnected", self.name)
+
+    def set_game_instance(self, g: game.Game) -> None:
+        """Set the game instance for the AI which takes over slow decisions."""
+        self.takeover = ai.AIInteraction(self.index)
+        self.takeover.set_game_instance(g)
+
+    def wait_for_connection(self, deadline: float | None) -> bool:
+        """Waits for the player to reconnect, if they are disconnected.
+        Returns False if they did not reconnect in time.
+        """
+        wait_until = self.reconnect_deadline
+        if deadline is not None:
+            wait_until = min(wait_until, deadline)
+        return self.connected.wait(max(wait_until - time.monotonic(), 0))
 
     def close_connection(self) -> None:
         """Closes the connection to the remote player."""
-        if self.sock:
-            self.sock.close()
-        if self.sock is not None:
-            self.sock.close()
-            del self.sock
+        with self.lock:
+            self.connected.clear()
+            close_socket(self.sock)
+
+    def send(self, *parts: bytes) -> None:
+        """Queues a message to be sent on the next flush.
+        Messages queued while disconnected are dropped.
+        """
+        with self.lock:
+            if not self.connected.is_set():
+                return
+            for part in parts:
+                self.out_buffer += part
+
+    def flush(self) -> None:
+        """Sends all queued messages in a single write."""
+        with self.lock:
+            if not self.out_buffer:
+                return
+            sock = self.sock
+            try:
+                sock.sendall(self.out_buffer)
+            except OSError:
+                self.disconnect(sock)
+            else:
+                self.bytes_sent += len(self.out_buffer)
+            self.out_buffer.clear()
+            self.last_send = time.monotonic()
+
+    def service(self, keepalive_interval: float) -> None:
+        """Pings the player if nothing has been sent for `keepalive_interval`
+        seconds. Called from the server's I/O thread, so the connection is
+        kept alive while the game thread is busy. Queued messages are left
+        for the game to flush at the end of its step.
+        """
+        with self.lock:
+            if not self.connected.is_set() or self.out_buffer:
+                return
+            if time.monotonic() - self.last_send >= keepalive_interval:
+                self.send(b"ping/")
+                self.flush()
+
+    def send_message(self, *parts: bytes, request_id: int = 0) -> None:
+        """Queues a message of the game, as opposed to one about the
+        connection itself, in an envelope if the player negotiated it.
+        """
+        with self.lock:
+            if self.request_ids:
+                self.send(protocol.envelope(self.session_id, request_id))
+            self.send(*parts)
+
+    def send_frame(self, command: bytes, data: bytes) -> None:
+        """Queues a message with a payload frame, compressing the frame if
+        the player negotiated it.
+        """
+        if self.compress:
+            data = protocol.compress_frame(data)
+        self.send_message(command, data, b"/")
+
+    def send_log(self, message: str) -> None:
+        self.send_message(b"log/", message.encode("utf-8"), b"/")
+
+    def decide[T](
+        self,
+        command: bytes,
+        reply_length: ReplyLength,
+        parse: Callable[[bytes], T],
+    ) -> T | None:
+        """Prompts the player for a decision and reads their reply.
+        Returns None if the player did not reply in time, in which case the
+        caller should decide for them.
+        """
+        start = time.monotonic()
+        deadline = (
+            None
+            if self.decision_timeout is None
+            else start + self.decision_timeout
+        )
+        result: T | None = None
+        timed_out = False
+        while self.wait_for_connection(deadline):
+            with self.lock:
+                sock, buffer = self.sock, self.in_buffer
+                stale_replies = self.stale_replies
+                tagged = self.request_ids
+                request_id = self.next_request_id
+                self.next_request_id += 1
+                self.send_message(command, request_id=request_id)
+                self.flush()
+            try:
+                if tagged:
+                    raw = read_tagged_reply(
+                        sock,
+                        buffer,
+                        (self.session_id, request_id),
+                        deadline,
+                    )
+                else:
+                    while stale_replies:
+                        read_reply(sock, buffer, stale_replies[0], deadline)
+                        stale_replies.popleft()
+                    raw = read_reply(sock, buffer, reply_length, deadline)
+                result = parse(raw)
+                break
+            except TimeoutError:
+                # The player may still reply, which must not be mistaken
+                # for the reply to a later prompt. Tagged replies say which
+                # prompt they are for, so need no tracking.
+                if not tagged:
+                    stale_replies.append(reply_length)
+                timed_out = True
+                break
+            except OSError:
+                self.disconnect(sock)
+        self.stats.record(time.monotonic() - start, timed_out, result is None)
+        if result is None:
+            logger.info("Deciding %r for %s", command, self.name)
+            if timed_out:
+                self.log("You took too long, so a choice was made for you")
+        return result
+
+    def stand_in(self) -> interaction.Interaction:
+        """The interaction to decide for the player when they cannot."""
+        if self.stand_in_owns_play and self.takeover is not None:
+            return self.takeover
+        return self.fallback
 
     def choose_card_in_hand(self, p: player.Player) -> cards.Card:
-        assert self.sock is not None, "There is no active connection"
-        self.sock.sendall(b"choose_card_in_hand/")
-        data = self.sock.recv(1024)
-        i = int.from_bytes(data, "big")
-        assert 1 <= i <= len(p.hand), "Invalid card index"
+        self.stand_in_owns_play = False
+        i = self.decide(
+            b"choose_card_in_hand/",
+            single_reply_length,
+            lambda raw: parse_choice(raw, len(p.hand)),
+        )
+        if i is None:
+            # The player never saw which card was played, so the stand-in
+            # makes the rest of the decisions for it too
+            self.stand_in_owns_play = True
+            return self.stand_in().choose_card_in_hand(p)
         return p.hand[i - 1]
 
     def choose_full_set_target(
         self,
         target: player.Player,
     ) -> player.PropertySet:
-        assert self.sock is not None, "There is no active connection"
         full_sets = [
             prop for prop in target.properties.values() if prop.is_complete()
         ]
-        self.sock.sendall(b"choose_full_set_target/")
-        data = self.sock.recv(1024)
-        i = int.from_bytes(data, "big")
-        assert 1 <= i <= len(full_sets), "Invalid full set index"
+        i = None
+        if not self.stand_in_owns_play:
+            i = self.decide(
+                b"choose_full_set_target/",
+                single_reply_length,
+                lambda raw: parse_choice(raw, len(full_sets)),
+            )
+        if i is None:
+            return self.stand_in().choose_full_set_target(target)
         return full_sets[i - 1]
 
     def choose_property_target(
@@ -60,12 +440,19 @@ class RemoteInteraction(interaction.Interaction):
         target: player.Player,
         without_full_sets: bool = False,
     ) -> cards.PropertyCard:
-        assert self.sock is not None, "There is no active connection"
         properties = target.properties_to_list(without_full_sets)
-        self.sock.sendall(b"choose_property_target/")
-        data = self.sock.recv(1024)
-        i = int.from_bytes(data, "big")
-        assert 1 <= i <= len(properties), "Invalid property index"
+        i = None
+        if not self.stand_in_owns_play:
+            i = self.decide(
+                b"choose_property_target/",
+                single_reply_length,
+                lambda raw: parse_choice(raw, len(properties)),
+            )
+        if i is None:
+            return self.stand_in().choose_property_target(
+                target,
+                without_full_sets,
+            )
         return properties[i - 1]
 
     def choose_property_source(
@@ -73,51 +460,90 @@ class RemoteInteraction(interaction.Interaction):
         me: player.Player,
         without_full_sets: bool = False,
     ) -> cards.PropertyCard:
-        assert self.sock is not None, "There is no active connection"
         properties = me.properties_to_list(without_full_sets)
-        self.sock.sendall(b"choose_property_source/")
-        data = self.sock.recv(1024)
-        i = int.from_bytes(data, "big")
-        assert 1 <= i <= len(properties), "Invalid property index"
+        i = None
+        if not self.stand_in_owns_play:
+            i = self.decide(
+                b"choose_property_source/",
+                single_reply_length,
+                lambda raw: parse_choice(raw, len(properties)),
+            )
+        if i is None:
+            return self.stand_in().choose_property_source(
+                me,
+                without_full_sets,
+            )
         return properties[i - 1]
 
+    def choose_property_payment(
+        self,
+        me: player.Player,
+        amount: int,
+    ) -> list[cards.PropertyCard]:
+        properties = me.properties_to_list()
+        indices = None
+        if not self.stand_in_owns_play:
+            indices = self.decide(
+                f"choose_property_payment/{amount}/".encode(),
+                counted_reply_length,
+                lambda raw: parse_choices(raw, len(properties)),
+            )
+        if indices is None:
+            return self.stand_in().choose_property_payment(me, amount)
+        chosen = [properties[i - 1] for i in indices]
+        assert me.is_valid_property_payment(chosen, amount), "Invalid payment"
+        return chosen
+
     def choose_player_target(
         self,
         players: list[player.Player],
     ) -> player.Player:
-        assert self.sock is not None, "There is no active connection"
-        self.sock.sendall(b"choose_player_target/")
-        data = self.sock.recv(1024)
-        i = int.from_bytes(data, "big")
-        assert 1 <= i <= len(players), "Invalid player index"
+        i = None
+        if not self.stand_in_owns_play:
+            i = self.decide(
+                b"choose_player_target/",
+                single_reply_length,
+                lambda raw: parse_choice(raw, len(players)),
+            )
+        if i is None:
+            return self.stand_in().choose_player_target(players)
         return players[i - 1]
 
     def choose_action_usage(self) -> int:
-        assert self.sock is not None, "There is no active connection"
-        self.sock.sendall(b"choose_action_usage/")
-        data = self.sock.recv(1024)
-        i = int.from_bytes(data, "big")
-        assert 1 <= i <= 2, "Invalid action usage choice"
+        i = None
+        if not self.stand_in_owns_play:
+            i = self.decide(
+                b"choose_action_usage/",
+                single_reply_length,
+                lambda raw: parse_choice(raw, 2),
+            )
+        if i is None:
+            return self.stand_in().choose_action_usage()
         return i
 
     def choose_rent_colour_and_amount(
         self,
         owned_colours_with_rents: list[tuple[cards.PropertyColour, int]],
     ) -> tuple[cards.PropertyColour, int]:
-        assert self.sock is not None, "There is no active connection"
-        self.sock.sendall(b"choose_rent_colour_and_amount/")
-        data = self.sock.recv(1024)
-        i = int.from_bytes(data, "big")
-        assert (
-            1 <= i <= len(owned_colours_with_rents)
-        ), "Invalid rent/colour index"
+        i = None
+        if not self.stand_in_owns_play:
+            i = self.decide(
+                b"choose_rent_colour_and_amount/",
+                single_reply_length,
+                lambda raw: parse_choice(raw, len(owned_colours_with_rents)),
+            )
+        if i is None:
+            return self.stand_in().choose_rent_colour_and_amount(
+                owned_colours_with_rents,
+            )
         return owned_colours_with_rents[i - 1]
 
     def log(self, message: str) -> None:
-        assert self.sock is not None, "There is no active connection"
-        self.sock.sendall(b"log/")
-        self.sock.sendall(message.encode("utf-8"))
-        self.sock.sendall(b"/")
+        with self.lock:
+            if not self.connected.is_set():
+                self.missed_logs.append(message)
+                return
+            self.send_log(message)
 
     def notify_draw_my_turn(
         self,
@@ -125,31 +551,131 @@ class RemoteInteraction(interaction.Interaction):
         players: list[player.Player],
         n_cards_played: int,
     ) -> None:
-        assert self.sock is not None, "There is no active connection"
-        visible_players = [p.to_json() for p in players if p != self]
+        visible_players = [self.visible_json(p) for p in players if p != self]
         data = {
-            "current_player": current_player.to_json(),
+            "current_player": self.visible_json(current_player),
             "players": visible_players,
             "n_cards_played": n_cards_played,
         }
-        self.sock.sendall(b"notify_draw_my_turn/")
-        self.sock.sendall(json.dumps(data).encode("utf-8"))
-        self.sock.sendall(b"/")
+        self.send_state(b"notify_draw_my_turn/", data)
 
     def notify_draw_other_turn(self, players: list[player.Player]) -> None:
-        assert self.sock is not None, "There is no active connection"
-        visible_players = [p.to_json() for p in players if p != self]
+        visible_players = [self.visible_json(p) for p in players if p != self]
         data = {
             "players": visible_players,
         }
-        self.sock.sendall(b"notify_draw_other_turn/")
-        self.sock.sendall(json.dumps(data).encode("utf-8"))
-        self.sock.sendall(b"/")
+        self.send_state(b"notify_draw_other_turn/", data)
+
+    def visible_json(self, p: player.Player) -> dict[str, Any]:
+        """A player's state as this player may see it, with only their own
+        index given.
+        """
+        data = p.to_json()
+        if p.index != self.index:
+            data["index"] = str(p.public_index())
+        return data
+
+    def send_state(self, command: bytes, data: dict[str, Any]) -> None:
+        with self.lock:
+            self.snapshot = (command, json.dumps(data).encode("utf-8"))
+            self.send_frame(*self.snapshot)
 
     def notify_turn_over(self, _next_player_name: str) -> None:
-        assert self.sock is not None, "There is no active connection"
-        self.sock.sendall(b"notify_turn_over/")
+        self.stand_in_owns_play = False
+        self.send_message(b"notify_turn_over/")
 
     def notify_game_over(self) -> None:
-        assert self.sock is not None, "There is no active connection"
-        self.sock.sendall(b"notify_game_over/")
+        self.send_message(b"notify_game_over/")
+
+
+type ReplyLength = Callable[[bytearray], int | None]
+"""Gives the length of the reply at the start of a buffer,
+or None if there is not enough data to know yet.
+"""
+
+
+def single_reply_length(buffer: bytearray) -> int | None:
+    """A reply of a single byte."""
+    return 1 if buffer else None
+
+
+def counted_reply_length(buffer: bytearray) -> int | None:
+    """A reply of a count byte, followed by that many bytes."""
+    return 1 + buffer[0] if buffer else None
+
+
+def tagged_reply_length(buffer: bytearray) -> int | None:
+    """A reply with a `protocol.REPLY_HEADER`."""
+    if len(buffer) < protocol.REPLY_HEADER.size:
+        return None
+    length: int = protocol.REPLY_HEADER.unpack_from(buffer)[2]
+    return protocol.REPLY_HEADER.size + length
+
+
+def read_tagged_reply(
+    sock: socket.socket,
+    buffer: bytearray,
+    ids: tuple[int, int],
+    deadline: float | None,
+) -> bytes:
+    """Reads tagged replies until the one with the given session and request
+    IDs, discarding the rest, such as late replies to timed-out prompts.
+    """
+    while True:
+        reply = read_reply(sock, buffer, tagged_reply_length, deadline)
+        session_id, request_id, _ = protocol.REPLY_HEADER.unpack_from(reply)
+        if (session_id, request_id) == ids:
+            return reply[protocol.REPLY_HEADER.size :]
+        logger.debug("Discarding reply to %d:%d", session_id, request_id)
+
+
+def read_reply(
+    sock: socket.socket,
+    buffer: bytearray,
+    reply_length: ReplyLength,
+    deadline: float | None,
+) -> bytes:
+    """Reads a whole reply, buffering any partial data received.
+    Raises TimeoutError if the reply has not arrived by the deadline.
+    """
+    while (n := reply_length(buffer)) is None or len(buffer) < n:
+        if sock.fileno() == -1:
+            msg = "Connection to the remote player is closed"
+            raise ConnectionError(msg)
+        timeout = None if deadline is None else deadline - time.monotonic()
+        if timeout is not None and timeout <= 0:
+            msg = "Timed out waiting for a reply"
+            raise TimeoutError(msg)
+        readable, _, _ = select.select([sock], [], [], timeout)
+        if not readable:
+            continue
+        chunk = sock.recv(4096)
+        if not chunk:
+            msg = "Connection closed by the remote player"
+            raise ConnectionError(msg)
+        buffer += chunk
+    reply = bytes(buffer[:n])
+    del buffer[:n]
+    return reply
+
+
+def parse_choice(reply: bytes, n_options: int) -> int:
+    """Parses a single 1-based choice out of `n_options`."""
+    i = reply[0]
+    assert 1 <= i <= n_options, "Invalid choice index"
+    return i
+
+
+def parse_choices(reply: bytes, n_options: int) -> list[int]:
+    """Parses a count followed by that many distinct 1-based choices."""
+    indices = list(reply[1:])
+    assert len(set(indices)) == len(indices), "Duplicate choice index"
+    assert all(1 <= i <= n_options for i in indices), "Invalid choice index"
+    return indices
+
+
+def close_socket(sock: socket.socket) -> None:
+    """Shuts down and closes a socket, waking any thread blocked on it."""
+    with contextlib.suppress(OSError):
+        sock.shutdown(socket.SHUT_RDWR)
+    sock.close()
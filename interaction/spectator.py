@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+import protocol
+from interaction import dummy, remote
+
+if TYPE_CHECKING:
+    import socket
+
+    import player
+
+logger = logging.getLogger(__name__)
+
+
+SPECTATOR_CAPABILITIES = (protocol.ZLIB_CAPABILITY,)
+"""Capabilities the server supports for spectators."""
+
+MISSED_LIMIT = 200
+"""Most messages held back for a spectator who is behind."""
+
+
+type Message = tuple[bytes, bytes | None]
+"""A message as its command, and its state frame if it has one."""
+
+
+@dataclass
+class Spectator:
+    """A connection watching the game."""
+
+    sock: socket.socket
+    version: int  # Negotiated protocol version
+    capabilities: list[str]  # Negotiated capabilities
+    unsent: memoryview  # Rest of the update currently being written
+    dropped: int = 0  # Updates held back because the spectator was behind
+    # Held back while behind, sent once the current update is written
+    missed: list[Message] = field(default_factory=list)
+
+    @property
+    def compress(self) -> bool:
+        return protocol.ZLIB_CAPABILITY in self.capabilities
+
+    def hold(self, messages: list[Message]) -> None:
+        """Holds back messages from a step the spectator was too far behind
+        to be sent. Only the latest state frame is kept, since each shows
+        the whole table, and the oldest log lines go first past the limit.
+        """
+        self.dropped += 1
+        for message in messages:
+            if message[1] is not None:
+                self.missed = [m for m in self.missed if m[1] is None]
+            self.missed.append(message)
+        excess = len(self.missed) - MISSED_LIMIT
+        if excess > 0:
+            logs = [
+                i
+                for i, (command, _) in enumerate(self.missed)
+                if command.startswith(b"log/")
+            ]
+            for i in reversed(logs[:excess]):
+                del self.missed[i]
+
+
+class SpectatorHub(dummy.DummyInteraction):
+    """Broadcasts the public state of the game to any number of spectators.
+    Everything queued during a step is encoded once, at most once with and
+    once without compression, and the same bytes are written to every
+    spectator. Writes never block the game: while a spectator is still
+    receiving an earlier update, newer updates are held back for them, and
+    sent as one update once they catch up. Only the latest state frame is
+    held back, since each shows the whole table.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.spectators: list[Spectator] = []
+        self.pending: list[Message] = []  # Queued since the last flush
+        # Latest state frame, sent to spectators when they join
+        self.snapshot: Message | None = None
+
+    def add(self, sock: socket.socket, hello: remote.Hello) -> None:
+        """Starts sending the game to a new connection."""
+        version, capabilities = remote.negotiate(hello, SPECTATOR_CAPABILITIES)
+        greeting: list[Message] = [
+            (protocol.server_hello(version, capabilities), None),
+        ]
+        sock.setblocking(False)
+        with self.lock:
+            if self.snapshot is not None:
+                greeting.append(self.snapshot)
+            compress = protocol.ZLIB_CAPABILITY in capabilities
+            spectator = Spectator(
+                sock,
+                version,
+                capabilities,
+                memoryview(encode(greeting, compress)),
+            )
+            self.spectators.append(spectator)
+            self.write(spectator)
+            logger.info(
+                "Spectator joined with protocol version %d, %d watching",
+                version,
+                len(self.spectators),
+            )
+
+    def write(self, spectator: Spectator) -> None:
+        """Writes as much of the spectator's current update as the socket
+        will take without blocking, then starts on anything held back for
+        them. Must hold the lock.
+        """
+        if not spectator.unsent:
+            if not spectator.missed:
+                return
+            spectator.unsent = memoryview(
+                encode(spectator.missed, spectator.compress),
+            )
+            spectator.missed = []
+        try:
+            n_sent = spectator.sock.send(spectator.unsent)
+        except BlockingIOError:
+            return
+        except OSError:
+            self.spectators.remove(spectator)
+            remote.close_socket(spectator.sock)
+            logger.info("Spectator left, %d watching", len(self.spectators))
+            return
+        spectator.unsent = spectator.unsent[n_sent:]
+
+    def flush(self) -> None:
+        with self.lock:
+            messages, self.pending = self.pending, []
+            encoded: dict[bool, bytes] = {}
+            for spectator in list(self.spectators):
+                self.write(spectator)
+                if not messages or spectator not in self.spectators:
+                    continue
+                if spectator.unsent:
+                    spectator.hold(messages)
+                    continue
+                if spectator.compress not in encoded:
+                    encoded[spectator.compress] = encode(
+                        messages,
+                        spectator.compress,
+                    )
+                spectator.unsent = memoryview(encoded[spectator.compress])
+                self.write(spectator)
+
+    def service(self) -> None:
+        """Carries on writing updates to spectators who were behind.
+        Called from the server's I/O thread, between steps of the game.
+        """
+        with self.lock:
+            for spectator in list(self.spectators):
+                self.write(spectator)
+
+    def close(self) -> None:
+        with self.lock:
+            for spectator in self.spectators:
+                remote.close_socket(spectator.sock)
+            self.spectators.clear()
+
+    def log(self, message: str) -> None:
+        with self.lock:
+            self.pending.append((f"log/{message}/".encode(), None))
+
+    def notify_draw_other_turn(self, players: list[player.Player]) -> None:
+        data = {"players": [p.to_public_json() for p in players]}
+        message = (b"notify_draw_other_turn/", json.dumps(data).encode("utf-8"))
+        with self.lock:
+            self.snapshot = message
+            self.pending.append(message)
+
+    def notify_game_over(self) -> None:
+        with self.lock:
+            self.pending.append((b"notify_game_over/", None))
+
+
+def encode(messages: list[Message], compress: bool) -> bytes:
+    parts = []
+    for command, frame in messages:
+        parts.append(command)
+        if frame is not None:
+            parts.append(protocol.compress_frame(frame) if compress else frame)
+            parts.append(b"/")
+    return b"".join(parts)
@@ -5,18 +5,27 @@ import curses
 import pathlib
 import signal
 import sys
+import time
 
 import game
 import player
 import util
-from interaction import local
-from window import common
+from interaction import local, recorder
+from window import common, frame
+
+CARD_DELAY = 0.5
+"""Seconds between card plays when watching a game of only AIs, at normal
+speed."""
 
 
 class LocalNamespace(argparse.Namespace):
     deck: pathlib.Path  # Path to the deck file
     players: list[str]
     n_ais: int  # Number of AI players
+    max_fps: float  # Most frames drawn each second
+    speed: float  # How many times faster than normal to play AI-only games
+    log_file: pathlib.Path | None  # Append every game log message here
+    record: pathlib.Path | None  # Record the game here, for replay.py
 
 
 def get_parser_args() -> LocalNamespace:
@@ -31,17 +40,49 @@ def get_parser_args() -> LocalNamespace:
         nargs="?",
         help="Path to the deck file (default: resources/deck.json)",
     )
-    parser.add_argument("--players", nargs="*", help="List of player names")
+    parser.add_argument(
+        "--players",
+        nargs="*",
+        default=[],
+        help="List of player names (default: none, watch the AIs play)",
+    )
     parser.add_argument(
         "--n-ais",
         type=int,
         default=1,
         help="Number of AI players (default: 1)",
     )
-    return parser.parse_args(namespace=LocalNamespace())
+    parser.add_argument(
+        "--max-fps",
+        type=float,
+        default=frame.MAX_FPS,
+        help=f"Most frames drawn each second, dropping any in between (default: {frame.MAX_FPS})",  # noqa: E501, pylint: disable=line-too-long
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="How many times faster than normal to play a game with no human players (default: 1)",  # noqa: E501, pylint: disable=line-too-long
+    )
+    parser.add_argument(
+        "--log-file",
+        type=pathlib.Path,
+        default=None,
+        help="Append every game log message to this file, as only the latest are kept to scroll back through (default: none)",  # noqa: E501, pylint: disable=line-too-long
+    )
+    parser.add_argument(
+        "--record",
+        type=pathlib.Path,
+        default=None,
+        help="Record the game to this file, to watch again with replay.py (default: none)",  # noqa: E501, pylint: disable=line-too-long
+    )
+    args = parser.parse_args(namespace=LocalNamespace())
+    if args.max_fps <= 0 or args.speed <= 0:
+        parser.error("--max-fps and --speed must be positive")
+    return args
 
 
-def game_loop(g: game.Game) -> game.Game:
+def game_loop(g: game.Game, card_delay: float = 0.0) -> game.Game:
     current_player = g.current_player()
     g.deal_to_player(current_player, 2)
     n_cards_played = 0
@@ -53,6 +94,7 @@ def game_loop(g: game.Game) -> game.Game:
         except common.InvalidChoiceError:
             continue
         n_cards_played += 1
+        time.sleep(card_delay)
         current_player.remove_card_from_hand(c)
         if not current_player.hand:
             g.deal_from_empty(current_player)
@@ -64,25 +106,49 @@ def game_loop(g: game.Game) -> game.Game:
 
 def run_game(stdscr: curses.window, args: LocalNamespace) -> None:
     n_players = args.n_ais + len(args.players)
+    # Every window logs the same messages, so only the first writes them
+    log_files = [args.log_file] + [None] * len(args.players)
+    inters = [
+        local.LocalInteraction(stdscr, n_players, args.max_fps, log_file)
+        for log_file in log_files[: len(args.players)]
+    ]
     players = [
-        player.Player(
-            name,
-            local.LocalInteraction(stdscr, n_players=n_players),
-        )
-        for name in args.players
+        player.Player(name, inter) for name, inter in zip(args.players, inters)
     ]
     players.extend(
         [util.create_ai_player(f"AI {i + 1}") for i in range(args.n_ais)],
     )
     g = game.Game(players, deck=args.deck)
+    card_delay = 0.0
+    if not args.players:
+        # Nobody is seated, so watch the AIs play at a pace we can follow
+        inters.append(
+            local.LocalInteraction(
+                stdscr,
+                n_players,
+                args.max_fps,
+                args.log_file,
+            ),
+        )
+        g.spectators.append(inters[-1])
+        card_delay = CARD_DELAY / args.speed
+    game_recorder = None
+    if args.record is not None:
+        game_recorder = recorder.Recorder(args.record, g)
+        g.spectators.append(game_recorder)
     util.set_ai_game_instances(players, g)
     g.start()
     while True:
         try:
-            g = game_loop(g)
+            g = game_loop(g, card_delay)
         except game.WonError:
             break
         g.end_turn()
+    # Only now has the result been logged
+    for inter in inters:
+        inter.close()
+    if game_recorder is not None:
+        game_recorder.close()
 
 
 def curses_main(stdscr: curses.window) -> None:
@@ -183,6 +183,27 @@ class Player:
         self.bank.clear()
         return bank_cards, max(0, amount - total)
 
+    def is_valid_property_payment(
+        self,
+        chosen: list[cards.PropertyCard],
+        amount: int,
+    ) -> bool:
+        """Returns True if the chosen properties are a valid way to pay the
+        amount: each is owned and chosen once, and together they cover the
+        amount (or are everything the player owns) without an unneeded card.
+        """
+        owned = self.properties_to_list()
+        if len({id(card) for card in chosen}) != len(chosen):
+            return False
+        if not all(any(card is o for o in owned) for card in chosen):
+            return False
+        if not chosen:
+            return amount <= 0 or not owned
+        total = sum(card.value for card in chosen)
+        if total < amount:
+            return len(chosen) == len(owned)
+        return total - max(card.value for card in chosen) < amount
+
     def has_won(self) -> bool:
         """Returns True if the player has at least three complete property
         sets.
@@ -242,6 +263,13 @@ class Player:
         new_player.bank = list(self.bank)
         return new_player
 
+    def public_index(self) -> uuid.UUID:
+        """An ID for the player which others may see. Their index is how
+        they claim their seat, so it is never shown to anyone else, and it
+        can't be worked out from this.
+        """
+        return uuid.uuid5(self.index, "public")
+
     def to_json(self) -> dict[str, Any]:
         return {
             "index": str(self.index),
@@ -254,13 +282,23 @@ class Player:
             "bank": [card.to_json() for card in self.bank],
         }
 
+    def to_public_json(self) -> dict[str, Any]:
+        """Like `to_json`, but with the hand hidden and only its size shown,
+        for those watching the game.
+        """
+        data = self.to_json()
+        data["index"] = str(self.public_index())
+        data["hand"] = []
+        data["hand_size"] = len(self.hand)
+        return data
+
     @staticmethod
     def from_json(
         data: dict[str, Any],
         inter: interaction.Interaction,
     ) -> Player:
         player = Player(data["name"], inter)
-        player.index = data["index"]
+        player.index = uuid.UUID(data["index"])
         player.hand = [cards.from_json(card_data) for card_data in data["hand"]]
         player.properties = {
             cards.PropertyColour[colour]: PropertySet.from_json(prop_set_data)
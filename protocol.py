@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import base64
+import struct
+import zlib
+from typing import TYPE_CHECKING
+
+import cards
+
+if TYPE_CHECKING:
+    import uuid
+
+PROTOCOL_VERSION = 2
+"""Version of the protocol spoken by this code. Version 1 clients send no
+version in their hello, and the server tells them what it agreed to with a
+`capabilities` message. Later versions get a `hello` message instead, sent
+even when nothing was agreed, giving the version the server will speak.
+"""
+ZLIB_CAPABILITY = "zlib"
+"""Capability advertised by clients which accept compressed state frames."""
+SPECTATE_CAPABILITY = "spectate"
+"""Capability advertised by clients which only watch, without taking a seat."""
+REQUEST_ID_CAPABILITY = "ids"
+"""Capability advertised by clients which tag their replies, see `tag_reply`."""
+RESUME_CAPABILITY = "resume"
+"""Capability advertised by clients which keep the token sent to them in a
+`resume` message, and offer it to get their seat back when they reconnect."""
+RESUME_TOKEN_PREFIX = "resume="  # nosec B105
+"""Marks a resume token offered in a hello, among the capabilities."""
+REPLY_HEADER = struct.Struct(">IIH")
+"""Precedes each tagged reply: its session ID, its request ID, and the length
+of the reply after the header.
+"""
+
+COMMAND_PAYLOADS = {
+    "hello": 2,
+    "capabilities": 1,
+    "resume": 1,
+    "log": 1,
+    "notify_draw_my_turn": 1,
+    "notify_draw_other_turn": 1,
+    "choose_property_payment": 1,
+}
+"""Number of blocks following each server command, for those with any."""
+
+
+def client_hello(name: str, index: uuid.UUID, capabilities: list[str]) -> bytes:
+    """The first message from a client: who they are, the capabilities they
+    offer, and the newest version of the protocol they speak.
+    """
+    hello = f"{name}/{index!s}/{','.join(capabilities)}/{PROTOCOL_VERSION}"
+    return hello.encode()
+
+
+def server_hello(version: int, accepted: list[str]) -> bytes:
+    """The server's reply to a hello, with the protocol version it will
+    speak and the capabilities it accepted out of those offered.
+    """
+    if version < 2:
+        if not accepted:
+            return b""
+        return f"capabilities/{','.join(accepted)}/".encode()
+    return f"hello/{version}/{','.join(accepted)}/".encode()
+
+
+def _preset_dictionary() -> bytes:
+    """Strings which recur in every state frame, used to prime zlib.
+    Only built from the card types in the code, never from a deck file,
+    so that the server and client always agree on the dictionary.
+    """
+    fragments = [
+        '{"colour": ',
+        '"required_count": ',
+        '"cards": [',
+        '"index": ',
+        '"hand": [',
+        '"properties": {',
+        '"bank": [',
+        '"players": [',
+        '"current_player": ',
+        '"n_cards_played": ',
+        '{"type": "MoneyCard", "value": ',
+    ]
+    fragments.extend(
+        f'{{"type": "ActionCard", "name": "", "value": 1, "action": "{a.name}"}}'  # noqa: E501 pylint: disable=line-too-long
+        for a in cards.ActionType
+    )
+    fragments.extend(
+        f'"{c.name}": {{"colour": "{c.name}", "required_count": 3, "cards": []}}, '  # noqa: E501 pylint: disable=line-too-long
+        for c in cards.PropertyColour
+    )
+    fragments.extend(
+        f'{{"type": "PropertyCard", "name": "", "value": 1, "colour": "{c.name}"}}'  # noqa: E501 pylint: disable=line-too-long
+        for c in cards.PropertyColour
+    )
+    return "".join(fragments).encode("utf-8")
+
+
+PRESET_DICTIONARY = _preset_dictionary()
+
+
+def compress_frame(data: bytes) -> bytes:
+    """Compress a frame, encoding it so that it contains no slashes."""
+    compressor = zlib.compressobj(zdict=PRESET_DICTIONARY)
+    compressed = compressor.compress(data) + compressor.flush()
+    return base64.urlsafe_b64encode(compressed)
+
+
+def decompress_frame(data: bytes | memoryview) -> bytes:
+    """Inverse of `compress_frame`."""
+    decompressor = zlib.decompressobj(zdict=PRESET_DICTIONARY)
+    compressed = base64.urlsafe_b64decode(data)
+    return decompressor.decompress(compressed) + decompressor.flush()
+
+
+def envelope(session_id: int, request_id: int) -> bytes:
+    """The block sent before each message of a session, for clients which
+    negotiated request IDs. Prompts have a request ID which their reply must
+    echo, while other messages have a request ID of zero.
+    """
+    return f"{session_id}:{request_id}/".encode()
+
+
+def parse_envelope(block: str) -> tuple[int, int] | None:
+    """Parses the session and request IDs out of an envelope, or returns
+    None if the block is a command instead. Commands never start with a
+    digit, and messages for the whole connection, such as pings, have no
+    envelope.
+    """
+    if not block[:1].isdigit():
+        return None
+    session_id, request_id = block.split(":")
+    return int(session_id), int(request_id)
+
+
+def tag_reply(session_id: int, request_id: int, reply: bytes) -> bytes:
+    """Prefixes a reply with the IDs of the prompt that it answers."""
+    return REPLY_HEADER.pack(session_id, request_id, len(reply)) + reply
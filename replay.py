@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import argparse
+import bisect
+import curses
+import json
+import pathlib
+import signal
+import sys
+from dataclasses import dataclass
+from typing import Any
+
+import game
+import player
+import util
+from interaction import dummy, recorder
+from window import common, window
+
+REPLAY_DELAY = 0.5
+"""Seconds between frames when playing a replay at normal speed."""
+REPLAY_LOG_LINES = 100
+"""Most messages before a frame put in the log to scroll back through."""
+
+DUMMY = dummy.DummyInteraction()
+
+
+class ReplayNamespace(argparse.Namespace):
+    recording: pathlib.Path  # Recording of the game to replay
+    speed: float  # How many times faster than normal to play
+
+
+def get_parser_args() -> ReplayNamespace:
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded game of Nullopoly.",
+        epilog="Example usage: python replay.py game.jsonl --speed 4",
+    )
+    parser.add_argument(
+        "recording",
+        type=pathlib.Path,
+        help="Recording of the game, from local.py or server.py --record",
+    )
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="How many times faster than normal to play (default: 1)",
+    )
+    args = parser.parse_args(namespace=ReplayNamespace())
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    return args
+
+
+@dataclass(frozen=True)
+class Frame:
+    """The table at one point in a recorded game."""
+
+    turn: int
+    current: int  # Index of the current player
+    played: int  # Cards the current player has played this turn
+    players: list[dict[str, Any]]  # Each player's state as JSON
+
+
+class Recording:
+    """A recorded game, indexed so that any frame can be rebuilt from the
+    nearest snapshot before it.
+    """
+
+    def __init__(self, events: list[dict[str, Any]]) -> None:
+        header = events[0]
+        if header.get("version") != recorder.RECORDING_VERSION:
+            msg = f"Unsupported recording version: {header.get('version')}"
+            raise ValueError(msg)
+        self.events = events
+        self.frames: list[int] = []  # Event index of each frame
+        self.snapshots: list[int] = []  # Frame number of each snapshot
+        self.turn_starts: list[int] = []  # Frame number each turn starts at
+        self.n_logged: list[int] = []  # Messages logged before each frame
+        n_logged = 0
+        for i, event in enumerate(events):
+            if event["type"] == "log":
+                n_logged += 1
+            if event["type"] not in ("snapshot", "frame"):
+                continue
+            if event["type"] == "snapshot":
+                self.snapshots.append(len(self.frames))
+            while len(self.turn_starts) <= event["turn"]:
+                self.turn_starts.append(len(self.frames))
+            self.frames.append(i)
+            self.n_logged.append(n_logged)
+        if not self.frames:
+            msg = "Recording has no frames"
+            raise ValueError(msg)
+        self.total_logged = n_logged
+
+    @staticmethod
+    def load(path: pathlib.Path) -> Recording:
+        with path.open(encoding="utf-8") as f:
+            return Recording([json.loads(line) for line in f if line.strip()])
+
+    @property
+    def n_turns(self) -> int:
+        return len(self.turn_starts)
+
+    def frame(self, number: int) -> Frame:
+        """Rebuilds a frame from the nearest snapshot before it."""
+        snapshot = self.snapshots[
+            bisect.bisect_right(self.snapshots, number) - 1
+        ]
+        event = self.events[self.frames[snapshot]]
+        players = list(event["players"])
+        for i in self.frames[snapshot + 1 : number + 1]:
+            event = self.events[i]
+            for index, state in event["players"].items():
+                players[int(index)] = state
+        return Frame(event["turn"], event["current"], event["played"], players)
+
+    def messages(self, number: int) -> tuple[list[str], int]:
+        """Returns the latest messages logged before a frame, and how many
+        were logged in all. Everything logged after the last frame, such as
+        the winner, is shown with it.
+        """
+        is_last = number == len(self.frames) - 1
+        end = len(self.events) if is_last else self.frames[number]
+        n_logged = self.total_logged if is_last else self.n_logged[number]
+        messages: list[str] = []
+        for i in range(end - 1, -1, -1):
+            if len(messages) == REPLAY_LOG_LINES:
+                break
+            if self.events[i]["type"] == "log":
+                messages.append(self.events[i]["message"])
+        messages.reverse()
+        return messages, n_logged
+
+    def turn_of(self, number: int) -> int:
+        return bisect.bisect_right(self.turn_starts, number) - 1
+
+
+class Viewer:
+    """Plays a recording in the game window, one frame at a time."""
+
+    def __init__(
+        self,
+        stdscr: curses.window,
+        recording: Recording,
+        speed: float,
+    ) -> None:
+        self.recording = recording
+        n_players = len(recording.frame(0).players)
+        self.win = window.Window(stdscr, n_players)
+        self.speed = speed
+        self.number = 0  # Frame being shown
+        self.playing = False
+        self.typed = ""  # Digits of a turn to seek to
+
+    def seek(self, number: int) -> None:
+        self.number = min(max(number, 0), len(self.recording.frames) - 1)
+
+    def seek_turn(self, turn: int) -> None:
+        turn = min(max(turn, 0), self.recording.n_turns - 1)
+        self.seek(self.recording.turn_starts[turn])
+
+    def show(self) -> None:
+        frame = self.recording.frame(self.number)
+        players = [player.Player.from_json(p, DUMMY) for p in frame.players]
+        g = game.Game(players, deck=[])
+        g.current_player_index = frame.current
+        g.current_turn = frame.turn
+        messages, n_logged = self.recording.messages(self.number)
+        with self.win.lock:
+            self.win.history.reset(messages, n_logged)
+        state = "playing" if self.playing else "paused"
+        seeking = f", going to turn {self.typed}" if self.typed else ""
+        status = (
+            f"Turn {frame.turn + 1}/{self.recording.n_turns}, {state} at "
+            f"x{self.speed:g}{seeking}. Keys: space n p [ ] + - q, or a turn "
+            "and Enter"
+        )
+        _, width = self.win.getmaxyx()
+        self.win.draw_my_turn(
+            g.current_player(),
+            g.players,
+            frame.played,
+            status[: width - 4],
+        )
+
+    def handle_key(self, key: str) -> bool:
+        """Acts on a key press. Returns False to quit."""
+        if key.isdigit():
+            self.typed += key
+        elif common.is_enter_key(key) and self.typed:
+            self.seek_turn(int(self.typed) - 1)
+            self.typed = ""
+        elif key == " ":
+            self.playing = not self.playing
+        elif key in ("n", "p"):
+            self.playing = False
+            self.seek(self.number + (1 if key == "n" else -1))
+        elif key in ("]", "["):
+            turn = self.recording.turn_of(self.number)
+            self.seek_turn(turn + (1 if key == "]" else -1))
+        elif key in ("+", "="):
+            self.speed *= 2
+        elif key == "-":
+            self.speed /= 2
+        elif key == "q":
+            return False
+        return True
+
+    def run(self) -> None:
+        while True:
+            self.show()
+            timeout = REPLAY_DELAY / self.speed if self.playing else None
+            key = self.win.poll_key(timeout)
+            if key is None:
+                if self.number == len(self.recording.frames) - 1:
+                    self.playing = False
+                self.seek(self.number + 1)
+            elif not self.handle_key(key):
+                return
+
+
+def curses_main(stdscr: curses.window) -> None:
+    args = get_parser_args()
+    recording = Recording.load(args.recording)
+    curses.start_color()
+    curses.curs_set(0)  # Hide the cursor
+    try:
+        Viewer(stdscr, recording, args.speed).run()
+    except Exception:
+        util.curses_exit()
+        raise
+
+
+if __name__ == "__main__":
+    util.check_python_version()
+    if "--help" in sys.argv or "-h" in sys.argv:
+        get_parser_args()
+    else:
+        signal.signal(signal.SIGINT, util.curses_signal_handler)
+        curses.wrapper(curses_main)
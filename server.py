@@ -1,17 +1,45 @@
+from __future__ import annotations
+
 import argparse
+import functools
+import json
 import logging
+import multiprocessing
 import pathlib
-import select
+import selectors
 import socket
+import sys
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, cast
 
 import game
 import player
+import protocol
+import transport
 import util
-from interaction import remote
+from interaction import recorder, remote, spectator
 from window import common
 
 logger = logging.getLogger(__name__)
 
+HELLO_TIMEOUT = 5.0
+"""Default seconds a new connection has to send its hello."""
+HELLO_SETTLE = 0.05
+"""Seconds a hello without a version must go without more arriving before
+it is taken as whole."""
+BACKLOG = 128
+"""Default number of connections the OS queues for the server to accept."""
+IO_LOOP_INTERVAL = 0.5
+"""Seconds between the I/O thread servicing each remote connection."""
+KEEPALIVE_INTERVAL = 10.0
+"""Seconds a connection may be idle before the player is pinged."""
+CONTROL_MESSAGE_SIZE = 4096
+"""Most bytes in a message between the front process and a shard."""
+
 
 class ServerNamespace(argparse.Namespace):
     deck: pathlib.Path  # Path to the deck file
@@ -19,6 +47,15 @@ class ServerNamespace(argparse.Namespace):
     n_players: int  # Number of remote players
     host: str
     port: int
+    unix: pathlib.Path | None  # Unix domain socket to listen on instead
+    reconnect_timeout: float  # Seconds to hold a seat for a dropped player
+    decision_timeout: float | None  # Seconds a remote player has to decide
+    stats_file: pathlib.Path | None  # Where to write statistics of the game
+    record: pathlib.Path | None  # Record the game here, for replay.py
+    backlog: int  # Connections queued by the OS before they are accepted
+    hello_timeout: float  # Seconds a new connection has to send its hello
+    shards: int  # Worker processes hosting games, or 0 to host one game here
+    rooms: int | None  # Games to host with shards before exiting
 
 
 def get_parser_args() -> ServerNamespace:
@@ -57,7 +94,66 @@ def get_parser_args() -> ServerNamespace:
         default=54321,
         help="Port number (default: 54321)",
     )
-    return parser.parse_args(namespace=ServerNamespace())
+    parser.add_argument(
+        "--unix",
+        type=pathlib.Path,
+        default=None,
+        help="Listen on this Unix domain socket instead of TCP, for clients on the same machine",  # noqa: E501, pylint: disable=line-too-long
+    )
+    parser.add_argument(
+        "--reconnect-timeout",
+        type=float,
+        default=60.0,
+        help="Seconds to wait for a disconnected player to reconnect before making their decisions for them (default: 60)",  # noqa: E501, pylint: disable=line-too-long
+    )
+    parser.add_argument(
+        "--decision-timeout",
+        type=float,
+        default=None,
+        help="Seconds a remote player has to make each decision before the AI makes it for them (default: no limit)",  # noqa: E501, pylint: disable=line-too-long
+    )
+    parser.add_argument(
+        "--stats-file",
+        type=pathlib.Path,
+        default=None,
+        help="Write statistics of the game to this file as JSON, for benchmarks",  # noqa: E501, pylint: disable=line-too-long
+    )
+    parser.add_argument(
+        "--record",
+        type=pathlib.Path,
+        default=None,
+        help="Record the game to this file, to watch again with replay.py (default: none)",  # noqa: E501, pylint: disable=line-too-long
+    )
+    parser.add_argument(
+        "--backlog",
+        type=int,
+        default=BACKLOG,
+        help=f"Connections queued by the OS before the server accepts them (default: {BACKLOG})",  # noqa: E501, pylint: disable=line-too-long
+    )
+    parser.add_argument(
+        "--hello-timeout",
+        type=float,
+        default=HELLO_TIMEOUT,
+        help=f"Seconds a new connection has to introduce itself (default: {HELLO_TIMEOUT:g})",  # noqa: E501, pylint: disable=line-too-long
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=0,
+        help="Host a game for every --n-players who connect, spread over this many worker processes (default: 0, host a single game in this process)",  # noqa: E501, pylint: disable=line-too-long
+    )
+    parser.add_argument(
+        "--rooms",
+        type=int,
+        default=None,
+        help="Number of games to host with --shards before exiting (default: no limit)",  # noqa: E501, pylint: disable=line-too-long
+    )
+    args = parser.parse_args(namespace=ServerNamespace())
+    if args.shards > 0 and args.stats_file is not None:
+        parser.error("--stats-file records a single game, not --shards")
+    if args.shards > 0 and args.record is not None:
+        parser.error("--record records a single game, not --shards")
+    return args
 
 
 def game_loop(g: game.Game) -> game.Game:
@@ -81,6 +177,19 @@ def game_loop(g: game.Game) -> game.Game:
     return g
 
 
+def run_game(g: game.Game) -> int:
+    """Plays the game until someone wins, returning the number of turns."""
+    turns = 0
+    g.start()
+    while True:
+        turns += 1
+        try:
+            g = game_loop(g)
+        except game.WonError:
+            return turns
+        g.end_turn()
+
+
 def set_remote_player_indexes(players: list[player.Player]) -> None:
     for p in players:
         if isinstance(p.inter, remote.RemoteInteraction):
@@ -88,8 +197,17 @@ def set_remote_player_indexes(players: list[player.Player]) -> None:
             p.index = p.inter.index
 
 
-def create_remote_player(sock: socket.socket) -> player.Player:
-    inter = remote.RemoteInteraction(sock)
+def create_remote_player(
+    sock: socket.socket,
+    hello: remote.Hello,
+    args: ServerNamespace,
+) -> player.Player:
+    inter = remote.RemoteInteraction(
+        sock,
+        reconnect_timeout=args.reconnect_timeout,
+        decision_timeout=args.decision_timeout,
+        hello=hello,
+    )
     p = player.Player(
         inter.name,
         inter,
@@ -98,42 +216,678 @@ def create_remote_player(sock: socket.socket) -> player.Player:
     return p
 
 
-def run_lobby(args: ServerNamespace) -> list[player.Player]:
-    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    server_socket.bind((args.host, args.port))
-    server_socket.listen(5)
-    players: list[player.Player] = []
-    read_sockets: list[socket.socket] = [server_socket]
-    while len(players) < args.n_players:
-        ready_to_read: list[socket.socket]
-        ready_to_read, _, _ = select.select(read_sockets, [], [])
-        for sock in ready_to_read:
-            if sock is server_socket:
-                client_socket, addr = server_socket.accept()
-                logger.info("Accepted connection from %s", addr)
-                players.append(create_remote_player(client_socket))
-                read_sockets.append(client_socket)
-    return players
+def create_server_socket(args: ServerNamespace) -> socket.socket:
+    address = transport.Address(args.host, args.port, args.unix)
+    try:
+        server_socket = transport.listen(address, args.backlog)
+    except FileExistsError as e:
+        logger.error("Cannot listen: %s", e)  # noqa: TRY400
+        sys.exit(1)
+    logger.info("Listening on %s", address)
+    return server_socket
+
+
+type Admit = Callable[[socket.socket, remote.Hello], None]
+"""Takes a connection which has sent its hello."""
+
+
+@dataclass
+class PendingHello:
+    """A connection which has been accepted, but has not said hello. The
+    hello may arrive split across several reads, so it is buffered here.
+    """
+
+    addr: Any
+    deadline: float
+    data: bytearray = field(default_factory=bytearray)  # The hello so far
+    # When what has arrived is tried as a whole hello, if it has no version
+    settles: float | None = None
+
+    def wake_at(self) -> float:
+        if self.settles is None:
+            return self.deadline
+        return min(self.deadline, self.settles)
+
+
+class Handshaker:
+    """Accepts connections and reads their hellos, without letting any one
+    connection hold up the others. Connections which don't send a valid
+    hello within `hello_timeout` seconds are dropped. The same handshaker
+    serves the lobby and then the rest of the game, so that connections
+    still saying hello when the lobby fills up are not lost.
+    """
+
+    def __init__(
+        self,
+        server_socket: socket.socket,
+        hello_timeout: float = HELLO_TIMEOUT,
+    ) -> None:
+        self.server_socket = server_socket
+        self.hello_timeout = hello_timeout
+        self.pending: dict[socket.socket, PendingHello] = {}
+        self.selector = selectors.DefaultSelector()
+        server_socket.setblocking(False)
+        self.selector.register(server_socket, selectors.EVENT_READ)
+
+    def run(self, admit: Admit, done: Callable[[], bool]) -> None:
+        """Admits connections as they say hello, until `done` is true."""
+        while not done():
+            timeout = None
+            if self.pending:
+                deadline = min(p.wake_at() for p in self.pending.values())
+                timeout = max(deadline - time.monotonic(), 0)
+            for key, _ in self.selector.select(timeout):
+                sock = cast("socket.socket", key.fileobj)
+                if key.data is not None:
+                    callback: Callable[[], None] = key.data
+                    callback()
+                elif sock is self.server_socket:
+                    self.accept()
+                else:
+                    self.read_hello(sock, admit)
+            self.expire(admit)
+
+    def watch(self, sock: socket.socket, callback: Callable[[], None]) -> None:
+        """Calls `callback` whenever `sock` is readable, while running."""
+        self.selector.register(sock, selectors.EVENT_READ, callback)
+
+    def unwatch(self, sock: socket.socket) -> None:
+        self.selector.unregister(sock)
+
+    def close(self) -> None:
+        for sock in self.pending:
+            sock.close()
+        self.pending.clear()
+        self.selector.close()
+
+    def accept(self) -> None:
+        """Accepts every connection waiting in the backlog."""
+        while True:
+            try:
+                sock, addr = self.server_socket.accept()
+            except BlockingIOError:
+                return
+            logger.info("Accepted connection from %s", addr)
+            sock.setblocking(False)
+            deadline = time.monotonic() + self.hello_timeout
+            self.pending[sock] = PendingHello(addr, deadline)
+            self.selector.register(sock, selectors.EVENT_READ)
+
+    def read_hello(self, sock: socket.socket, admit: Admit) -> None:
+        """Buffers what has arrived of a hello, and admits the connection
+        once the hello is whole.
+        """
+        pending = self.pending[sock]
+        try:
+            data = sock.recv(remote.HELLO_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self.drop(sock, "which closed before saying hello")
+            return
+        pending.data += data
+        if len(pending.data) > remote.HELLO_SIZE:
+            self.drop(sock, "with a hello that is too long")
+        elif remote.is_whole_hello(bytes(pending.data)):
+            self.finish(sock, admit)
+        else:
+            pending.settles = time.monotonic() + HELLO_SETTLE
+
+    def finish(self, sock: socket.socket, admit: Admit) -> None:
+        """Admits a connection with the hello it has sent, or drops it if
+        the hello is bad.
+        """
+        pending = self.pending[sock]
+        try:
+            hello = remote.parse_hello(bytes(pending.data))
+        except ValueError:
+            self.drop(sock, "with a bad hello")
+            return
+        del self.pending[sock]
+        self.selector.unregister(sock)
+        sock.setblocking(True)
+        admit(sock, hello)
+
+    def drop(self, sock: socket.socket, reason: str) -> None:
+        logger.warning("Dropping %s, %s", self.pending[sock].addr, reason)
+        del self.pending[sock]
+        self.selector.unregister(sock)
+        sock.close()
+
+    def expire(self, admit: Admit) -> None:
+        """Takes what has arrived of each hello as whole once no more has
+        arrived for a while, and drops connections which run out of time.
+        """
+        now = time.monotonic()
+        for sock, pending in list(self.pending.items()):
+            if pending.deadline <= now:
+                if pending.data:
+                    self.finish(sock, admit)
+                else:
+                    self.drop(sock, "which never said hello")
+            elif pending.settles is not None and pending.settles <= now:
+                pending.settles = None
+                try:
+                    remote.parse_hello(bytes(pending.data))
+                except ValueError:
+                    # Cut short, so wait for the rest until the deadline
+                    continue
+                self.finish(sock, admit)
+
+
+@dataclass
+class Room:
+    """The players and spectators of one game."""
+
+    room_id: int = 0
+    players: list[player.Player] = field(default_factory=list)
+    hub: spectator.SpectatorHub = field(default_factory=spectator.SpectatorHub)
+    started: bool = False
+
+    def admit(
+        self,
+        sock: socket.socket,
+        hello: remote.Hello,
+        args: ServerNamespace,
+    ) -> None:
+        """Seats a connection before the game starts. A player who is
+        already seated reattaches, and spectators are sent to the hub.
+        """
+        if protocol.SPECTATE_CAPABILITY in hello.capabilities:
+            self.hub.add(sock, hello)
+            return
+        seats = remote_seats(self.players)
+        if hello.index in seats:
+            resume_seat(sock, hello, seats, self.hub)
+            return
+        self.players.append(create_remote_player(sock, hello, args))
+        logger.info(
+            "%s joined room %d, %d of %d players",
+            hello.name,
+            self.room_id,
+            len(self.players),
+            args.n_players,
+        )
+
+
+def run_lobby(
+    args: ServerNamespace,
+    handshaker: Handshaker,
+) -> Room:
+    room = Room()
+    handshaker.run(
+        lambda sock, hello: room.admit(sock, hello, args),
+        lambda: len(room.players) >= args.n_players,
+    )
+    return room
+
+
+def setup_game(
+    room: Room,
+    args: ServerNamespace,
+) -> game.Game:
+    """Fills the rest of the room with AIs, and deals them all in."""
+    room.started = True
+    room.players.extend(
+        util.create_ai_player(f"AI {i + 1}") for i in range(args.n_ais)
+    )
+    g = game.Game(room.players, deck=args.deck, create_logger=True)
+    g.spectators.append(room.hub)
+    util.set_ai_game_instances(room.players, g)
+    return g
+
+
+def remote_seats(
+    players: list[player.Player],
+) -> dict[uuid.UUID, remote.RemoteInteraction]:
+    return {
+        p.index: p.inter
+        for p in players
+        if isinstance(p.inter, remote.RemoteInteraction)
+    }
+
+
+def resume_seat(
+    sock: socket.socket,
+    hello: remote.Hello,
+    seats: dict[uuid.UUID, remote.RemoteInteraction],
+    hub: spectator.SpectatorHub,
+) -> None:
+    """Hands a new connection to the remote player whose seat it claims,
+    or to the spectators if it only wants to watch. The player is sent the
+    game so far from a thread of its own, so that a slow connection holds
+    up neither the handshaker nor anyone else reconnecting.
+    """
+    if protocol.SPECTATE_CAPABILITY in hello.capabilities:
+        hub.add(sock, hello)
+        return
+    if hello.index not in seats:
+        logger.warning("No seat for %s (%s)", hello.name, hello.index)
+        sock.close()
+        return
+    if not seats[hello.index].can_resume(hello):
+        logger.warning("Wrong resume token from %s", hello.name)
+        sock.close()
+        return
+    threading.Thread(
+        target=seats[hello.index].reattach,
+        args=(sock, hello),
+        name=f"reattach-{hello.name}",
+        daemon=True,
+    ).start()
+
+
+def run_reconnect_listener(
+    handshaker: Handshaker,
+    seats: dict[uuid.UUID, remote.RemoteInteraction],
+    hub: spectator.SpectatorHub,
+) -> None:
+    """Accepts players reconnecting to their seats, and spectators, for the
+    rest of the game.
+    """
+    handshaker.run(
+        lambda sock, hello: resume_seat(sock, hello, seats, hub),
+        lambda: False,
+    )
+
+
+def run_io_loop(
+    seats: dict[uuid.UUID, remote.RemoteInteraction],
+    hub: spectator.SpectatorHub,
+    finished: threading.Event,
+) -> None:
+    """Services remote connections independently of the game thread,
+    which may be waiting on an AI to finish planning, until the game is
+    finished.
+    """
+    while not finished.wait(IO_LOOP_INTERVAL):
+        for inter in seats.values():
+            inter.service(KEEPALIVE_INTERVAL)
+        hub.service()
+
+
+def log_decision_stats(players: list[player.Player]) -> None:
+    for p in players:
+        if isinstance(p.inter, remote.RemoteInteraction):
+            stats = p.inter.stats
+            logger.info(
+                "%s made %d decisions: mean %.2fs, max %.2fs, "
+                "%d timed out, %d made for them",
+                p.name,
+                stats.decisions,
+                stats.mean_wait(),
+                stats.max_wait,
+                stats.timeouts,
+                stats.stand_ins,
+            )
+
+
+def write_stats(
+    path: pathlib.Path,
+    players: list[player.Player],
+    turns: int,
+    cpu_time: float,
+    wall_time: float,
+) -> None:
+    """Writes what the game cost the server, for the benchmark harness."""
+    stats = {
+        "turns": turns,
+        "cpu_time": cpu_time,
+        "wall_time": wall_time,
+        "players": [
+            {
+                "name": p.name,
+                "decisions": p.inter.stats.decisions,
+                "timeouts": p.inter.stats.timeouts,
+                "stand_ins": p.inter.stats.stand_ins,
+                "waits": p.inter.stats.waits,
+                "bytes_sent": p.inter.bytes_sent,
+                "version": p.inter.version,
+                "capabilities": p.inter.capabilities,
+            }
+            for p in players
+            if isinstance(p.inter, remote.RemoteInteraction)
+        ],
+    }
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(stats, f)
+
+
+def encode_handoff(room_id: int, hello: remote.Hello) -> bytes:
+    return json.dumps(
+        {
+            "room": room_id,
+            "name": hello.name,
+            "index": str(hello.index),
+            "capabilities": hello.capabilities,
+            "version": hello.version,
+            "token": hello.token,
+        },
+    ).encode("utf-8")
+
+
+def decode_handoff(data: bytes) -> tuple[int, remote.Hello]:
+    handoff = json.loads(data)
+    hello = remote.Hello(
+        handoff["name"],
+        uuid.UUID(handoff["index"]),
+        handoff["capabilities"],
+        handoff["version"],
+        handoff["token"],
+    )
+    return handoff["room"], hello
+
+
+class Front:
+    """Accepts every connection for a sharded server, and fills rooms with
+    them in the order they arrive. Each room is hosted by the shard with
+    the fewest games running, and the front passes it the sockets of the
+    room's players and spectators over a Unix socket. Game state lives
+    only in the shard, so the front never touches a game again. Players
+    who reconnect are passed to the shard hosting their room. Only players
+    open rooms, so spectators who arrive before the next room has a player
+    wait for one.
+    """
+
+    def __init__(
+        self,
+        args: ServerNamespace,
+        handshaker: Handshaker,
+        controls: list[socket.socket],
+    ) -> None:
+        self.args = args
+        self.handshaker = handshaker
+        self.controls = controls  # To each shard, by number
+        self.load = [0] * len(controls)  # Rooms running on each shard
+        self.live = set(range(len(controls)))  # Shards still running
+        self.room_shards: dict[int, int] = {}  # Shard hosting each room
+        self.routes: dict[uuid.UUID, int] = {}  # Room of each player
+        self.room_id = 0  # The room being filled
+        self.n_seated = 0  # Players in the room being filled
+        self.finished = 0  # Rooms which have finished their game
+        # Spectators waiting for a player to open the next room
+        self.waiting: list[tuple[socket.socket, remote.Hello]] = []
+        for shard, control in enumerate(controls):
+            handshaker.watch(control, functools.partial(self.receive, shard))
+
+    def run(self) -> None:
+        """Fills rooms until `--rooms` games have been played."""
+        rooms = self.args.rooms
+        self.handshaker.run(
+            self.admit,
+            lambda: rooms is not None and self.finished >= rooms,
+        )
+        for sock, _ in self.waiting:
+            sock.close()
+        self.waiting.clear()
+
+    def admit(self, sock: socket.socket, hello: remote.Hello) -> None:
+        room_id = self.routes.get(hello.index)
+        if room_id is None:
+            if self.args.rooms is not None and self.room_id >= self.args.rooms:
+                logger.warning("No room left for %s", hello.name)
+                sock.close()
+                return
+            if protocol.SPECTATE_CAPABILITY in hello.capabilities:
+                self.spectate(sock, hello)
+                return
+            room_id = self.seat(hello.index)
+        if room_id not in self.room_shards:
+            self.open_room(room_id)
+        self.hand_off(room_id, sock, hello)
+
+    def spectate(self, sock: socket.socket, hello: remote.Hello) -> None:
+        """Sends a spectator to the room being filled, or holds them until
+        a player opens it.
+        """
+        if self.room_id in self.room_shards:
+            self.hand_off(self.room_id, sock, hello)
+            return
+        logger.info("%s is waiting for a room to open", hello.name)
+        self.waiting.append((sock, hello))
+
+    def seat(self, index: uuid.UUID) -> int:
+        """Seats a player in the room being filled, opening it for them if
+        they are the first, and returns its number.
+        """
+        room_id = self.room_id
+        if room_id not in self.room_shards:
+            self.open_room(room_id)
+            for sock, hello in self.waiting:
+                self.hand_off(room_id, sock, hello)
+            self.waiting.clear()
+        self.routes[index] = room_id
+        self.n_seated += 1
+        if self.n_seated >= self.args.n_players:
+            self.room_id += 1
+            self.n_seated = 0
+        return room_id
+
+    def open_room(self, room_id: int) -> None:
+        if not self.live:
+            msg = "Every shard has exited"
+            raise RuntimeError(msg)
+        shard = min(self.live, key=lambda shard: (self.load[shard], shard))
+        self.load[shard] += 1
+        self.room_shards[room_id] = shard
+        logger.info("Room %d is hosted by shard %d", room_id, shard)
+
+    def hand_off(
+        self,
+        room_id: int,
+        sock: socket.socket,
+        hello: remote.Hello,
+    ) -> None:
+        shard = self.room_shards[room_id]
+        try:
+            socket.send_fds(
+                self.controls[shard],
+                [encode_handoff(room_id, hello)],
+                [sock.fileno()],
+            )
+        except OSError:
+            logger.exception("Could not pass %s to shard %d", hello.name, shard)
+        # The shard has its own copy of the connection now
+        sock.close()
+
+    def receive(self, shard: int) -> None:
+        """Reads a shard's report that one of its rooms has finished."""
+        try:
+            data = self.controls[shard].recv(CONTROL_MESSAGE_SIZE)
+        except OSError:
+            data = b""
+        if not data:
+            logger.error("Shard %d has exited", shard)
+            self.handshaker.unwatch(self.controls[shard])
+            self.live.discard(shard)
+            return
+        room_id = json.loads(data)["room"]
+        self.load[shard] -= 1
+        del self.room_shards[room_id]
+        self.routes = {
+            index: room
+            for index, room in self.routes.items()
+            if room != room_id
+        }
+        self.finished += 1
+
+
+class Shard:
+    """Hosts the rooms passed to one worker process by the front. Each
+    game runs in a thread of its own, which also plans its AIs' moves.
+    """
+
+    def __init__(self, control: socket.socket, args: ServerNamespace) -> None:
+        self.control = control
+        self.args = args
+        self.lock = threading.Lock()
+        self.rooms: dict[int, Room] = {}
+        self.closed: set[int] = set()  # Rooms which have finished
+        self.threads: list[threading.Thread] = []
+
+    def run(self) -> None:
+        """Takes connections from the front until it shuts down, then
+        waits for the games still running.
+        """
+        while True:
+            try:
+                data, fds, _, _ = socket.recv_fds(
+                    self.control,
+                    CONTROL_MESSAGE_SIZE,
+                    1,
+                )
+            except OSError:
+                break
+            if not data:
+                break
+            sock = socket.socket(fileno=fds[0])
+            sock.setblocking(True)
+            self.admit(sock, *decode_handoff(data))
+        for thread in self.threads:
+            thread.join()
+
+    def admit(
+        self,
+        sock: socket.socket,
+        room_id: int,
+        hello: remote.Hello,
+    ) -> None:
+        with self.lock:
+            if room_id in self.closed:
+                logger.warning("Room %d has finished", room_id)
+                sock.close()
+                return
+            room = self.rooms.setdefault(room_id, Room(room_id))
+            if room.started:
+                resume_seat(sock, hello, remote_seats(room.players), room.hub)
+                return
+            room.admit(sock, hello, self.args)
+            if len(room.players) < self.args.n_players:
+                return
+            g = setup_game(room, self.args)
+        thread = threading.Thread(
+            target=self.host,
+            args=(room, g),
+            name=f"room-{room_id}",
+        )
+        self.threads.append(thread)
+        thread.start()
+
+    def host(self, room: Room, g: game.Game) -> None:
+        seats = remote_seats(room.players)
+        finished = threading.Event()
+        threading.Thread(
+            target=run_io_loop,
+            args=(seats, room.hub, finished),
+            daemon=True,
+        ).start()
+        try:
+            turns = run_game(g)
+        except Exception:  # pylint: disable=broad-exception-caught
+            # Let the shard's other games play on
+            logger.exception("Room %d abandoned its game", room.room_id)
+        else:
+            logger.info("Room %d finished after %d turns", room.room_id, turns)
+            log_decision_stats(room.players)
+        finally:
+            finished.set()
+            for inter in seats.values():
+                inter.close_connection()
+            room.hub.close()
+            with self.lock:
+                del self.rooms[room.room_id]
+                self.closed.add(room.room_id)
+                self.control.send(json.dumps({"room": room.room_id}).encode())
+
+
+def run_shard(
+    control: socket.socket,
+    args: ServerNamespace,
+    inherited: list[socket.socket],
+) -> None:
+    # Close the front's ends of the controls, inherited when this process
+    # was forked, so that the shards see the front exit
+    for sock in inherited:
+        sock.close()
+    Shard(control, args).run()
+
+
+def start_shards(args: ServerNamespace) -> list[socket.socket]:
+    """Starts the shard processes, returning a control socket to each."""
+    # Fork, as the front has no threads yet and the shards share its code
+    context = multiprocessing.get_context("fork")
+    controls: list[socket.socket] = []
+    for i in range(args.shards):
+        front_end, shard_end = socket.socketpair(
+            socket.AF_UNIX,
+            socket.SOCK_SEQPACKET,
+        )
+        context.Process(
+            target=run_shard,
+            args=(shard_end, args, [*controls, front_end]),
+            name=f"shard-{i}",
+        ).start()
+        shard_end.close()
+        controls.append(front_end)
+    return controls
+
+
+def run_sharded(args: ServerNamespace) -> None:
+    """Hosts games in shard processes, so that they are not limited to
+    the one core a single Python process can use.
+    """
+    controls = start_shards(args)
+    server_socket = create_server_socket(args)
+    handshaker = Handshaker(server_socket, args.hello_timeout)
+    Front(args, handshaker, controls).run()
+    for control in controls:
+        control.close()
+    handshaker.close()
+    server_socket.close()
 
 
 def main() -> None:
     args = get_parser_args()
     util.setup_logging()
-    players = run_lobby(args)
-    if args.n_ais > 0:
-        players.extend(
-            util.create_ai_player(f"AI {i + 1}") for i in range(args.n_ais)
+    if args.shards > 0:
+        run_sharded(args)
+        return
+    server_socket = create_server_socket(args)
+    handshaker = Handshaker(server_socket, args.hello_timeout)
+    room = run_lobby(args, handshaker)
+    g = setup_game(room, args)
+    game_recorder = None
+    if args.record is not None:
+        game_recorder = recorder.Recorder(args.record, g)
+        g.spectators.append(game_recorder)
+    seats = remote_seats(room.players)
+    threading.Thread(
+        target=run_reconnect_listener,
+        args=(handshaker, seats, room.hub),
+        daemon=True,
+    ).start()
+    finished = threading.Event()
+    threading.Thread(
+        target=run_io_loop,
+        args=(seats, room.hub, finished),
+        daemon=True,
+    ).start()
+    start_cpu, start_wall = time.process_time(), time.perf_counter()
+    turns = run_game(g)
+    finished.set()
+    if game_recorder is not None:
+        game_recorder.close()
+    log_decision_stats(room.players)
+    if args.stats_file is not None:
+        write_stats(
+            args.stats_file,
+            room.players,
+            turns,
+            time.process_time() - start_cpu,
+            time.perf_counter() - start_wall,
         )
-    g = game.Game(players, deck=args.deck, create_logger=True)
-    util.set_ai_game_instances(players, g)
-    g.start()
-    while True:
-        try:
-            g = game_loop(g)
-        except game.WonError:
-            break
-        g.end_turn()
 
 
 if __name__ == "__main__":
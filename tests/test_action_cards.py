@@ -60,8 +60,8 @@ class TestActionCards(unittest.TestCase):
         self.p3.add_property(property2)
         with patch.object(
             self.mock_interaction,
-            "choose_property_source",
-            return_value=property2,
+            "choose_property_payment",
+            return_value=[property2],
         ):
             self.g.play_action_card(action_card, self.p1)
             self.assertEqual(self.p2.total_bank_value(), 1)
@@ -96,6 +96,20 @@ class TestAIInteraction(unittest.TestCase):
         ), "Plan should be an instance of SlyDealPlan"
         self.assertEqual(plan.target_property, prop2)
 
+    def test_sly_deal_skips_full_sets(self) -> None:
+        for name in ("Old Kent Road", "Whitechapel Road"):
+            self.p2.add_property(
+                cards.PropertyCard(name, 5, cards.PropertyColour.BROWN),
+            )
+        loose = cards.PropertyCard("Loose", 3, cards.PropertyColour.RED)
+        self.p2.add_property(loose)
+        assert self.ai.planner is not None
+        plan = self.ai.planner.choose_plan(
+            [cards.ActionCard("Sly Deal", 2, cards.ActionType.SLY_DEAL)],
+        )
+        assert isinstance(plan, ai.SlyDealPlan)
+        self.assertEqual(plan.target_property, loose)
+
     def test_game_state_forced_deal_value(self) -> None:
         ai_swap = cards.PropertyCard("Cheap", 1, cards.PropertyColour.RED)
         ai_keep = cards.PropertyCard("Expensive", 5, cards.PropertyColour.BROWN)
@@ -0,0 +1,52 @@
+import unittest
+
+import benchmark
+import bot
+
+
+class TestReport(unittest.TestCase):
+    def setUp(self) -> None:
+        self.args = benchmark.BenchmarkNamespace()
+        self.args.n_bots = 2
+        self.args.n_ais = 0
+        self.args.policy = "random"
+        self.args.think_time = 0.0
+        self.args.no_compression = False
+
+    def test_percentiles(self) -> None:
+        values = [float(i) for i in range(1, 102)]
+        self.assertEqual(
+            benchmark.percentiles(values),
+            {"p50": 51.0, "p90": 91.0, "p99": 100.0},
+        )
+        self.assertEqual(
+            benchmark.percentiles([3.0]),
+            {"p50": 3.0, "p90": 3.0, "p99": 3.0},
+        )
+
+    def test_make_report(self) -> None:
+        bot_stats = [
+            bot.BotStats(connected_at=10.5, game_over=True),
+            bot.BotStats(connected_at=11.0, game_over=True),
+        ]
+        server_stats = {
+            "turns": 4,
+            "cpu_time": 0.2,
+            "wall_time": 1.0,
+            "players": [
+                {"waits": [0.001, 0.003], "bytes_sent": 300},
+                {"waits": [0.002], "bytes_sent": 500},
+            ],
+        }
+        report = benchmark.make_report(self.args, bot_stats, 10.0, server_stats)
+        self.assertEqual(report["bots_finished"], 2)
+        self.assertEqual(report["connections_per_second"], 2.0)
+        self.assertEqual(report["decisions"], 3)
+        self.assertAlmostEqual(report["decision_rtt_ms"]["p50"], 2.0)
+        self.assertAlmostEqual(report["decision_rtt_ms"]["max"], 3.0)
+        self.assertEqual(report["bytes_per_turn"], 200.0)
+        self.assertAlmostEqual(report["server_cpu_ms_per_turn"], 50.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import threading
+import unittest
+from typing import Any
+from unittest import mock
+
+import bot
+import cards
+import client
+import player
+import protocol
+import transport
+from interaction import dummy, randomised
+
+
+class TestRandomInteraction(unittest.TestCase):
+    def test_payment_is_always_valid(self) -> None:
+        p = player.Player("Random", dummy.DummyInteraction())
+        for value, colour in [
+            (1, cards.PropertyColour.BROWN),
+            (2, cards.PropertyColour.RED),
+            (3, cards.PropertyColour.GREEN),
+            (4, cards.PropertyColour.DARK_BLUE),
+        ]:
+            p.add_property(cards.PropertyCard("Property", value, colour))
+        for seed in range(20):
+            inter = randomised.RandomInteraction(seed)
+            for amount in range(1, 12):
+                chosen = inter.choose_property_payment(p, amount)
+                self.assertTrue(p.is_valid_property_payment(chosen, amount))
+
+
+class TestBot(unittest.TestCase):
+    def setUp(self) -> None:
+        self.args = bot.BotNamespace()
+        self.args.name = "Bot"
+        self.args.policy = "ai"
+        self.args.think_time = 0.0
+        self.args.no_compression = False
+
+    def test_plays_a_prompted_card(self) -> None:
+        b = bot.Bot("Bot", self.args)
+        me = player.Player("Bot", dummy.DummyInteraction())
+        me.index = b.c.me.index
+        me.add_to_hand(cards.MoneyCard(1))
+        me.add_to_hand(cards.MoneyCard(5))
+        other = player.Player("Other", dummy.DummyInteraction())
+        frame = json.dumps(
+            {
+                "players": [other.to_json(), me.to_json()],
+                "current_player": me.to_json(),
+                "n_cards_played": 0,
+            },
+        )
+        received: dict[str, bytes] = {}
+
+        async def serve(
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter,
+        ) -> None:
+            received["hello"] = await reader.read(1024)
+            writer.write(b"hello/2//notify_draw_my_turn/")
+            writer.write(frame.encode())
+            writer.write(b"/ping/7:3/choose_card_in_hand/")
+            received["reply"] = await reader.readexactly(
+                protocol.REPLY_HEADER.size + 1,
+            )
+            writer.write(b"notify_game_over/")
+            writer.close()
+
+        async def run() -> bot.BotStats:
+            server_sock, client_sock = transport.pair()
+            reader, writer = await asyncio.open_connection(sock=server_sock)
+            server = asyncio.create_task(serve(reader, writer))
+            stats = await b.run(client_sock)
+            await server
+            return stats
+
+        threads = []
+        reply_to_choice = client.reply_to_choice
+
+        def record(*args: Any) -> bytes:  # noqa: ANN401
+            threads.append(threading.get_ident())
+            return reply_to_choice(*args)
+
+        with mock.patch.object(client, "reply_to_choice", record):
+            stats = asyncio.run(run())
+        # The choice is made off the event loop, which runs in this thread
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], threading.get_ident())
+        self.assertEqual(
+            received["hello"],
+            f"Bot/{me.index}/ids,zlib/2".encode(),
+        )
+        # The AI banks the larger note, which is second in the hand
+        self.assertEqual(
+            received["reply"],
+            protocol.tag_reply(7, 3, bytes([2])),
+        )
+        self.assertEqual(stats.decisions, 1)
+        self.assertTrue(stats.game_over)
+
+
+if __name__ == "__main__":
+    unittest.main()
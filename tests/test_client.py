@@ -0,0 +1,56 @@
+import socket
+import unittest
+
+import client
+import protocol
+
+
+class TestBlockReceiver(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server_sock, self.client_sock = socket.socketpair()
+        self.addCleanup(self.server_sock.close)
+        self.addCleanup(self.client_sock.close)
+        self.receiver = client.BlockReceiver(self.client_sock, buffer_size=8)
+
+    def test_several_blocks_in_one_chunk(self) -> None:
+        self.server_sock.sendall(b"log/hello/notify_turn_over/")
+        self.assertEqual(self.receiver.receive(), "log")
+        self.assertEqual(self.receiver.receive(), "hello")
+        self.assertEqual(self.receiver.receive(), "notify_turn_over")
+
+    def test_block_larger_than_buffer(self) -> None:
+        message = "£" + "x" * 10_000
+        self.server_sock.sendall(f"log/{message}/".encode())
+        self.assertEqual(self.receiver.receive(), "log")
+        self.assertEqual(self.receiver.receive(), message)
+
+    def test_block_split_across_chunks(self) -> None:
+        self.server_sock.sendall(b"choose_car")
+        self.server_sock.sendall(b"d_in_hand/lo")
+        self.assertEqual(self.receiver.receive(), "choose_card_in_hand")
+        self.server_sock.sendall(b"g/")
+        self.assertEqual(self.receiver.receive(), "log")
+
+    def test_has_data_until_drained(self) -> None:
+        self.assertFalse(self.receiver.has_data())
+        self.server_sock.sendall(b"log/hi/")
+        self.assertEqual(self.receiver.receive(), "log")
+        self.assertTrue(self.receiver.has_data())
+        self.assertEqual(self.receiver.receive(), "hi")
+        self.assertFalse(self.receiver.has_data())
+
+    def test_closed_connection(self) -> None:
+        self.server_sock.sendall(b"log/partial")
+        self.server_sock.close()
+        self.assertEqual(self.receiver.receive(), "log")
+        self.assertIsNone(self.receiver.receive_opt())
+
+    def test_compressed_frame(self) -> None:
+        frame = b'{"players": []}'
+        self.receiver.compressed = True
+        self.server_sock.sendall(protocol.compress_frame(frame) + b"/")
+        self.assertEqual(self.receiver.receive_frame(), frame.decode())
+
+
+if __name__ == "__main__":
+    unittest.main()
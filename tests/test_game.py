@@ -72,8 +72,8 @@ class TestPayments(unittest.TestCase):
     def test_get_payment_2(self) -> None:
         with patch.object(
             self.mock_interaction,
-            "choose_property_source",
-            side_effect=[self.property1],
+            "choose_property_payment",
+            return_value=[self.property1],
         ):
             money, properties = self.g.get_payment(self.player, 10)
             charged_cards = utils.strip_and_join(
@@ -98,8 +98,8 @@ class TestPayments(unittest.TestCase):
     def test_get_payment_3(self) -> None:
         with patch.object(
             self.mock_interaction,
-            "choose_property_source",
-            side_effect=[self.property1, self.property2],
+            "choose_property_payment",
+            return_value=[self.property1, self.property2],
         ):
             money, properties = self.g.get_payment(self.player, 20)
             charged_cards = utils.strip_and_join(
@@ -121,6 +121,14 @@ class TestPayments(unittest.TestCase):
             self.assertEqual(self.player.total_bank_value(), 0)
             self.assertEqual(len(self.player.properties_to_list()), 0)
 
+    def test_get_payment_invalid_choice(self) -> None:
+        with patch.object(
+            self.mock_interaction,
+            "choose_property_payment",
+            return_value=[self.property1, self.property2],
+        ), self.assertRaises(ValueError):
+            self.g.get_payment(self.player, 10)
+
 
 class TestGameWinCondition(unittest.TestCase):
     def setUp(self) -> None:
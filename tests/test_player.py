@@ -53,5 +53,43 @@ class TestChargeMoneyPayment(unittest.TestCase):
         self.assertEqual(len(self.p.bank), 1)
 
 
+class TestPropertyPayment(unittest.TestCase):
+    def setUp(self) -> None:
+        self.p = player.Player("Test", Mock())
+        self.cheap = cards.PropertyCard("Cheap", 1, cards.PropertyColour.RED)
+        self.mid = cards.PropertyCard("Mid", 2, cards.PropertyColour.GREEN)
+        self.dear = cards.PropertyCard("Dear", 4, cards.PropertyColour.BROWN)
+        for prop in (self.cheap, self.mid, self.dear):
+            self.p.add_property(prop)
+
+    def test_covering_payment_is_valid(self) -> None:
+        self.assertTrue(
+            self.p.is_valid_property_payment([self.cheap, self.dear], 3),
+        )
+
+    def test_unneeded_card_is_invalid(self) -> None:
+        self.assertFalse(
+            self.p.is_valid_property_payment([self.cheap, self.mid], 1),
+        )
+
+    def test_short_payment_must_be_everything(self) -> None:
+        self.assertFalse(
+            self.p.is_valid_property_payment([self.cheap, self.mid], 10),
+        )
+        self.assertTrue(
+            self.p.is_valid_property_payment(
+                [self.cheap, self.mid, self.dear],
+                10,
+            ),
+        )
+
+    def test_unowned_or_duplicate_card_is_invalid(self) -> None:
+        other = cards.PropertyCard("Other", 5, cards.PropertyColour.RED)
+        self.assertFalse(self.p.is_valid_property_payment([other], 3))
+        self.assertFalse(
+            self.p.is_valid_property_payment([self.cheap, self.cheap], 2),
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
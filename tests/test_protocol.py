@@ -0,0 +1,33 @@
+import json
+import unittest
+
+import cards
+import player
+import protocol
+from interaction import dummy
+
+
+class TestFrameCompression(unittest.TestCase):
+    def setUp(self) -> None:
+        p = player.Player("Alice", dummy.DummyInteraction())
+        for i in range(8):
+            p.add_property(
+                cards.PropertyCard(f"Street {i}", 2, cards.PropertyColour.RED),
+            )
+            p.add_to_hand(cards.MoneyCard(i))
+        self.frame = json.dumps({"players": [p.to_json()]}).encode("utf-8")
+
+    def test_round_trip(self) -> None:
+        compressed = protocol.compress_frame(self.frame)
+        self.assertEqual(protocol.decompress_frame(compressed), self.frame)
+
+    def test_compressed_frame_has_no_separator(self) -> None:
+        self.assertNotIn(b"/", protocol.compress_frame(self.frame))
+
+    def test_compressed_frame_is_smaller(self) -> None:
+        compressed = protocol.compress_frame(self.frame)
+        self.assertLess(len(compressed), len(self.frame) // 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
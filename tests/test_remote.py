@@ -0,0 +1,367 @@
+import json
+import socket
+import threading
+import unittest
+import uuid
+
+import cards
+import game
+import player
+import protocol
+from interaction import dummy, remote
+
+
+class TestRemoteInteraction(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server_sock, self.client_sock = socket.socketpair()
+        self.client_sock.settimeout(1)
+        self.index = uuid.uuid4()
+        self.client_sock.sendall(f"Remote/{self.index}".encode())
+        self.inter = remote.RemoteInteraction(self.server_sock)
+        self.p = player.Player(self.inter.name, self.inter)
+        self.p.index = self.inter.index
+
+    def tearDown(self) -> None:
+        self.server_sock.close()
+        self.client_sock.close()
+
+    def test_handshake(self) -> None:
+        self.assertEqual(self.inter.name, "Remote")
+        self.assertEqual(self.inter.index, self.index)
+
+    def test_messages_are_coalesced_until_flush(self) -> None:
+        self.inter.log("first")
+        self.inter.log("second")
+        self.inter.notify_turn_over("Other")
+        self.client_sock.setblocking(False)
+        with self.assertRaises(BlockingIOError):
+            self.client_sock.recv(1024)
+        self.client_sock.setblocking(True)
+        self.inter.flush()
+        self.assertEqual(
+            self.client_sock.recv(1024),
+            b"log/first/log/second/notify_turn_over/",
+        )
+
+    def test_prompt_flushes_queued_messages(self) -> None:
+        self.p.add_to_hand(cards.MoneyCard(1))
+        self.inter.log("hello")
+        self.client_sock.sendall(bytes([1]))
+        card = self.inter.choose_card_in_hand(self.p)
+        self.assertIs(card, self.p.hand[0])
+        self.assertEqual(
+            self.client_sock.recv(1024),
+            b"log/hello/choose_card_in_hand/",
+        )
+
+    def test_service_pings_idle_connection(self) -> None:
+        self.inter.log("queued")
+        # Queued messages wait for the game to flush its step
+        self.inter.service(keepalive_interval=0)
+        self.inter.flush()
+        self.assertEqual(self.client_sock.recv(1024), b"log/queued/")
+        self.inter.service(keepalive_interval=60)
+        self.inter.service(keepalive_interval=0)
+        self.assertEqual(self.client_sock.recv(1024), b"ping/")
+
+    def test_choose_property_payment(self) -> None:
+        cheap = cards.PropertyCard("Cheap", 1, cards.PropertyColour.RED)
+        dear = cards.PropertyCard("Dear", 4, cards.PropertyColour.GREEN)
+        self.p.add_property(cheap)
+        self.p.add_property(dear)
+        self.client_sock.sendall(bytes([2, 1, 2]))
+        chosen = self.inter.choose_property_payment(self.p, 3)
+        self.assertEqual(chosen, [cheap, dear])
+        self.assertEqual(
+            self.client_sock.recv(1024),
+            b"choose_property_payment/3/",
+        )
+
+
+class TestDecisionStats(unittest.TestCase):
+    def test_waits_are_sampled(self) -> None:
+        stats = remote.DecisionStats()
+        n_decisions = 3 * remote.WAIT_SAMPLES
+        for i in range(n_decisions):
+            stats.record(i, timed_out=False, stood_in=False)
+        self.assertEqual(stats.decisions, n_decisions)
+        self.assertEqual(stats.max_wait, n_decisions - 1)
+        self.assertEqual(len(stats.waits), remote.WAIT_SAMPLES)
+        # Later waits replace some of the first ones
+        self.assertGreater(max(stats.waits), remote.WAIT_SAMPLES)
+
+
+class TestRemoteRequestIds(unittest.TestCase):
+    def setUp(self) -> None:
+        server_sock, self.client_sock = socket.socketpair()
+        self.addCleanup(server_sock.close)
+        self.addCleanup(self.client_sock.close)
+        self.client_sock.settimeout(1)
+        self.client_sock.sendall(f"Remote/{uuid.uuid4()}/ids".encode())
+        self.inter = remote.RemoteInteraction(
+            server_sock,
+            decision_timeout=0.05,
+        )
+        self.session_id = self.inter.session_id
+
+    def envelope(self, request_id: int) -> bytes:
+        return protocol.envelope(self.session_id, request_id)
+
+    def test_messages_have_envelopes(self) -> None:
+        self.inter.log("hello")
+        self.client_sock.sendall(
+            protocol.tag_reply(self.session_id, 1, b"\x02"),
+        )
+        self.assertEqual(self.inter.choose_action_usage(), 2)
+        self.assertEqual(
+            self.client_sock.recv(1024),
+            b"capabilities/ids/"
+            + self.envelope(0)
+            + b"log/hello/"
+            + self.envelope(1)
+            + b"choose_action_usage/",
+        )
+
+    def test_replies_to_other_prompts_are_discarded(self) -> None:
+        self.assertEqual(self.inter.choose_action_usage(), 2)
+        self.assertEqual(self.inter.stats.timeouts, 1)
+        self.client_sock.sendall(
+            # Late reply to the first prompt, and a reply for another seat
+            protocol.tag_reply(self.session_id, 1, b"\x02")
+            + protocol.tag_reply(self.session_id + 1, 2, b"\x02")
+            + protocol.tag_reply(self.session_id, 2, b"\x01"),
+        )
+        self.assertEqual(self.inter.choose_action_usage(), 1)
+        self.assertEqual(self.inter.stats.timeouts, 1)
+
+
+class TestRemoteHandshake(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server_sock, self.client_sock = socket.socketpair()
+        self.addCleanup(self.server_sock.close)
+        self.addCleanup(self.client_sock.close)
+        self.client_sock.settimeout(1)
+
+    def connect(self, hello: bytes) -> remote.RemoteInteraction:
+        self.client_sock.sendall(hello)
+        inter = remote.RemoteInteraction(self.server_sock)
+        inter.flush()
+        return inter
+
+    def test_parse_hello_versions(self) -> None:
+        index = uuid.uuid4()
+        self.assertEqual(
+            remote.parse_hello(f"Alice/{index}".encode()),
+            remote.Hello("Alice", index, []),
+        )
+        self.assertEqual(
+            remote.parse_hello(f"Alice/{index}/zlib".encode()),
+            remote.Hello("Alice", index, ["zlib"]),
+        )
+        self.assertEqual(
+            remote.parse_hello(protocol.client_hello("Alice", index, [])),
+            remote.Hello("Alice", index, [], protocol.PROTOCOL_VERSION),
+        )
+        with self.assertRaises(ValueError):
+            remote.parse_hello(f"Alice/{index}/zlib/0".encode())
+
+    def test_server_hello_lists_accepted_capabilities(self) -> None:
+        inter = self.connect(
+            protocol.client_hello("Alice", uuid.uuid4(), ["delta", "zlib"]),
+        )
+        self.assertEqual(self.client_sock.recv(1024), b"hello/2/zlib/")
+        self.assertEqual(inter.version, 2)
+        self.assertEqual(inter.capabilities, ["zlib"])
+
+    def test_server_hello_without_capabilities(self) -> None:
+        self.connect(protocol.client_hello("Alice", uuid.uuid4(), []))
+        self.assertEqual(self.client_sock.recv(1024), b"hello/2//")
+
+    def test_newer_client_speaks_our_version(self) -> None:
+        inter = self.connect(f"Alice/{uuid.uuid4()}/ids/7".encode())
+        self.assertEqual(self.client_sock.recv(1024), b"hello/2/ids/")
+        self.assertEqual(inter.version, protocol.PROTOCOL_VERSION)
+
+    def test_resume_token_is_sent_only_when_offered(self) -> None:
+        inter = self.connect(
+            protocol.client_hello(
+                "Alice",
+                uuid.uuid4(),
+                [protocol.RESUME_CAPABILITY],
+            ),
+        )
+        self.assertEqual(
+            self.client_sock.recv(1024),
+            f"hello/2/resume/resume/{inter.resume_token}/".encode(),
+        )
+
+    def test_hello_offers_resume_token(self) -> None:
+        index = uuid.uuid4()
+        hello = protocol.client_hello("Alice", index, ["zlib", "resume=abc"])
+        self.assertEqual(
+            remote.parse_hello(hello),
+            remote.Hello("Alice", index, ["zlib"], 2, "abc"),
+        )
+
+    def test_frames_show_only_own_index(self) -> None:
+        inter = self.connect(protocol.client_hello("Alice", uuid.uuid4(), []))
+        self.client_sock.recv(1024)
+        me = player.Player("Alice", inter)
+        me.index = inter.index
+        other = player.Player("Bob", dummy.DummyInteraction())
+        inter.notify_draw_other_turn([me, other])
+        inter.flush()
+        header = b"notify_draw_other_turn/"
+        data = self.client_sock.recv(4096)
+        frame = json.loads(data[len(header) : -1])
+        self.assertEqual(
+            [p["index"] for p in frame["players"]],
+            [str(me.index), str(other.public_index())],
+        )
+
+    def test_version_is_negotiated_again_on_reconnect(self) -> None:
+        inter = self.connect(f"Alice/{uuid.uuid4()}/zlib".encode())
+        self.assertEqual(self.client_sock.recv(1024), b"capabilities/zlib/")
+        server_sock, client_sock = socket.socketpair()
+        self.addCleanup(server_sock.close)
+        self.addCleanup(client_sock.close)
+        client_sock.settimeout(1)
+        inter.reattach(server_sock, remote.Hello("Alice", inter.index, [], 2))
+        self.assertEqual(client_sock.recv(1024), b"hello/2//")
+        self.assertEqual(inter.capabilities, [])
+        self.assertFalse(inter.compress)
+
+
+class TestRemoteCompression(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server_sock, self.client_sock = socket.socketpair()
+        self.addCleanup(self.server_sock.close)
+        self.addCleanup(self.client_sock.close)
+
+    def connect(self, hello: str) -> remote.RemoteInteraction:
+        self.client_sock.sendall(hello.encode())
+        return remote.RemoteInteraction(self.server_sock)
+
+    def test_negotiated_frames_are_compressed(self) -> None:
+        inter = self.connect(f"Remote/{uuid.uuid4()}/zlib")
+        p = player.Player("Remote", inter)
+        inter.notify_draw_other_turn([p])
+        inter.flush()
+        data = self.client_sock.recv(4096)
+        header = b"capabilities/zlib/notify_draw_other_turn/"
+        self.assertTrue(data.startswith(header))
+        frame = protocol.decompress_frame(data[len(header) : -1])
+        self.assertEqual(json.loads(frame)["players"][0]["name"], "Remote")
+
+    def test_older_clients_get_plain_frames(self) -> None:
+        inter = self.connect(f"Remote/{uuid.uuid4()}")
+        p = player.Player("Remote", inter)
+        inter.notify_draw_other_turn([p])
+        inter.flush()
+        data = self.client_sock.recv(4096)
+        header = b"notify_draw_other_turn/"
+        self.assertTrue(data.startswith(header))
+        frame = json.loads(data[len(header) : -1])
+        self.assertEqual(frame["players"][0]["name"], "Remote")
+
+
+class TestRemoteReconnect(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server_sock, self.client_sock = socket.socketpair()
+        self.addCleanup(self.client_sock.close)
+        self.client_sock.sendall(f"Remote/{uuid.uuid4()}".encode())
+        self.inter = remote.RemoteInteraction(
+            self.server_sock,
+            reconnect_timeout=0,
+        )
+        self.p = player.Player("Remote", self.inter)
+
+    def reconnect(self) -> socket.socket:
+        server_sock, client_sock = socket.socketpair()
+        self.addCleanup(server_sock.close)
+        self.addCleanup(client_sock.close)
+        client_sock.settimeout(1)
+        self.inter.reattach(
+            server_sock,
+            remote.Hello("Remote", self.inter.index, []),
+        )
+        return client_sock
+
+    def test_dropped_player_gets_default_choice(self) -> None:
+        self.client_sock.close()
+        self.p.add_to_hand(cards.MoneyCard(1))
+        self.p.add_to_hand(cards.MoneyCard(5))
+        self.assertIs(self.inter.choose_card_in_hand(self.p), self.p.hand[1])
+        self.assertFalse(self.inter.connected.is_set())
+        self.assertEqual(self.inter.choose_action_usage(), 2)
+
+    def test_reconnect_sends_snapshot_and_missed_logs(self) -> None:
+        self.inter.notify_draw_other_turn([self.p])
+        self.inter.flush()
+        self.inter.disconnect(self.inter.sock)
+        self.inter.log("missed")
+        client_sock = self.reconnect()
+        header = b"notify_draw_other_turn/"
+        data = client_sock.recv(4096)
+        self.assertTrue(data.startswith(header))
+        self.assertTrue(data.endswith(b"/log/missed/"))
+        frame = json.loads(data[len(header) : -len(b"/log/missed/")])
+        self.assertEqual(frame["players"][0]["name"], "Remote")
+
+    def test_decision_waits_for_reconnect(self) -> None:
+        self.inter.reconnect_timeout = 5
+        self.inter.disconnect(self.inter.sock)
+        client_socks: list[socket.socket] = []
+
+        def reconnect_and_answer() -> None:
+            client_sock = self.reconnect()
+            client_socks.append(client_sock)
+            client_sock.sendall(bytes([1]))
+
+        timer = threading.Timer(0.05, reconnect_and_answer)
+        timer.start()
+        self.assertEqual(self.inter.choose_action_usage(), 1)
+        timer.join()
+        self.assertEqual(client_socks[0].recv(1024), b"choose_action_usage/")
+
+
+class TestRemoteDecisionTimeout(unittest.TestCase):
+    def setUp(self) -> None:
+        server_sock, self.client_sock = socket.socketpair()
+        self.addCleanup(server_sock.close)
+        self.addCleanup(self.client_sock.close)
+        self.client_sock.sendall(f"Remote/{uuid.uuid4()}".encode())
+        self.inter = remote.RemoteInteraction(
+            server_sock,
+            decision_timeout=0.05,
+        )
+        self.p = player.Player("Remote", self.inter)
+        self.p.index = self.inter.index
+        self.p.add_to_hand(cards.MoneyCard(1))
+        self.p.add_to_hand(cards.MoneyCard(5))
+
+    def test_late_reply_is_discarded(self) -> None:
+        self.assertIs(self.inter.choose_card_in_hand(self.p), self.p.hand[1])
+        self.assertEqual(self.inter.stats.timeouts, 1)
+        # Reply to the timed-out prompt, then to the next one
+        self.client_sock.sendall(bytes([1, 1]))
+        self.inter.notify_turn_over("Other")
+        self.assertEqual(self.inter.choose_action_usage(), 1)
+        self.assertEqual(self.inter.stats.decisions, 2)
+        self.assertEqual(self.inter.stats.stand_ins, 1)
+
+    def test_ai_takes_over_the_play(self) -> None:
+        other = player.Player("Other", dummy.DummyInteraction())
+        g = game.Game([self.p, other], [])
+        self.inter.set_game_instance(g)
+        card = self.inter.choose_card_in_hand(self.p)
+        self.assertIs(card, self.p.hand[1])
+        # Follow-up decisions go straight to the AI, without a prompt
+        self.assertEqual(self.inter.choose_action_usage(), 2)
+        self.assertEqual(self.inter.stats.decisions, 1)
+        self.inter.notify_turn_over("Other")
+        self.assertFalse(self.inter.stand_in_owns_play)
+
+
+if __name__ == "__main__":
+    unittest.main()
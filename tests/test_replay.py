@@ -0,0 +1,73 @@
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+import cards
+import game
+import player
+import replay
+from interaction import dummy, randomised, recorder
+
+
+class TestRecording(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = directory / "game.jsonl"
+        self.players = [
+            player.Player("Alice", randomised.RandomInteraction(0)),
+            player.Player("Bob", randomised.RandomInteraction(0)),
+        ]
+        self.g = game.Game(self.players, deck=[])
+        game_recorder = recorder.Recorder(self.path, self.g, 2)
+        self.g.spectators.append(game_recorder)
+        # Each turn, the current player banks a note as large as the turn
+        self.banks: list[list[int]] = []
+        for turn in range(6):
+            self.g.draw(0)
+            self.banks.append([p.total_bank_value() for p in self.players])
+            self.g.log_all(f"Turn {turn}")
+            self.g.current_player().add_to_bank(cards.MoneyCard(turn + 1))
+            self.g.draw(1)
+            self.banks.append([p.total_bank_value() for p in self.players])
+            self.g.end_turn()
+        self.g.notify_game_over("Alice has won the game!")
+        game_recorder.close()
+        self.recording = replay.Recording.load(self.path)
+
+    def test_frames_only_record_changed_players(self) -> None:
+        frames = [self.recording.events[i] for i in self.recording.frames]
+        self.assertEqual(frames[0]["type"], "snapshot")
+        self.assertEqual(list(frames[1]["players"]), ["0"])
+        self.assertEqual(frames[2]["players"], {})
+
+    def test_every_frame_is_rebuilt(self) -> None:
+        self.assertEqual(self.recording.n_turns, 6)
+        for number, bank in enumerate(self.banks):
+            frame = self.recording.frame(number)
+            self.assertEqual(frame.turn, number // 2)
+            self.assertEqual(frame.current, (number // 2) % 2)
+            self.assertEqual(frame.played, number % 2)
+            rebuilt = [
+                player.Player.from_json(p, dummy.DummyInteraction())
+                for p in frame.players
+            ]
+            self.assertEqual([p.total_bank_value() for p in rebuilt], bank)
+
+    def test_seek_starts_from_nearest_snapshot(self) -> None:
+        # Snapshots start turns 0, 2 and 4
+        self.assertEqual(self.recording.snapshots, [0, 4, 8])
+        self.assertEqual(self.recording.turn_starts[5], 10)
+        self.assertEqual(self.recording.turn_of(11), 5)
+
+    def test_messages_before_frame(self) -> None:
+        self.assertEqual(self.recording.messages(3), (["Turn 0", "Turn 1"], 2))
+        # The last frame shows how the game ended
+        messages, n_logged = self.recording.messages(11)
+        self.assertEqual(messages[-1], "Alice has won the game!")
+        self.assertEqual(n_logged, 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+import time
+import unittest
+import uuid
+
+import protocol
+import server
+from interaction import remote, spectator
+
+
+class TestHandshaker(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server_socket = socket.create_server(("127.0.0.1", 0))
+        self.addCleanup(self.server_socket.close)
+        self.handshaker = server.Handshaker(self.server_socket, 0.2)
+        self.addCleanup(self.handshaker.close)
+        self.admitted: list[remote.Hello] = []
+
+    def admit(self, sock: socket.socket, hello: remote.Hello) -> None:
+        self.addCleanup(sock.close)
+        self.admitted.append(hello)
+
+    def connect(self) -> socket.socket:
+        sock = socket.create_connection(self.server_socket.getsockname())
+        self.addCleanup(sock.close)
+        return sock
+
+    def test_silent_connection_does_not_block_others(self) -> None:
+        silent = self.connect()
+        index = uuid.uuid4()
+        self.connect().sendall(f"Alice/{index}/zlib".encode())
+        start = time.monotonic()
+        self.handshaker.run(self.admit, lambda: len(self.admitted) == 1)
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertEqual(self.admitted[0].index, index)
+        self.assertEqual(self.admitted[0].capabilities, ["zlib"])
+        # The silent connection is dropped once its time is up
+        self.handshaker.run(self.admit, lambda: not self.handshaker.pending)
+        self.assertEqual(silent.recv(1024), b"")
+
+    def test_burst_of_connections(self) -> None:
+        for i in range(20):
+            self.connect().sendall(f"Bot {i}/{uuid.uuid4()}".encode())
+        self.handshaker.run(self.admit, lambda: len(self.admitted) == 20)
+        names = sorted(hello.name for hello in self.admitted)
+        self.assertEqual(names, sorted(f"Bot {i}" for i in range(20)))
+
+    def test_split_hello_is_buffered(self) -> None:
+        self.handshaker.hello_timeout = 2.0
+        sock = self.connect()
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        index = uuid.uuid4()
+        hello = f"Alice/{index}/zlib/2".encode()
+        # Cut inside the UUID, and held back for longer than a hello with
+        # no version is given to settle
+        sock.sendall(hello[:10])
+        rest = threading.Timer(0.1, sock.sendall, [hello[10:]])
+        rest.start()
+        self.addCleanup(rest.join)
+        self.handshaker.run(self.admit, lambda: len(self.admitted) == 1)
+        self.assertEqual(
+            self.admitted,
+            [remote.Hello("Alice", index, ["zlib"], 2)],
+        )
+
+    def test_bad_hello_is_dropped(self) -> None:
+        bad = self.connect()
+        bad.sendall(b"nonsense")
+        self.connect().sendall(f"Alice/{uuid.uuid4()}".encode())
+        self.handshaker.run(
+            self.admit,
+            lambda: len(self.admitted) == 1 and not self.handshaker.pending,
+        )
+        self.assertEqual(bad.recv(1024), b"")
+        self.assertEqual(self.admitted[0].name, "Alice")
+
+
+class TestResumeSeat(unittest.TestCase):
+    def setUp(self) -> None:
+        server_sock, self.client_sock = socket.socketpair()
+        self.addCleanup(server_sock.close)
+        self.addCleanup(self.client_sock.close)
+        self.client_sock.settimeout(1)
+        self.client_sock.sendall(f"Alice/{uuid.uuid4()}/resume/2".encode())
+        self.inter = remote.RemoteInteraction(server_sock)
+        self.seats = {self.inter.index: self.inter}
+
+    def resume(self, token: str) -> socket.socket:
+        server_sock, client_sock = socket.socketpair()
+        self.addCleanup(server_sock.close)
+        self.addCleanup(client_sock.close)
+        client_sock.settimeout(1)
+        hello = remote.Hello("Alice", self.inter.index, [], 2, token)
+        hub = spectator.SpectatorHub()
+        server.resume_seat(server_sock, hello, self.seats, hub)
+        return client_sock
+
+    def test_wrong_token_is_rejected(self) -> None:
+        # Anyone who has seen the seat's index can offer it
+        intruder = self.resume("0" * 32)
+        self.assertEqual(intruder.recv(1024), b"")
+        # The player keeps their connection
+        self.inter.log("still here")
+        self.inter.flush()
+        self.assertTrue(self.client_sock.recv(1024).endswith(b"still here/"))
+
+    def test_slow_reader_does_not_hold_up_resume(self) -> None:
+        # More of the game than the socket buffers hold
+        self.inter.snapshot = (b"notify_draw_other_turn/", b"x" * 2**22)
+        resumed = threading.Thread(
+            target=self.resume,
+            args=(self.inter.resume_token,),
+        )
+        resumed.start()
+        resumed.join(timeout=1)
+        self.assertFalse(resumed.is_alive())
+
+    def test_token_resumes_seat(self) -> None:
+        client_sock = self.resume(self.inter.resume_token)
+        self.assertTrue(client_sock.recv(1024).startswith(b"hello/2/"))
+        # The old connection is closed once the seat moves
+        self.assertEqual(self.client_sock.recv(1024), b"")
+
+
+class TestFront(unittest.TestCase):
+    def setUp(self) -> None:
+        server_socket = socket.create_server(("127.0.0.1", 0))
+        self.addCleanup(server_socket.close)
+        handshaker = server.Handshaker(server_socket)
+        self.addCleanup(handshaker.close)
+        self.args = server.ServerNamespace()
+        self.args.n_players = 2
+        self.args.rooms = None
+        controls = []
+        self.shards = []
+        for _ in range(2):
+            front_end, shard_end = socket.socketpair(
+                socket.AF_UNIX,
+                socket.SOCK_SEQPACKET,
+            )
+            self.addCleanup(front_end.close)
+            self.addCleanup(shard_end.close)
+            controls.append(front_end)
+            self.shards.append(shard_end)
+        self.front = server.Front(self.args, handshaker, controls)
+
+    def join(self, name: str, index: uuid.UUID | None = None) -> remote.Hello:
+        client_sock, server_sock = socket.socketpair()
+        self.addCleanup(client_sock.close)
+        hello = remote.Hello(name, index or uuid.uuid4(), [])
+        self.front.admit(server_sock, hello)
+        return hello
+
+    def handed_off(self, shard: int) -> tuple[int, remote.Hello]:
+        data, fds, _, _ = socket.recv_fds(
+            self.shards[shard],
+            server.CONTROL_MESSAGE_SIZE,
+            1,
+        )
+        for fd in fds:
+            os.close(fd)
+        return server.decode_handoff(data)
+
+    def test_rooms_are_spread_over_shards(self) -> None:
+        hellos = [self.join(f"Player {i}") for i in range(4)]
+        self.assertEqual(self.handed_off(0), (0, hellos[0]))
+        self.assertEqual(self.handed_off(0), (0, hellos[1]))
+        self.assertEqual(self.handed_off(1), (1, hellos[2]))
+        self.assertEqual(self.handed_off(1), (1, hellos[3]))
+
+    def test_reconnection_goes_to_its_room(self) -> None:
+        alice = self.join("Alice")
+        self.join("Bob")
+        self.join("Carol")
+        for shard in [0, 0, 1]:
+            self.handed_off(shard)
+        self.join("Alice", alice.index)
+        self.assertEqual(self.handed_off(0), (0, alice))
+
+    def test_spectator_waits_for_a_player_to_open_a_room(self) -> None:
+        client_sock, server_sock = socket.socketpair()
+        self.addCleanup(client_sock.close)
+        watcher = remote.Hello(
+            "Watcher",
+            uuid.uuid4(),
+            [protocol.SPECTATE_CAPABILITY],
+        )
+        self.front.admit(server_sock, watcher)
+        self.assertEqual(self.front.room_shards, {})
+        alice = self.join("Alice")
+        self.assertEqual(self.handed_off(0), (0, watcher))
+        self.assertEqual(self.handed_off(0), (0, alice))
+
+    def test_finished_room_frees_its_shard(self) -> None:
+        self.args.rooms = 2
+        self.join("Alice")
+        self.join("Bob")
+        self.shards[0].send(json.dumps({"room": 0}).encode())
+        self.front.receive(0)
+        self.assertEqual(self.front.finished, 1)
+        self.assertEqual(self.front.room_shards, {})
+        # The next room goes to the shard with the fewest games
+        carol = self.join("Carol")
+        self.handed_off(0)
+        self.handed_off(0)
+        self.assertEqual(self.handed_off(0), (1, carol))
+        self.join("Dave")
+        self.handed_off(0)
+        # Every room has been filled
+        client_sock, server_sock = socket.socketpair()
+        self.addCleanup(client_sock.close)
+        self.front.admit(server_sock, remote.Hello("Eve", uuid.uuid4(), []))
+        self.assertEqual(client_sock.recv(1024), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import json
+import socket
+import unittest
+import uuid
+
+import cards
+import game
+import player
+import protocol
+from interaction import default, remote, spectator
+
+
+class TestSpectatorHub(unittest.TestCase):
+    def setUp(self) -> None:
+        self.hub = spectator.SpectatorHub()
+        self.p = player.Player("Alice", default.DefaultInteraction())
+        self.p.add_to_hand(cards.MoneyCard(5))
+        self.g = game.Game([self.p], [])
+        self.g.spectators.append(self.hub)
+
+    def watch(self, capabilities: list[str]) -> socket.socket:
+        server_sock, client_sock = socket.socketpair()
+        self.addCleanup(server_sock.close)
+        self.addCleanup(client_sock.close)
+        client_sock.settimeout(1)
+        self.hub.add(
+            server_sock,
+            remote.Hello("Spectator", uuid.uuid4(), capabilities),
+        )
+        return client_sock
+
+    def test_frames_hide_hands(self) -> None:
+        client_sock = self.watch([])
+        self.g.draw(0)
+        data = client_sock.recv(4096)
+        header = b"notify_draw_other_turn/"
+        self.assertTrue(data.startswith(header))
+        frame = json.loads(data[len(header) : -1])
+        self.assertEqual(frame["players"][0]["hand"], [])
+        self.assertEqual(frame["players"][0]["hand_size"], 1)
+        # The index claims a seat, so only an ID made from it is shown
+        self.assertEqual(
+            frame["players"][0]["index"],
+            str(self.p.public_index()),
+        )
+
+    def test_spectators_share_encoded_bytes(self) -> None:
+        first = self.watch([])
+        second = self.watch([])
+        compressed = self.watch([protocol.ZLIB_CAPABILITY])
+        self.assertEqual(compressed.recv(1024), b"capabilities/zlib/")
+        self.g.log_all("hello")
+        self.g.flush_all()
+        self.assertEqual(first.recv(1024), b"log/hello/")
+        self.assertEqual(second.recv(1024), b"log/hello/")
+        self.assertEqual(compressed.recv(1024), b"log/hello/")
+        views = [s.unsent.obj for s in self.hub.spectators[:2]]
+        self.assertIs(views[0], views[1])
+
+    def test_late_spectator_gets_snapshot(self) -> None:
+        self.g.draw(0)
+        client_sock = self.watch([])
+        data = client_sock.recv(4096)
+        self.assertTrue(data.startswith(b"notify_draw_other_turn/"))
+
+    def test_slow_spectator_drops_updates(self) -> None:
+        slow = self.watch([])
+        slow.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        fast = self.watch([])
+        message = "x" * 10_000
+        # Send far more than the slow spectator's buffers can hold
+        for _ in range(100):
+            self.g.log_all(message)
+            self.g.flush_all()
+            fast.recv(65536)
+        slow_spectator = self.hub.spectators[0]
+        self.assertGreater(slow_spectator.dropped, 0)
+        self.assertEqual(self.hub.spectators[1].dropped, 0)
+
+    def test_slow_spectator_catches_up_to_final_state(self) -> None:
+        slow = self.watch([])
+        slow.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        # Fill the slow spectator's buffers, then carry on for several steps
+        for _ in range(20):
+            self.g.log_all("x" * 10_000)
+            self.p.add_to_hand(cards.MoneyCard(1))
+            self.g.draw(0)
+            self.g.flush_all()
+        self.assertGreater(self.hub.spectators[0].dropped, 1)
+        self.g.notify_game_over("Alice has won the game!")
+        received = bytearray()
+        slow.settimeout(0.1)
+        while not received.endswith(b"log/Alice has won the game!/"):
+            self.hub.service()
+            received += slow.recv(65536)
+        header = b"notify_draw_other_turn/"
+        start = received.rindex(header) + len(header)
+        end = received.index(b"}/", start) + 1
+        frame = json.loads(received[start:end])
+        self.assertEqual(frame["players"][0]["hand_size"], 21)
+        self.assertIn(b"notify_game_over/", received[end:])
+
+    def test_closed_spectator_is_removed(self) -> None:
+        client_sock = self.watch([])
+        client_sock.close()
+        self.g.log_all("hello")
+        self.g.flush_all()
+        self.assertEqual(self.hub.spectators, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
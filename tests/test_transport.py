@@ -0,0 +1,62 @@
+import pathlib
+import shutil
+import socket
+import tempfile
+import unittest
+import uuid
+
+import transport
+from interaction import remote
+
+
+class TestUnixTransport(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, tmp)
+        self.address = transport.Address(path=tmp / "sock")
+
+    def listen(self) -> socket.socket:
+        server_socket = transport.listen(self.address, 1)
+        self.addCleanup(server_socket.close)
+        return server_socket
+
+    def test_remote_player_over_unix_socket(self) -> None:
+        server_socket = self.listen()
+        client_sock = transport.connect(self.address)
+        self.addCleanup(client_sock.close)
+        client_sock.settimeout(1)
+        client_sock.sendall(f"Remote/{uuid.uuid4()}".encode())
+        server_sock, _ = server_socket.accept()
+        inter = remote.RemoteInteraction(server_sock)
+        self.addCleanup(inter.close_connection)
+        client_sock.sendall(b"\x02")
+        self.assertEqual(inter.choose_action_usage(), 2)
+        self.assertEqual(client_sock.recv(1024), b"choose_action_usage/")
+
+    def test_replaces_stale_socket(self) -> None:
+        self.listen().close()
+        # The socket file of a server which has exited is still there
+        self.assertTrue(self.address.path and self.address.path.exists())
+        self.listen()
+        transport.connect(self.address).close()
+
+    def test_keeps_live_socket(self) -> None:
+        self.listen()
+        with self.assertRaises(FileExistsError):
+            transport.listen(self.address, 1)
+        # The first server can still be reached
+        transport.connect(self.address).close()
+
+    def test_keeps_file_which_is_not_a_socket(self) -> None:
+        assert self.address.path is not None
+        self.address.path.write_text("notes", encoding="utf-8")
+        with self.assertRaises(FileExistsError):
+            transport.listen(self.address, 1)
+        self.assertEqual(
+            self.address.path.read_text(encoding="utf-8"),
+            "notes",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,493 @@
+from __future__ import annotations
+
+import contextlib
+import curses
+import fcntl
+import functools
+import json
+import math
+import os
+import pathlib
+import pty
+import select
+import shutil
+import signal
+import struct
+import subprocess  # nosec B404
+import sys
+import tempfile
+import termios
+import threading
+import unittest
+from typing import TYPE_CHECKING
+from unittest.mock import Mock, patch
+
+import cards
+import interaction.local
+import local
+import player
+from interaction import dummy
+from window import common, frame, hand, log, render, table, window
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+def fake_screen() -> tuple[Mock, list[Mock]]:
+    """A screen whose subwindows record what is drawn on them."""
+    windows: list[Mock] = []
+
+    def subwin(*_: int) -> Mock:
+        windows.append(Mock())
+        windows[-1].getmaxyx.return_value = (0, 0)
+        return windows[-1]
+
+    stdscr = Mock()
+    stdscr.subwin.side_effect = subwin
+    return stdscr, windows
+
+
+class TestTableRedraw(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher = patch("curses.color_pair", return_value=0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.players = [
+            player.Player("Alice", dummy.DummyInteraction()),
+            player.Player("Bob", dummy.DummyInteraction()),
+        ]
+        self.players[0].add_property(
+            cards.PropertyCard("Mayfair", 4, cards.PropertyColour.DARK_BLUE),
+        )
+        stdscr, self.windows = fake_screen()
+        self.table = table.Table(stdscr, 2, 10, 80)
+        self.table.draw(self.players)
+
+    def refreshes(self) -> list[int]:
+        return [win.noutrefresh.call_count for win in self.windows]
+
+    def test_unchanged_players_are_not_repainted(self) -> None:
+        self.table.draw(self.players)
+        self.assertEqual(self.refreshes(), [1, 1])
+
+    def test_only_changed_player_is_repainted(self) -> None:
+        self.players[1].add_to_bank(cards.MoneyCard(5))
+        self.table.draw(self.players)
+        self.assertEqual(self.refreshes(), [1, 2])
+
+    def test_rebuilt_players_are_not_repainted(self) -> None:
+        # Remote clients rebuild every player from each state frame
+        rebuilt = [
+            player.Player.from_json(p.to_json(), dummy.DummyInteraction())
+            for p in self.players
+        ]
+        self.table.draw(rebuilt)
+        self.assertEqual(self.refreshes(), [1, 1])
+
+    def test_invalidate_repaints_every_pane(self) -> None:
+        self.table.invalidate()
+        self.table.draw(self.players)
+        self.assertEqual(self.refreshes(), [2, 2])
+
+
+class TestPagedTable(unittest.TestCase):
+    def setUp(self) -> None:
+        self.players = [
+            player.Player(f"Player {i}", dummy.DummyInteraction())
+            for i in range(100)
+        ]
+        stdscr, self.windows = fake_screen()
+        # Room for two panes, and a summary row of the next players
+        self.table = table.Table(stdscr, 100, 10, 80)
+
+    def test_only_visible_panes_are_created(self) -> None:
+        self.assertEqual(len(self.table.table_windows), 2)
+        self.assertIsNotNone(self.table.summary_window)
+        self.assertEqual(len(self.windows), 3)
+
+    def test_summary_fits_on_one_row(self) -> None:
+        with patch.object(
+            table,
+            "player_summary",
+            wraps=table.player_summary,
+        ) as summarise:
+            self.table.draw(self.players)
+        self.assertLess(summarise.call_count, 5)
+        summary = self.windows[0].addstr.call_args.args[2]
+        self.assertTrue(summary.startswith("Player 2: 0 sets, £0 | Player 3"))
+        self.assertEqual(len(summary), 79)
+
+    def test_paging_and_focus(self) -> None:
+        self.table.page(-1)
+        self.assertEqual(self.table.first, 98)
+        self.table.focus(99)
+        self.assertEqual(self.table.first, 98)
+        self.table.focus(50)
+        self.assertEqual(self.table.first, 50)
+
+    def test_resize_moves_panes_in_place(self) -> None:
+        self.table.resize(20, 70)
+        self.assertEqual(len(self.windows), 3)
+        self.windows[2].mvwin.assert_called_with(0, 35)
+        self.windows[2].mvderwin.assert_called_with(0, 35)
+        # Now there is room for a third pane, so the panes are rebuilt
+        self.table.resize(20, 100)
+        self.assertEqual(len(self.table.table_windows), 3)
+        self.assertEqual(len(self.windows), 7)
+
+
+MOVE_PANES = """
+import curses, json, sys
+from window import hand, log, table
+stdscr = curses.initscr()
+try:
+    game_log = log.Log(stdscr, 3, 80, 9, 0)
+    game_log.resize(3, 60, 6, 0)
+    game_hand = hand.Hand(stdscr, 12, 80, 12, 0)
+    game_hand.resize(15, 60, 9, 0)
+    game_table = table.Table(stdscr, 2, 9, 80)
+    game_table.resize(6, 70)
+    windows = [game_log.win, game_hand.win, *game_table.table_windows]
+    placed = [[*w.getbegyx(), *w.getmaxyx()] for w in windows]
+finally:
+    curses.endwin()
+with open(sys.argv[1], "w") as f:
+    json.dump(placed, f)
+"""
+"""Moves panes on a real screen, and writes where each ended up."""
+
+
+class TestMovePanes(unittest.TestCase):
+    def test_panes_are_moved_on_screen(self) -> None:
+        # Only a real curses screen tracks where a subwindow is drawn
+        directory = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        output = directory / "placed.json"
+        controller, terminal = pty.openpty()
+        self.addCleanup(os.close, controller)
+        fcntl.ioctl(
+            terminal,
+            termios.TIOCSWINSZ,
+            struct.pack("HHHH", 24, 80, 0, 0),
+        )
+        with terminal_output(controller):
+            subprocess.run(  # noqa: S603 # nosec B603
+                [sys.executable, "-c", MOVE_PANES, str(output)],
+                stdin=terminal,
+                stdout=terminal,
+                stderr=terminal,
+                env={**os.environ, "TERM": "xterm"},
+                cwd=pathlib.Path(__file__).parent.parent,
+                check=True,
+                timeout=30,
+            )
+        os.close(terminal)
+        with output.open(encoding="utf-8") as f:
+            placed = json.load(f)
+        self.assertEqual(
+            placed,
+            [[6, 0, 3, 60], [9, 0, 15, 60], [0, 0, 6, 35], [0, 35, 6, 35]],
+        )
+
+
+@contextlib.contextmanager
+def terminal_output(controller: int) -> Iterator[None]:
+    """Reads what is written to a terminal in the background, so that
+    writing to it never blocks.
+    """
+    done = threading.Event()
+
+    def drain() -> None:
+        while not done.is_set():
+            if select.select([controller], [], [], 0.05)[0]:
+                os.read(controller, 4096)
+
+    reader = threading.Thread(target=drain, daemon=True)
+    reader.start()
+    try:
+        yield
+    finally:
+        done.set()
+        reader.join()
+
+
+def fake_window(
+    n_players: int,
+    width: int,
+    log_file: pathlib.Path | None = None,
+) -> tuple[window.Window, Mock]:
+    """A window on a fake screen, without its input thread."""
+    stdscr, _ = fake_screen()
+    stdscr.getmaxyx.return_value = (40, width)
+    with (
+        patch.object(common, "init_colours"),
+        patch.object(window.Window, "input_thread"),
+        patch("signal.signal"),
+    ):
+        win = window.Window(stdscr, n_players, log_file=log_file)
+    writer = window.resize_wakeups.pop()
+    os.close(writer)
+    os.close(win.resize_reader)
+    return win, stdscr
+
+
+class TestWindowLock(unittest.TestCase):
+    def test_paging_waits_for_drawing(self) -> None:
+        win, stdscr = fake_window(4, 64)
+        stdscr.getch.side_effect = [curses.KEY_RIGHT, -1]
+        reader = threading.Thread(target=win.read_keys)
+        with win.lock:
+            reader.start()
+            reader.join(0.1)
+            # The input thread can't page while the main thread draws
+            self.assertTrue(reader.is_alive())
+            self.assertEqual(win.table.first, 0)
+        reader.join()
+        self.assertEqual(win.table.first, 2)
+
+
+class TestHandRedraw(unittest.TestCase):
+    def setUp(self) -> None:
+        stdscr, windows = fake_screen()
+        self.hand = hand.Hand(stdscr, 12, 80, 0, 0)
+        self.win = windows[0]
+        self.p = player.Player("Alice", dummy.DummyInteraction())
+        self.p.add_to_hand(cards.MoneyCard(1))
+
+    def test_unchanged_turn_is_not_repainted(self) -> None:
+        self.hand.draw(self.p, 1, 0)
+        self.hand.draw(self.p, 1, 0)
+        self.assertEqual(self.win.noutrefresh.call_count, 1)
+        self.hand.draw(self.p, 1, 1)
+        self.assertEqual(self.win.noutrefresh.call_count, 2)
+
+    def test_turn_is_repainted_after_dialog(self) -> None:
+        self.hand.draw(self.p, 1, 0)
+        self.hand.draw_action_dialog()
+        self.hand.draw(self.p, 1, 0)
+        self.assertEqual(self.win.noutrefresh.call_count, 3)
+
+
+class TestCardRender(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher = patch.dict(
+            common.COLOUR_ATTRS,
+            {colour: pair << 8 for colour, pair in common.COLOUR_MAP.items()},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        render.render_card.cache_clear()
+        self.addCleanup(render.render_card.cache_clear)
+
+    def test_rebuilt_card_is_laid_out_once(self) -> None:
+        card = cards.PropertyCard("Mayfair", 4, cards.PropertyColour.DARK_BLUE)
+        rebuilt = cards.from_json(card.to_json())
+        self.assertIs(
+            render.render_card(render.card_key(card)),
+            render.render_card(render.card_key(rebuilt)),
+        )
+        self.assertEqual(render.render_card.cache_info().misses, 1)
+
+    def test_rent_colours_are_coloured(self) -> None:
+        card = cards.ActionCard("Rent", 1, cards.ActionType.RENT_PINK_ORANGE)
+        card_render = render.render_card(render.card_key(card))
+        self.assertEqual(card_render.width, len("Pink Orange") + 4)
+        pink = common.COLOUR_ATTRS[cards.PropertyColour.PINK]
+        orange = common.COLOUR_ATTRS[cards.PropertyColour.ORANGE]
+        self.assertEqual(
+            card_render.segments[5:],
+            (
+                render.Segment(2, 2, "Pink", pink),
+                render.Segment(2, 7, "Orange", orange),
+            ),
+        )
+
+    def test_card_is_written_a_line_at_a_time(self) -> None:
+        stdscr, windows = fake_screen()
+        card = cards.ActionCard("Rent", 3, cards.ActionType.RENT_WILD)
+        hand.Hand(stdscr, 12, 80, 0, 0).draw_card(render.card_key(card), 3, 4)
+        writes = windows[0].addstr.call_args_list
+        # Five lines of the box, then a write for each letter of "Wild"
+        self.assertEqual(len(writes), 5 + 4)
+        self.assertEqual(writes[2].args, (5, 4, "│ Wild │", 0))
+        self.assertEqual(
+            writes[-1].args,
+            (5, 9, "d", common.COLOUR_ATTRS[cards.PropertyColour.LIGHT_BLUE]),
+        )
+        windows[0].addch.assert_not_called()
+
+
+class TestLogRedraw(unittest.TestCase):
+    def test_log_is_repainted_on_new_lines(self) -> None:
+        stdscr, windows = fake_screen()
+        game_log = log.Log(stdscr, log.LOG_HEIGHT, 80, 0, 0)
+        game_log.log("hello")
+        game_log.draw()
+        self.assertEqual(windows[0].noutrefresh.call_count, 1)
+        game_log.log("world")
+        self.assertEqual(windows[0].noutrefresh.call_count, 2)
+
+    def test_scrolls_back_through_history(self) -> None:
+        stdscr, windows = fake_screen()
+        game_log = log.Log(stdscr, log.LOG_HEIGHT, 80, 0, 0, log.History(5))
+        for i in range(10):
+            game_log.log(f"Message {i}")
+        game_log.scroll(100)
+        game_log.draw()
+        # Only the last five messages are kept
+        windows[0].addstr.assert_any_call(0, 2, "6.   Message 5")
+        game_log.log("Message 10")
+        self.assertEqual(game_log.scrolled, 2)
+        game_log.scroll(-100)
+        game_log.draw()
+        windows[0].addstr.assert_called_with(2, 2, "11.  Message 10")
+
+
+class TestHistory(unittest.TestCase):
+    def test_spills_every_message_to_file(self) -> None:
+        directory = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        path = directory / "game.log"
+        history = log.History(2, path)
+        self.addCleanup(history.close)
+        for i in range(5):
+            history.append(f"Message {i}")
+        self.assertEqual(list(history.lines), ["Message 3", "Message 4"])
+        self.assertEqual(
+            path.read_text(encoding="utf-8").splitlines(),
+            [f"Message {i}" for i in range(5)],
+        )
+
+    def test_window_closes_spill_file(self) -> None:
+        directory = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        win, _ = fake_window(2, 80, directory / "game.log")
+        spill = win.history.spill
+        win.close()
+        self.assertTrue(spill is not None and spill.closed)
+        # Messages logged after the game are still shown
+        win.log.log("Goodbye")
+        self.assertEqual(list(win.history.lines), ["Goodbye"])
+
+    def test_local_game_spills_result_last(self) -> None:
+        directory = pathlib.Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        args = local.LocalNamespace()
+        args.deck = pathlib.Path("resources/deck.json")
+        args.players = []
+        args.n_ais = 2
+        args.max_fps = frame.MAX_FPS
+        args.speed = math.inf
+        args.log_file = directory / "game.log"
+        args.record = None
+        stdscr, _ = fake_screen()
+        stdscr.getmaxyx.return_value = (40, 120)
+        n_wakeups = len(window.resize_wakeups)
+        with (
+            patch.object(common, "init_colours"),
+            patch.object(window.Window, "input_thread"),
+            patch.object(window.Window, "wait_for_key", return_value="\n"),
+            patch("signal.signal"),
+            patch("curses.color_pair", return_value=0),
+            patch.object(
+                frame,
+                "FrameScheduler",
+                functools.partial(frame.FrameScheduler, update=Mock()),
+            ),
+        ):
+            local.run_game(stdscr, args)
+        for writer in window.resize_wakeups[n_wakeups:]:
+            os.close(writer)
+        del window.resize_wakeups[n_wakeups:]
+        last = args.log_file.read_text(encoding="utf-8").splitlines()[-1]
+        self.assertRegex(last, "has won the game!|have drawn")
+
+
+class TestDebounce(unittest.TestCase):
+    def test_acts_once_burst_settles(self) -> None:
+        now = 0.0
+        debounce = frame.Debounce(0.5, lambda: now)
+        self.assertIsNone(debounce.timeout())
+        for _ in range(5):
+            debounce.trigger()
+            now += 0.25
+            self.assertFalse(debounce.ready())
+        self.assertEqual(debounce.timeout(), 0.25)
+        now += 0.25
+        self.assertTrue(debounce.ready())
+        self.assertFalse(debounce.ready())
+
+
+class TestFrameScheduler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.now = 0.0
+        self.update = Mock()
+        self.frames = frame.FrameScheduler(0.1, self.update, lambda: self.now)
+
+    def test_burst_is_coalesced(self) -> None:
+        for _ in range(10):
+            self.frames.stage()
+            self.now += 0.01
+        self.assertEqual(self.update.call_count, 1)
+        self.now += 0.01
+        self.frames.stage()
+        self.assertEqual(self.update.call_count, 2)
+
+    def test_frame_is_due_after_interval(self) -> None:
+        self.frames.stage()
+        self.assertFalse(self.frames.due())
+        self.now += 0.1
+        self.assertTrue(self.frames.due())
+
+    def test_flush_writes_only_staged_updates(self) -> None:
+        self.frames.stage()
+        self.frames.stage()
+        self.frames.flush()
+        self.assertEqual(self.update.call_count, 2)
+        self.frames.flush()
+        self.assertEqual(self.update.call_count, 2)
+
+
+class TestLocalFlush(unittest.TestCase):
+    def test_dropped_frame_is_drawn_on_flush(self) -> None:
+        win, stdscr = fake_window(2, 80)
+        now = 0.0
+        update = Mock()
+        win.frames = frame.FrameScheduler(0.1, update, lambda: now)
+        with patch.object(window, "Window", return_value=win):
+            inter = interaction.local.LocalInteraction(stdscr, 2)
+        players = [
+            player.Player("Alice", dummy.DummyInteraction()),
+            player.Player("Bob", inter),
+        ]
+        with patch("curses.color_pair", return_value=0):
+            inter.notify_draw_other_turn(players)
+            now += 0.01
+            players[0].add_to_bank(cards.MoneyCard(5))
+            # Too soon after the last frame, so this one is dropped
+            inter.notify_draw_other_turn(players)
+            self.assertEqual(update.call_count, 1)
+            inter.flush()
+        self.assertEqual(update.call_count, 2)
+        self.assertFalse(win.stale)
+
+
+class TestResizeWakeup(unittest.TestCase):
+    def test_every_input_thread_is_woken(self) -> None:
+        pipes = [os.pipe() for _ in range(2)]
+        for reader, writer in pipes:
+            self.addCleanup(os.close, reader)
+            self.addCleanup(os.close, writer)
+            os.set_blocking(writer, False)
+            fcntl.fcntl(writer, fcntl.F_SETPIPE_SZ, 4096)
+            window.resize_wakeups.append(writer)
+            self.addCleanup(window.resize_wakeups.remove, writer)
+        # A second resize before the threads wake doesn't block on a full pipe
+        for _ in range(5000):
+            window.notify_resize(signal.SIGWINCH, None)
+        for reader, _ in pipes:
+            self.assertTrue(os.read(reader, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+import socket
+import stat
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pathlib
+
+DEFAULT_HOST = "127.0.0.1"
+"""Host a server listens on, and clients connect to, by default."""
+DEFAULT_PORT = 54321
+"""TCP port a server listens on, and clients connect to, by default."""
+
+
+@dataclass(frozen=True)
+class Address:
+    """Where a server listens for clients. Either a TCP host and port, or
+    the path of a Unix domain socket, which skips the TCP stack for clients
+    on the same machine.
+    """
+
+    host: str = DEFAULT_HOST
+    port: int = DEFAULT_PORT
+    path: pathlib.Path | None = None
+
+    def __str__(self) -> str:
+        if self.path is not None:
+            return str(self.path)
+        return f"{self.host}:{self.port}"
+
+
+def remove_stale_socket(path: pathlib.Path) -> None:
+    """Removes the socket left behind by an earlier server, which never
+    removes its socket. Raises FileExistsError if anything else is at the
+    path, or a server is still listening on it.
+    """
+    try:
+        mode = path.lstat().st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        msg = f"{path} already exists and is not a socket"
+        raise FileExistsError(msg)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(path))
+        except ConnectionRefusedError:
+            # No server is listening, so the socket is stale
+            path.unlink()
+            return
+    msg = f"A server is already listening on {path}"
+    raise FileExistsError(msg)
+
+
+def listen(address: Address, backlog: int) -> socket.socket:
+    """Opens a socket listening for clients at the address."""
+    if address.path is not None:
+        remove_stale_socket(address.path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(str(address.path))
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((address.host, address.port))
+    sock.listen(backlog)
+    return sock
+
+
+def connect(address: Address) -> socket.socket:
+    """Connects to a server at the address."""
+    if address.path is not None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(str(address.path))
+        except OSError:
+            sock.close()
+            raise
+    else:
+        sock = socket.create_connection((address.host, address.port))
+    set_no_delay(sock)
+    return sock
+
+
+async def open_connection(
+    address: Address,
+    limit: int,
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Connects to a server at the address, for asyncio clients."""
+    if address.path is not None:
+        reader, writer = await asyncio.open_unix_connection(
+            address.path,
+            limit=limit,
+        )
+    else:
+        reader, writer = await asyncio.open_connection(
+            address.host,
+            address.port,
+            limit=limit,
+        )
+    set_no_delay(writer.get_extra_info("socket"))
+    return reader, writer
+
+
+def pair() -> tuple[socket.socket, socket.socket]:
+    """Connects a server end to a client end within one process, so the
+    whole protocol can be run without any network.
+    """
+    return socket.socketpair()
+
+
+def set_no_delay(sock: socket.socket) -> None:
+    """Stops Nagle's algorithm holding back small, latency-sensitive
+    messages waiting for an ACK. Only TCP sockets have it.
+    """
+    if sock.family in (socket.AF_INET, socket.AF_INET6):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
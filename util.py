@@ -8,7 +8,7 @@ import sys
 from typing import TYPE_CHECKING
 
 import player
-from interaction import ai, dummy
+from interaction import ai, dummy, remote
 
 if TYPE_CHECKING:
     from types import FrameType
@@ -48,7 +48,7 @@ def create_ai_player(name: str) -> player.Player:
 
 def set_ai_game_instances(players: list[player.Player], g: game.Game) -> None:
     for p in players:
-        if isinstance(p.inter, ai.AIInteraction):
+        if isinstance(p.inter, (ai.AIInteraction, remote.RemoteInteraction)):
             p.inter.set_game_instance(g)
 
 
@@ -20,6 +20,25 @@ def is_enter_key(key: str) -> bool:
     return key in ("\n", "\r", chr(10), chr(13))
 
 
+def move_window(
+    win: curses.window,
+    height: int,
+    width: int,
+    y: int,
+    x: int,
+) -> None:
+    """Moves and resizes a subwindow of the screen. It is moved both on the
+    screen, with mvwin, and in the screen's memory it shares, with mvderwin,
+    as either alone leaves it drawn at its old position. It is shrunk first
+    so that it fits wherever it is moved to.
+    """
+    old_height, old_width = win.getmaxyx()
+    win.resize(min(height, old_height), min(width, old_width))
+    win.mvwin(y, x)
+    win.mvderwin(y, x)
+    win.resize(height, width)
+
+
 def init_colours() -> None:
     assert curses.has_colors(), "Terminal does not support colours"
     curses.init_pair(
@@ -72,6 +91,12 @@ def init_colours() -> None:
         curses.COLOR_BLACK,
         curses.COLOR_YELLOW,
     )
+    COLOUR_ATTRS.update(
+        {
+            colour: curses.color_pair(pair)
+            for colour, pair in COLOUR_MAP.items()
+        },
+    )
 
 
 class InvalidChoiceError(Exception):
@@ -90,3 +115,6 @@ COLOUR_MAP = {
     cards.PropertyColour.RAILROAD: 9,
     cards.PropertyColour.UTILITY: 10,
 }
+COLOUR_ATTRS = dict.fromkeys(COLOUR_MAP, 0)
+"""The attributes to draw each colour with, looked up once when the colours
+are initialised. Colours are drawn plain until then."""
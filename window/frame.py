@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import curses
+import threading
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+MAX_FPS = 30
+"""Most frames written to the terminal each second, by default."""
+
+
+class FrameScheduler:
+    """Coalesces the pane updates staged with noutrefresh into frames, each
+    written to the terminal with a single doupdate.
+
+    A burst of updates, such as AI turns arriving in quick succession, is
+    flushed at most once every interval. Whatever is still staged must be
+    flushed before waiting on the player or the network, so the last frame
+    of a burst is never left unseen.
+    """
+
+    def __init__(
+        self,
+        interval: float = 1 / MAX_FPS,
+        update: Callable[[], None] = curses.doupdate,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.interval = interval
+        self.update = update
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.pending = False  # Whether updates are staged but not flushed
+        self.last_flush = -interval
+        self.n_frames = 0
+
+    def stage(self) -> None:
+        """Records that panes have staged updates, flushing them if a frame
+        is due.
+        """
+        with self.lock:
+            self.pending = True
+            if self.due():
+                self.flush_locked()
+
+    def due(self) -> bool:
+        """Returns True if enough time has passed to draw another frame."""
+        return self.clock() - self.last_flush >= self.interval
+
+    def flush(self) -> None:
+        """Writes any staged updates to the terminal."""
+        with self.lock:
+            if self.pending:
+                self.flush_locked()
+
+    def flush_locked(self) -> None:
+        self.update()
+        self.pending = False
+        self.last_flush = self.clock()
+        self.n_frames += 1
+
+
+class Debounce:
+    """Waits for a burst of events, such as the resizes of a window being
+    dragged, to settle before acting on them once.
+    """
+
+    def __init__(
+        self,
+        delay: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.delay = delay
+        self.clock = clock
+        self.due: float | None = None  # When to act, if an event is waiting
+
+    def trigger(self) -> None:
+        """Records an event, putting off acting until the delay has passed
+        without another.
+        """
+        self.due = self.clock() + self.delay
+
+    def timeout(self) -> float | None:
+        """Returns how long to wait before acting, or None if nothing is
+        waiting.
+        """
+        if self.due is None:
+            return None
+        return max(self.due - self.clock(), 0)
+
+    def ready(self) -> bool:
+        """Returns True, once, when the burst has settled."""
+        if self.due is None or self.clock() < self.due:
+            return False
+        self.due = None
+        return True
@@ -1,37 +1,131 @@
-import curses
+from __future__ import annotations
+
+import collections
+from typing import TYPE_CHECKING, TextIO
+
+from window import common
+
+if TYPE_CHECKING:
+    import curses
+    import pathlib
 
 LOG_HEIGHT = 3
+LOG_HISTORY = 5000
+"""Most messages kept in memory to scroll back through."""
 
 
-class Log:
+class History:
+    """Every message logged in a game. The oldest are forgotten once there
+    are too many to keep, but can be spilled to a file as they are logged,
+    so the whole game is kept there.
+    """
+
     def __init__(
+        self,
+        max_lines: int = LOG_HISTORY,
+        spill: pathlib.Path | None = None,
+    ) -> None:
+        self.lines: collections.deque[str] = collections.deque(
+            maxlen=max_lines,
+        )
+        self.n_logged = 0
+        self.spill: TextIO | None = None
+        if spill is not None:
+            # Line buffered, so the file is complete however the game ends
+            self.spill = spill.open(  # pylint: disable=consider-using-with
+                "a",
+                encoding="utf-8",
+                buffering=1,
+            )
+
+    def append(self, message: str) -> None:
+        self.lines.append(message)
+        self.n_logged += 1
+        if self.spill is not None:
+            self.spill.write(f"{message}\n")
+
+    def reset(self, messages: list[str], n_logged: int) -> None:
+        """Replaces the history with the latest of a number of messages,
+        when jumping to another point in a game.
+        """
+        self.lines.clear()
+        self.lines.extend(messages)
+        self.n_logged = n_logged
+
+    def close(self) -> None:
+        """Closes the spill file. Anything logged after is only kept in
+        memory.
+        """
+        if self.spill is not None:
+            self.spill.close()
+            self.spill = None
+
+
+class Log:
+    def __init__(  # noqa: PLR0913
         self,
         stdscr: curses.window,
         n_lines: int,
         n_cols: int,
         begin_y: int,
         begin_x: int,
+        history: History | None = None,
     ) -> None:
         self.win = stdscr.subwin(n_lines, n_cols, begin_y, begin_x)
-        self.log_lines: list[str] = []
-        self.log_idx = 0
+        self.n_lines = n_lines
+        self.history = history if history is not None else History()
+        self.scrolled = 0  # Number of lines scrolled back from the latest
+        # The message count and scroll position last drawn
+        self.drawn: tuple[int, int] | None = None
 
     def log(self, message: str) -> None:
-        if len(self.log_lines) >= 3:
-            self.log_lines.pop(0)
-        self.log_lines.append(message)
-        self.log_idx += 1
+        self.history.append(message)
+        if self.scrolled > 0:
+            # Keep showing the same lines while scrolled back
+            self.scroll(1)
         self.draw()
 
+    def scroll(self, n_lines: int) -> None:
+        """Scrolls back through the history by a number of lines, or forward
+        if it is negative.
+        """
+        most = max(len(self.history.lines) - self.n_lines, 0)
+        self.scrolled = min(max(self.scrolled + n_lines, 0), most)
+
+    def resize(
+        self,
+        n_lines: int,
+        n_cols: int,
+        begin_y: int,
+        begin_x: int,
+    ) -> None:
+        """Moves and resizes the log in place."""
+        common.move_window(self.win, n_lines, n_cols, begin_y, begin_x)
+        self.n_lines = n_lines
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Repaints the log on the next draw."""
+        self.drawn = None
+
     def draw(self) -> None:
-        self.win.clear()
-        for i, line in enumerate(self.log_lines):
-            s = f"{self.log_idx - len(self.log_lines) + i + 1}."
-            self.win.addstr(i, 2, f"{s:<4} {line}")
-        self.win.refresh()
+        state = (self.history.n_logged, self.scrolled)
+        if state == self.drawn:
+            return
+        self.win.erase()
+        lines = self.history.lines
+        end = len(lines) - self.scrolled
+        start = max(end - self.n_lines, 0)
+        first = self.history.n_logged - len(lines)
+        for i in range(start, end):
+            s = f"{first + i + 1}."
+            self.win.addstr(i - start, 2, f"{s:<4} {lines[i]}")
+        self.win.noutrefresh()
+        self.drawn = state
 
     def clear(self) -> None:
-        self.win.clear()
-        self.log_lines = []
-        self.log_idx = 0
-        self.win.refresh()
+        self.win.erase()
+        self.history.lines.clear()
+        self.history.n_logged = 0
+        self.scrolled = 0
+        self.win.noutrefresh()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import functools
+from dataclasses import dataclass
+from typing import Any
+
+import cards
+from window import common
+
+type CardKey = tuple[tuple[str, Any], ...]
+"""A card's JSON fields, which are equal for cards that look the same, even
+when they are rebuilt from every state frame."""
+
+WILD_LETTERS = [
+    ("W", cards.PropertyColour.RED),
+    ("i", cards.PropertyColour.GREEN),
+    ("l", cards.PropertyColour.YELLOW),
+    ("d", cards.PropertyColour.LIGHT_BLUE),
+]
+"""How the colourful "Wild" on a wild rent card is spelt out."""
+
+
+@dataclass(frozen=True)
+class Segment:
+    """A run of text at a position inside a card, and its attributes."""
+
+    y: int
+    x: int
+    text: str
+    attr: int = 0
+
+
+@dataclass(frozen=True)
+class CardRender:
+    """The width of a card's box, and its lines. Each line of the box,
+    borders and all, is one segment, and the coloured runs are drawn over
+    them, so a card is drawn with a write per line and per colour.
+    """
+
+    width: int
+    segments: tuple[Segment, ...]
+
+
+def card_key(card: cards.Card) -> CardKey:
+    return tuple(cards.to_json(card).items())
+
+
+@functools.lru_cache(maxsize=256)
+def render_card(key: CardKey) -> CardRender:
+    """Lays out a card once, so drawing it again only copies its segments."""
+    card = cards.from_json(dict(key))
+    if isinstance(card, cards.ActionCard):
+        return render_action_card(card)
+    if isinstance(card, cards.PropertyCard):
+        return render_property_card(card)
+    return render_money_card(card)
+
+
+def boxed(lines: list[str], colours: list[Segment]) -> CardRender:
+    """Lays out the lines of a card in its box, with any coloured runs
+    drawn over them.
+    """
+    box_lines = cards.box(tuple(lines)).split("\n")
+    segments = [Segment(y, 0, line) for y, line in enumerate(box_lines)]
+    return CardRender(len(box_lines[0]), (*segments, *colours))
+
+
+def rent_colours(card: cards.ActionCard) -> list[Segment]:
+    assert card.action in cards.RENT_CARD_COLOURS, "Action type must be rent"
+    if card.action == cards.ActionType.RENT_WILD:
+        return [
+            Segment(2, 2 + i, letter, common.COLOUR_ATTRS[colour])
+            for i, (letter, colour) in enumerate(WILD_LETTERS)
+        ]
+    first, second = cards.RENT_CARD_COLOURS[card.action]
+    return [
+        Segment(2, 2, first.pretty(), common.COLOUR_ATTRS[first]),
+        Segment(
+            2,
+            3 + len(first.pretty()),
+            second.pretty(),
+            common.COLOUR_ATTRS[second],
+        ),
+    ]
+
+
+def render_action_card(card: cards.ActionCard) -> CardRender:
+    action_str = card.action.pretty()
+    if cards.is_rent_action(card.action):
+        rent, colours = action_str.split(" ", 1)
+        return boxed([rent, colours, f"£{card.value}"], rent_colours(card))
+    return boxed([action_str, "", f"£{card.value}"], [])
+
+
+def render_property_card(card: cards.PropertyCard) -> CardRender:
+    colour_str = card.colour.pretty()
+    return boxed(
+        [card.name, colour_str, f"£{card.value}"],
+        [Segment(2, 2, colour_str, common.COLOUR_ATTRS[card.colour])],
+    )
+
+
+def render_money_card(card: cards.MoneyCard) -> CardRender:
+    return boxed(["Money", "", f"£{card.value}"], [])
@@ -1,11 +1,61 @@
 import curses
+from dataclasses import dataclass
 
 import cards
 import player
 from window import common
 
+MIN_PANE_WIDTH = 32
+"""Narrowest a player's pane can be before players are paged instead."""
+SUMMARY_SEPARATOR = " | "
+
+
+@dataclass(frozen=True)
+class PlayerView:
+    """Everything a table pane shows of a player. Panes keep the view they
+    last drew, and are only repainted when the player's view changes.
+    """
+
+    name: str
+    # Colour, whether the set is complete, and its cards, for each colour
+    # with any properties
+    properties: tuple[tuple[cards.PropertyColour, bool, str], ...]
+    bank: str
+
+
+def player_view(p: player.Player) -> PlayerView:
+    properties = tuple(
+        (
+            colour,
+            property_set.is_complete(),
+            ", ".join(
+                f"{card.name} (£{card.value})" for card in property_set.cards
+            ),
+        )
+        for colour, property_set in p.properties.items()
+        if property_set.cards
+    )
+    bank_str = ", ".join(f"£{card.value}" for card in p.bank)
+    return PlayerView(
+        p.name,
+        properties,
+        f"Bank (£{p.total_bank_value()}): {bank_str}",
+    )
+
+
+def player_summary(p: player.Player) -> str:
+    complete_sets = sum(
+        1 for prop_set in p.properties.values() if prop_set.is_complete()
+    )
+    return f"{p.name}: {complete_sets} sets, £{p.total_bank_value()}"
+
 
 class Table:
+    """One pane for each player, side by side. When there are too many
+    players for panes of a readable width, only a page of them have panes,
+    and the rest are summarised on a row underneath.
+    """
+
     def __init__(
         self,
         stdscr: curses.window,
@@ -13,60 +63,136 @@ class Table:
         height: int,
         width: int,
     ) -> None:
+        self.stdscr = stdscr
+        self.n_players = n_players
+        self.first = 0  # Index of the first player with a pane
+        self.width = width
+        self.summary_window: curses.window | None = None
         self.table_windows: list[curses.window] = []
-        for i in range(n_players):
-            table_width = width // n_players
+        # The view each pane last drew, or None if it must be repainted
+        self.drawn: list[PlayerView | None] = []
+        self.drawn_summary: str | None = None
+        self.create_windows(height, width)
+
+    def n_panes(self, width: int) -> int:
+        return max(min(self.n_players, width // MIN_PANE_WIDTH), 1)
+
+    def create_windows(self, height: int, width: int) -> None:
+        self.width = width
+        n_panes = self.n_panes(width)
+        self.summary_window = None
+        if n_panes < self.n_players:
+            height -= 1
+            self.summary_window = self.stdscr.subwin(1, width, height, 0)
+        self.table_windows = []
+        for i in range(n_panes):
+            table_width = width // n_panes
             self.table_windows.append(
-                stdscr.subwin(height, table_width, 0, table_width * i),
+                self.stdscr.subwin(height, table_width, 0, table_width * i),
             )
+        self.invalidate()
 
     def resize(self, height: int, width: int) -> None:
+        """Moves and resizes the panes in place, unless a different number
+        of them now fit.
+        """
+        if self.n_panes(width) != len(self.table_windows):
+            self.create_windows(height, width)
+            return
+        self.width = width
+        if self.summary_window is not None:
+            height -= 1
+            common.move_window(self.summary_window, 1, width, height, 0)
         table_width = width // len(self.table_windows)
         for i, t in enumerate(self.table_windows):
-            t.resize(height, table_width)
-            t.mvwin(0, table_width * i)
+            common.move_window(t, height, table_width, 0, table_width * i)
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Repaints every pane on the next draw."""
+        self.drawn = [None] * len(self.table_windows)
+        self.drawn_summary = None
+
+    def page(self, n_pages: int) -> None:
+        """Moves the panes on to the next page of players, or back if
+        negative.
+        """
+        n_panes = len(self.table_windows)
+        self.first = (self.first + n_pages * n_panes) % self.n_players
+
+    def focus(self, index: int) -> None:
+        """Gives the player at the index a pane, if they don't have one."""
+        if (index - self.first) % self.n_players >= len(self.table_windows):
+            self.first = index
 
     def clear(self, win: curses.window) -> None:
-        win.clear()
+        # Erase rather than clear, which would repaint the whole terminal
+        win.erase()
         win.border(0, 0, 0, 0, 0, 0, 0, 0)
 
     def draw(self, players: list[player.Player]) -> None:
-        assert len(players) == len(
-            self.table_windows,
-        ), "Number of players must match number of table windows"
-        for table_window, p in zip(self.table_windows, players):
-            self.draw_player(table_window, p)
+        """Repaints the panes of players whose view has changed. Only the
+        players with panes, and those that fit on the summary row, are
+        looked at, so the cost doesn't grow with the number of players.
+        """
+        assert (
+            len(players) == self.n_players
+        ), "Number of players must match the table"
+        for i, table_window in enumerate(self.table_windows):
+            view = player_view(players[(self.first + i) % self.n_players])
+            if view == self.drawn[i]:
+                continue
+            self.draw_player(table_window, view)
+            self.drawn[i] = view
+        if self.summary_window is not None:
+            self.draw_summary(self.summary_window, players)
 
-    def draw_player(self, win: curses.window, p: player.Player) -> None:
+    def draw_summary(
+        self,
+        win: curses.window,
+        players: list[player.Player],
+    ) -> None:
+        # Leave the last column, as curses can't write to the screen's corner
+        width = self.width - 1
+        parts: list[str] = []
+        length = 0
+        for i in range(len(self.table_windows), self.n_players):
+            if length >= width:
+                break
+            p = players[(self.first + i) % self.n_players]
+            parts.append(player_summary(p))
+            length += len(parts[-1]) + len(SUMMARY_SEPARATOR)
+        summary = SUMMARY_SEPARATOR.join(parts)[:width]
+        if summary == self.drawn_summary:
+            return
+        win.erase()
+        win.addstr(0, 0, summary)
+        win.noutrefresh()
+        self.drawn_summary = summary
+
+    def draw_player(self, win: curses.window, view: PlayerView) -> None:
         self.clear(win)
-        win.addstr(1, 2, f"{p.name}", curses.A_BOLD)
+        win.addstr(1, 2, f"{view.name}", curses.A_BOLD)
         win.addstr(2, 2, "Properties:")
-        idx = 0
-        for colour, properties in p.properties.items():
-            if not properties.cards:
-                continue
-            self.draw_property(win, colour, properties, idx)
-            idx += 1
-        bank_str = ", ".join(f"£{card.value}" for card in p.bank)
-        win.addstr(idx + 3, 2, f"Bank (£{p.total_bank_value()}): {bank_str}")
-        win.refresh()
+        for idx, (colour, complete, cards_str) in enumerate(view.properties):
+            self.draw_property(win, colour, complete, cards_str, idx)
+        win.addstr(len(view.properties) + 3, 2, view.bank)
+        win.noutrefresh()
 
     def draw_property(
         self,
         win: curses.window,
         colour: cards.PropertyColour,
-        properties: player.PropertySet,
+        complete: bool,
+        cards_str: str,
         idx: int,
     ) -> None:
-        cards_str = ", ".join(
-            f"{card.name} (£{card.value})" for card in properties.cards
-        )
         # Use a bitwise flag to bold the text if the set is complete
-        completed = curses.A_BOLD if properties.is_complete() else 0
+        completed = curses.A_BOLD if complete else 0
         win.addstr(
             idx + 3,
             4,
             colour.pretty(),
-            completed | curses.color_pair(common.COLOUR_MAP[colour]),
+            completed | common.COLOUR_ATTRS[colour],
         )
         win.addstr(idx + 3, 15, cards_str, completed)
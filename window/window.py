@@ -1,16 +1,51 @@
 from __future__ import annotations
 
+import contextlib
 import curses
+import os
 import queue
+import selectors
+import signal
+import sys
 import threading
 from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
-from window import common, hand, log, table
+from window import common, frame, hand, log, table
 
 if TYPE_CHECKING:
+    import pathlib
+    from types import FrameType
+
     import player
 
+SCROLL_KEYS = {
+    curses.KEY_PPAGE: log.LOG_HEIGHT,
+    curses.KEY_NPAGE: -log.LOG_HEIGHT,
+    curses.KEY_UP: 1,
+    curses.KEY_DOWN: -1,
+}
+"""Keys that scroll the log, and how many lines back each scrolls it."""
+
+PAGE_KEYS = {curses.KEY_LEFT: -1, curses.KEY_RIGHT: 1}
+"""Keys that page through the players on the table, and which way."""
+
+RESIZE_DEBOUNCE = 0.1
+"""Seconds the terminal must keep its size before the panes are laid out
+again."""
+
+resize_wakeups: list[int] = []
+"""Write ends of the pipes that wake each input thread when the terminal is
+resized."""
+
+
+def notify_resize(_sig: int, _frame: FrameType | None) -> None:
+    """Handles SIGWINCH by waking every input thread."""
+    for fd in resize_wakeups:
+        # A full pipe already holds a wake-up the thread hasn't read
+        with contextlib.suppress(BlockingIOError):
+            os.write(fd, b"\0")
+
 
 @dataclass(frozen=True)
 class RedrawData:
@@ -20,25 +55,46 @@ class RedrawData:
     """Number of cards played in the current turn,
     or None if it's another player's turn."""
     players: list[player.Player]
+    prompt: str | None = None
+    """Shown instead of asking the current player to choose a card."""
 
 
 class Window:
 
-    def __init__(self, stdscr: curses.window, n_players: int = 1) -> None:
+    def __init__(
+        self,
+        stdscr: curses.window,
+        n_players: int = 1,
+        max_fps: float = frame.MAX_FPS,
+        log_file: pathlib.Path | None = None,
+    ) -> None:
         self.stdscr = stdscr
         self.stdscr.nodelay(True)
         self.stdscr.keypad(True)
         self.n_players = n_players
         self.redraw_data: RedrawData | None = None
+        self.stale = False  # Whether the latest state has yet to be drawn
+        # Held while drawing, as curses windows aren't thread safe and the
+        # input thread redraws the panes on some keys
+        self.lock = threading.RLock()
+        self.frames = frame.FrameScheduler(1 / max_fps)
+        self.history = log.History(log.LOG_HISTORY, log_file)
         self.create_windows()
         common.init_colours()
         self.input_queue: queue.Queue[str] = queue.Queue()
+        self.resize_reader, resize_writer = os.pipe()
+        os.set_blocking(resize_writer, False)
+        resize_wakeups.append(resize_writer)
+        if threading.current_thread() is threading.main_thread():
+            # Replaces curses' own handler, which only takes effect on getch
+            signal.signal(signal.SIGWINCH, notify_resize)
         threading.Thread(target=self.input_thread, daemon=True).start()
 
     def update_n_players(self, n_players: int) -> None:
         """Update the number of players in the interaction."""
-        self.n_players = n_players
-        self.create_windows()
+        with self.lock:
+            self.n_players = n_players
+            self.create_windows()
 
     def create_windows(self) -> None:
         height, width = self.getmaxyx()
@@ -49,6 +105,7 @@ class Window:
             width,
             half_height - log.LOG_HEIGHT,
             0,
+            self.history,
         )
         self.hand = hand.Hand(
             self.stdscr,
@@ -69,88 +126,208 @@ class Window:
         current_player: player.Player,
         players: list[player.Player],
         n_cards_played: int,
+        prompt: str | None = None,
     ) -> None:
-        self.redraw_data = RedrawData(
-            current_player=current_player,
-            players=players,
-            n_cards_played=n_cards_played,
-        )
-        self.table.draw(players)
-        self.log.draw()
-        self.hand.draw(
-            current_player,
-            len(current_player.hand),
-            n_cards_played,
-        )
+        with self.lock:
+            self.redraw_data = RedrawData(
+                current_player=current_player,
+                players=players,
+                n_cards_played=n_cards_played,
+                prompt=prompt,
+            )
+            self.table.focus(players.index(current_player))
+            self.render()
 
     def draw_other_turn(
         self,
         players: list[player.Player],
     ) -> None:
-        self.redraw_data = RedrawData(
-            current_player=None,
-            players=players,
-            n_cards_played=None,
-        )
-        self.table.draw(players)
-        self.log.draw()
+        """Draws another player's turn, unless a frame was drawn too recently.
+        Then the frame is dropped, and the latest state is drawn by the next
+        frame or flush instead.
+        """
+        with self.lock:
+            self.redraw_data = RedrawData(
+                current_player=None,
+                players=players,
+                n_cards_played=None,
+            )
+            if self.frames.due():
+                self.render()
+            else:
+                self.stale = True
+
+    def render(self) -> None:
+        """Draws the latest state and stages it for the next frame."""
+        with self.lock:
+            assert self.redraw_data is not None, "Nothing to draw"
+            self.stale = False
+            self.table.draw(self.redraw_data.players)
+            self.log.draw()
+            if (
+                self.redraw_data.current_player is not None
+                and self.redraw_data.n_cards_played is not None
+            ):
+                self.hand.draw(
+                    self.redraw_data.current_player,
+                    len(self.redraw_data.current_player.hand),
+                    self.redraw_data.n_cards_played,
+                    self.redraw_data.prompt,
+                )
+            self.frames.stage()
 
     def input_thread(self) -> None:
+        """Sleeps until a key is pressed or the terminal is resized, rather
+        than polling getch.
+        """
+        with selectors.DefaultSelector() as selector:
+            selector.register(sys.stdin, selectors.EVENT_READ)
+            selector.register(self.resize_reader, selectors.EVENT_READ)
+            # Keys are still read while a resize is waiting to settle
+            resizes = frame.Debounce(RESIZE_DEBOUNCE)
+            while True:
+                for key, _ in selector.select(resizes.timeout()):
+                    if key.fileobj == self.resize_reader:
+                        os.read(self.resize_reader, 1024)
+                        resizes.trigger()
+                # Curses may also report the resize as a key
+                if self.read_keys():
+                    resizes.trigger()
+                if resizes.ready():
+                    size = os.get_terminal_size(sys.stdin.fileno())
+                    with self.lock:
+                        curses.resizeterm(size.lines, size.columns)
+                        self.resize()
+
+    def read_keys(self) -> bool:
+        """Queues every key waiting to be read, without blocking.
+        Returns True if one of them was a resize.
+        """
+        resized = False
         while True:
             try:
-                key = self.stdscr.getch()
-                if key == -1:
-                    continue
-                if key == curses.KEY_RESIZE:
-                    self.resize()
-                else:
-                    self.input_queue.put(chr(key))
+                # getch refreshes the screen if it has changed
+                with self.lock:
+                    key = self.stdscr.getch()
             except curses.error:
-                continue
+                return resized
+            if key == -1:
+                return resized
+            if key == curses.KEY_RESIZE:
+                resized = True
+            elif key in PAGE_KEYS:
+                with self.lock:
+                    self.table.page(PAGE_KEYS[key])
+                    if self.redraw_data is not None:
+                        self.render()
+            elif key in SCROLL_KEYS:
+                with self.lock:
+                    self.log.scroll(SCROLL_KEYS[key])
+                    self.log.draw()
+                    self.frames.stage()
+            else:
+                self.input_queue.put(chr(key))
 
     def get_number_input(self, v_min: int, v_max: int) -> int:
         while True:
-            key = self.input_queue.get()
+            key = self.wait_for_key()
             if common.int_range_validator(v_min, v_max)(key):
                 return int(key)
-            self.log.log("Invalid input, try again")
+            self.draw_log("Invalid input, try again")
+
+    def wait_for_key(self) -> str:
+        """Shows the latest state, then waits for a key press."""
+        self.flush()
+        return self.input_queue.get()
+
+    def poll_key(self, timeout: float | None) -> str | None:
+        """Shows the latest state, then waits for a key press for up to the
+        timeout. Returns None if no key was pressed.
+        """
+        self.flush()
+        try:
+            return self.input_queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def wait_for_enter(self) -> None:
+        while not common.is_enter_key(self.wait_for_key()):
+            pass
 
     def resize(self) -> None:
-        assert (
-            self.redraw_data is not None
-        ), "Redraw data must be set before resizing"
-        self.create_windows()
-        if (
-            self.redraw_data.current_player is not None
-            and self.redraw_data.n_cards_played is not None
-        ):
-            self.draw_my_turn(
-                self.redraw_data.current_player,
-                self.redraw_data.players,
-                self.redraw_data.n_cards_played,
-            )
-        else:
-            self.draw_other_turn(
-                self.redraw_data.players,
-            )
+        """Moves and resizes the panes in place to fit the terminal, and
+        redraws them.
+        """
+        with self.lock:
+            height, width = self.getmaxyx()
+            half_height = height // 2
+            try:
+                self.log.resize(
+                    log.LOG_HEIGHT,
+                    width,
+                    half_height - log.LOG_HEIGHT,
+                    0,
+                )
+                self.hand.resize(height - half_height, width, half_height, 0)
+                self.table.resize(half_height - log.LOG_HEIGHT, width)
+            except curses.error:
+                # Too small for the panes to be moved, so start again
+                self.create_windows()
+            # Clear what the old layout left outside the new panes
+            self.stdscr.erase()
+            self.stdscr.noutrefresh()
+            self.table.invalidate()
+            self.log.invalidate()
+            self.hand.invalidate()
+            if self.redraw_data is None:
+                # The terminal was resized before anything was drawn
+                return
+            self.render()
+            self.frames.flush()
 
     def turn_over(self, next_player_name: str) -> None:
-        self.hand.turn_over(self.input_queue, next_player_name)
+        with self.lock:
+            self.hand.draw_turn_over(next_player_name)
+        self.wait_for_enter()
 
     def game_over(self) -> None:
-        self.hand.game_over(self.input_queue)
+        with self.lock:
+            self.hand.draw_game_over()
+        self.wait_for_enter()
 
     def draw_log(self, message: str) -> None:
-        self.log.log(message)
+        with self.lock:
+            self.log.log(message)
+            self.frames.stage()
+
+    def flush(self) -> None:
+        """Draws any dropped frame and writes the staged pane updates to the
+        terminal.
+        """
+        with self.lock:
+            if self.stale:
+                self.render()
+            self.frames.flush()
+
+    def close(self) -> None:
+        """Closes the file the log is spilled to, once the game is over."""
+        with self.lock:
+            self.history.close()
 
     def clear(self) -> None:
-        self.stdscr.clear()
+        with self.lock:
+            self.stdscr.clear()
+            self.table.invalidate()
+            self.log.invalidate()
+            self.hand.invalidate()
 
     def addstr(self, y: int, x: int, string: str) -> None:
-        self.stdscr.addstr(y, x, string)
+        with self.lock:
+            self.stdscr.addstr(y, x, string)
 
     def refresh(self) -> None:
-        self.stdscr.refresh()
+        with self.lock:
+            self.stdscr.refresh()
 
     def getmaxyx(self) -> tuple[int, int]:
         return self.stdscr.getmaxyx()